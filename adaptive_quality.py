@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Control adaptativo de calidad para sesiones scrcpy sobre Wi-Fi
+
+Mide periódicamente la calidad del enlace (latencia de sondeos TCP al puerto
+ADB del dispositivo y fotogramas mostrados/descartados que informa scrcpy con
+--print-fps) y relanza la sesión subiendo o bajando un peldaño en una escalera
+de ajustes de bitrate, resolución máxima y FPS. Para no oscilar, bajar exige
+varias evaluaciones malas seguidas, subir exige más evaluaciones buenas con
+umbrales más estrictos, y tras cada cambio hay un tiempo mínimo de espera.
+
+scrcpy no permite cambiar el bitrate en caliente, así que cada cambio de
+peldaño relanza la sesión con las nuevas opciones.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy 1.14+ (--print-fps)
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+from stream_metrics import FPS_PATTERN
+from wifi_tools import tcp_probe
+
+
+@dataclass(frozen=True)
+class QualityPreset:
+    """Peldaño de la escalera de calidad."""
+    name: str
+    bit_rate: str
+    max_size: int # 0 = resolución original
+    max_fps: int
+
+    def as_options(self) -> dict:
+        """Claves de opciones de start_mirroring equivalentes."""
+        return {"bit_rate": self.bit_rate, "max_size": str(self.max_size), "max_fps": self.max_fps}
+
+
+# De mayor a menor calidad
+DEFAULT_QUALITY_LADDER = (
+    QualityPreset("alta", "16M", 0, 60),
+    QualityPreset("media-alta", "8M", 1920, 60),
+    QualityPreset("media", "4M", 1600, 60),
+    QualityPreset("baja", "2M", 1280, 30),
+    QualityPreset("mínima", "1M", 1024, 30),
+    QualityPreset("emergencia", "512K", 800, 24),
+)
+DEFAULT_START_PRESET = "media"
+
+
+@dataclass
+class AdaptiveSettings:
+    """Umbrales del controlador; se pueden ajustar en caliente (controller.settings)."""
+    interval: float = 2.0 # Segundos entre muestras
+    window: int = 5 # Muestras consideradas en cada evaluación
+    probe_timeout: float = 1.0
+    degrade_rtt_ms: float = 150.0
+    upgrade_rtt_ms: float = 60.0
+    degrade_loss: float = 0.2 # Fracción de sondeos fallidos
+    degrade_drop_ratio: float = 0.10 # Fotogramas descartados / total
+    upgrade_drop_ratio: float = 0.02
+    degrade_after: int = 2 # Evaluaciones malas consecutivas para bajar
+    upgrade_after: int = 5 # Evaluaciones buenas consecutivas para subir
+    cooldown: float = 15.0 # Segundos mínimos entre cambios
+
+
+@dataclass
+class LinkSample:
+    """Medida del enlace en un intervalo."""
+    timestamp: float
+    rtt_ms: Optional[float] # None si el sondeo falló
+    fps: Optional[float] = None # Media de los informes de --print-fps del intervalo
+    frames: int = 0 # Fotogramas mostrados en total en el intervalo...
+    dropped: int = 0 # ... y descartados en total (mismas unidades que frames)
+
+
+@dataclass
+class QualityDecision:
+    """Cambio de peldaño aplicado (o intentado) por el controlador."""
+    timestamp: float
+    action: str # degrade | upgrade
+    from_preset: str
+    to_preset: str
+    reason: str
+    metrics: dict = field(default_factory=dict)
+    applied: bool = True
+
+
+class AdaptiveQualityController:
+    """
+    Ajusta la calidad de una sesión Wi-Fi según la calidad del enlace.
+
+    Args:
+        serial: Serial del dispositivo ("host:puerto").
+        host, port: Destino de los sondeos TCP (el puerto ADB del dispositivo).
+        relaunch: Función relaunch(preset) que relanza scrcpy con el peldaño
+            indicado y devuelve la nueva ScrcpySession (o None si falló).
+        ladder: Peldaños de mayor a menor calidad.
+        start_preset: Nombre del peldaño inicial.
+        settings: Umbrales (AdaptiveSettings).
+        log_callback: Función para registrar las decisiones.
+    """
+
+    def __init__(self, serial: str, host: str, port: int, relaunch, ladder=DEFAULT_QUALITY_LADDER,
+                 start_preset: str = DEFAULT_START_PRESET, settings: Optional[AdaptiveSettings] = None,
+                 log_callback=None, probe_func=tcp_probe):
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.relaunch = relaunch
+        self.ladder = list(ladder)
+        names = [preset.name for preset in self.ladder]
+        self.level = names.index(start_preset) if start_preset in names else len(self.ladder) // 2
+        self.settings = settings or AdaptiveSettings()
+        self.log_callback = log_callback if log_callback else print
+        self.probe_func = probe_func
+        self.samples = deque(maxlen=max(self.settings.window, 1) * 4)
+        self.decisions = deque(maxlen=100)
+        self.session = None
+        self._bad_streak = 0
+        self._good_streak = 0
+        self._last_change = time.monotonic()
+        self._frames = 0
+        self._dropped = 0
+        self._fps_reports = 0
+        self._counter_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def preset(self) -> QualityPreset:
+        return self.ladder[self.level]
+
+    def launch_options(self, options: dict) -> dict:
+        """Opciones de lanzamiento con el peldaño actual y el informe de FPS activado."""
+        return dict(options, **self.preset.as_options(), print_fps=True)
+
+    def attach(self, session):
+        """Empieza a leer los informes de FPS de la sesión indicada."""
+        self.session = session
+        with self._counter_lock:
+            self._frames = self._dropped = self._fps_reports = 0
+        session.add_output_callback(self._on_output)
+
+    def _on_output(self, session, line: str):
+        if session is not self.session:
+            return # Línea tardía de la sesión anterior
+        match = FPS_PATTERN.search(line)
+        if match:
+            with self._counter_lock:
+                self._frames += int(match.group(1))
+                self._dropped += int(match.group(2) or 0)
+                self._fps_reports += 1
+
+    def sample(self) -> LinkSample:
+        """Toma una muestra: un sondeo TCP más los informes de FPS desde la muestra anterior."""
+        is_open, elapsed_ms = self.probe_func(self.host, self.port, self.settings.probe_timeout)
+        with self._counter_lock:
+            frames, dropped, reports = self._frames, self._dropped, self._fps_reports
+            self._frames = self._dropped = self._fps_reports = 0
+        sample = LinkSample(timestamp=time.time(), rtt_ms=round(elapsed_ms, 1) if is_open else None,
+                            fps=round(frames / reports, 1) if reports else None, frames=frames,
+                            dropped=dropped)
+        self.samples.append(sample)
+        return sample
+
+    def metrics(self) -> dict:
+        """Resumen de la ventana de muestras actual (mediana de RTT, pérdida y descartes)."""
+        window = list(self.samples)[-self.settings.window:]
+        rtts = [sample.rtt_ms for sample in window if sample.rtt_ms is not None]
+        shown = sum(sample.frames for sample in window)
+        dropped = sum(sample.dropped for sample in window)
+        return {
+            "samples": len(window),
+            "rtt_ms": round(statistics.median(rtts), 1) if rtts else None,
+            "loss": round(1 - len(rtts) / len(window), 2) if window else 0.0,
+            "drop_ratio": round(dropped / (shown + dropped), 3) if shown + dropped else 0.0,
+        }
+
+    def evaluate(self) -> Optional[tuple[str, str]]:
+        """
+        Evalúa la ventana de muestras con histéresis.
+
+        Returns:
+            ("degrade" | "upgrade", motivo) si corresponde cambiar de peldaño, o None.
+        """
+        s = self.settings
+        m = self.metrics()
+        if m["samples"] < s.window:
+            return None
+        bad_reasons = []
+        if m["loss"] >= s.degrade_loss:
+            bad_reasons.append(f"pérdida de sondeos {m['loss']:.0%} ≥ {s.degrade_loss:.0%}")
+        if m["rtt_ms"] is not None and m["rtt_ms"] > s.degrade_rtt_ms:
+            bad_reasons.append(f"RTT {m['rtt_ms']:.0f} ms > {s.degrade_rtt_ms:.0f} ms")
+        if m["drop_ratio"] > s.degrade_drop_ratio:
+            bad_reasons.append(f"descartes {m['drop_ratio']:.0%} > {s.degrade_drop_ratio:.0%}")
+        good = (not bad_reasons and m["loss"] == 0 and m["rtt_ms"] is not None
+                and m["rtt_ms"] < s.upgrade_rtt_ms and m["drop_ratio"] <= s.upgrade_drop_ratio)
+
+        self._bad_streak = self._bad_streak + 1 if bad_reasons else 0
+        self._good_streak = self._good_streak + 1 if good else 0
+        if time.monotonic() - self._last_change < s.cooldown:
+            return None
+        if self._bad_streak >= s.degrade_after and self.level < len(self.ladder) - 1:
+            return "degrade", "; ".join(bad_reasons)
+        if self._good_streak >= s.upgrade_after and self.level > 0:
+            return "upgrade", (f"RTT {m['rtt_ms']:.0f} ms < {s.upgrade_rtt_ms:.0f} ms y descartes "
+                               f"{m['drop_ratio']:.0%} durante {self._good_streak} evaluaciones")
+        return None
+
+    def step(self) -> Optional[QualityDecision]:
+        """Una iteración completa: muestrear, evaluar y, si procede, aplicar el cambio."""
+        self.sample()
+        verdict = self.evaluate()
+        if not verdict:
+            return None
+        action, reason = verdict
+        return self._apply(self.level + (1 if action == "degrade" else -1), action, reason)
+
+    def _apply(self, new_level: int, action: str, reason: str) -> QualityDecision:
+        previous = self.preset
+        self.level = new_level
+        decision = QualityDecision(timestamp=time.time(), action=action, from_preset=previous.name,
+                                   to_preset=self.preset.name, reason=reason, metrics=self.metrics())
+        icon = "📉" if action == "degrade" else "📈"
+        self.log_callback(f"{icon} Calidad adaptativa ({self.serial}): {previous.name} → {self.preset.name} "
+                          f"({self.preset.bit_rate}, {self.preset.max_size or 'original'}, "
+                          f"{self.preset.max_fps} fps). Motivo: {reason}")
+        self._last_change = time.monotonic()
+        self._bad_streak = self._good_streak = 0
+        self.samples.clear()
+        session = self.relaunch(self.preset)
+        if session is not None:
+            self.attach(session)
+        else:
+            decision.applied = False
+            self.log_callback(f"⚠️  No se pudo relanzar scrcpy con el ajuste '{self.preset.name}'.")
+        self.decisions.append(decision)
+        return decision
+
+    def _run(self):
+        while not self._stop.wait(self.settings.interval):
+            if self.session is not None and not self.session.is_running():
+                self.log_callback(f"Calidad adaptativa ({self.serial}): la sesión terminó, control detenido.")
+                break
+            try:
+                self.step()
+            except Exception as e:
+                self.log_callback(f"⚠️  Error en el control adaptativo de {self.serial}: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"adaptive-{self.serial}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict:
+        """Estado para diagnóstico y ajuste: peldaño, umbrales, métricas, muestras y decisiones."""
+        return {
+            "serial": self.serial,
+            "active": self.is_running(),
+            "preset": asdict(self.preset),
+            "level": self.level,
+            "ladder": [preset.name for preset in self.ladder],
+            "settings": asdict(self.settings),
+            "metrics": self.metrics(),
+            "samples": [asdict(sample) for sample in self.samples],
+            "decisions": [asdict(decision) for decision in self.decisions],
+        }
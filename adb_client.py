@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente nativo del protocolo host de ADB
+
+Este módulo habla directamente con el servidor ADB (por defecto en
+localhost:5037) usando su protocolo de texto, evitando lanzar un proceso
+`adb` por cada consulta.
+
+Formato del protocolo:
+    cliente -> servidor: longitud en 4 dígitos hexadecimales + petición
+    servidor -> cliente: "OKAY" o "FAIL" (+ longitud hex + mensaje de error)
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict
+
+
+DEFAULT_ADB_HOST = "127.0.0.1"
+DEFAULT_ADB_PORT = 5037
+REFILL_IDLE_SECONDS = 30.0
+
+# Claves conocidas en la salida de host:devices-l (usb:1-1 product:x model:y ...)
+_DEVICE_DETAIL_KEYS = ("usb", "product", "model", "device", "transport_id")
+
+
+def request_label(request: str) -> str:
+    """Nombre del servicio sin argumentos ("host:connect:1.2.3.4:5555" -> "host:connect"), para métricas."""
+    service, _, rest = request.partition(":")
+    if service == "host":
+        return f"host:{rest.split(':', 1)[0]}"
+    return service
+
+
+class AdbError(Exception):
+    """Error devuelto por el servidor ADB (respuesta FAIL o protocolo inválido)."""
+
+
+class AdbServerUnavailableError(AdbError):
+    """El servidor ADB no acepta conexiones en el puerto configurado."""
+
+
+class AdbConnectionClosedError(AdbError):
+    """El servidor ADB cerró la conexión antes de completar la respuesta."""
+
+
+@dataclass
+class AdbDevice:
+    """Dispositivo tal como lo reporta el servidor ADB."""
+    serial: str
+    state: str
+    transport_id: Optional[str] = None
+    model: Optional[str] = None
+    product: Optional[str] = None
+    device: Optional[str] = None
+    usb: Optional[str] = None
+    extras: Dict[str, str] = field(default_factory=dict)
+
+    def as_tuple(self) -> tuple[str, str]:
+        """Formato (serial, estado) usado por AndroidMirror.get_connected_devices."""
+        return self.serial, self.state
+
+
+def parse_device_list(payload: str, long_format: bool = True) -> List[AdbDevice]:
+    """
+    Interpreta la salida de host:devices / host:devices-l / host:track-devices-l.
+
+    Args:
+        payload: Texto devuelto por el servidor (una línea por dispositivo).
+        long_format: True si las líneas incluyen los detalles clave:valor.
+
+    Returns:
+        List[AdbDevice]: Dispositivos encontrados, en el orden del servidor.
+    """
+    devices = []
+    for line in payload.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not long_format or "\t" in line:
+            parts = line.split("\t")
+            if len(parts) >= 2:
+                devices.append(AdbDevice(serial=parts[0], state=parts[1].strip()))
+            continue
+
+        tokens = line.split()
+        if len(tokens) < 2:
+            continue
+        serial, rest = tokens[0], tokens[1:]
+        # El estado puede tener espacios ("no permissions (...)"), así que se
+        # consume hasta el primer token clave:valor conocido.
+        state_tokens = []
+        details: Dict[str, str] = {}
+        extras: Dict[str, str] = {}
+        for token in rest:
+            key, sep, value = token.partition(":")
+            if sep and key in _DEVICE_DETAIL_KEYS:
+                details[key] = value
+            elif details and sep:
+                extras[key] = value
+            elif not details:
+                state_tokens.append(token)
+        devices.append(AdbDevice(
+            serial=serial,
+            state=" ".join(state_tokens) or "unknown",
+            transport_id=details.get("transport_id"),
+            model=details.get("model"),
+            product=details.get("product"),
+            device=details.get("device"),
+            usb=details.get("usb"),
+            extras=extras,
+        ))
+    return devices
+
+
+class AdbClient:
+    """
+    Cliente del servidor ADB con un pool de conexiones precalentadas.
+
+    El servidor ADB cierra el socket tras responder cada petición host:, por lo
+    que una conexión no puede reutilizarse entre peticiones. El pool mantiene
+    sockets ya conectados (listos para la siguiente petición) y limita el número
+    de conexiones simultáneas hacia el servidor. Un hilo de fondo repone el
+    pool tras cada petición, así que quien consulta no paga la conexión de la
+    siguiente.
+
+    Si se indica observer, se llama observer(servicio, segundos, ok) al
+    terminar cada petición (ver request_label) para medir su latencia.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 timeout: float = 10.0, pool_size: int = 2, max_connections: int = 16, observer=None):
+        self.host = host or os.environ.get("ANDROID_ADB_SERVER_ADDRESS", DEFAULT_ADB_HOST)
+        self.port = port or int(os.environ.get("ANDROID_ADB_SERVER_PORT", DEFAULT_ADB_PORT))
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.observer = observer
+        self._idle: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._refill_wanted = threading.Event()
+        self._refill_thread: Optional[threading.Thread] = None
+
+    # --- Gestión de conexiones ---
+
+    def _open_socket(self, timeout: Optional[float] = None) -> socket.socket:
+        try:
+            sock = socket.create_connection((self.host, self.port),
+                                            timeout=self.timeout if timeout is None else timeout)
+        except OSError as e:
+            raise AdbServerUnavailableError(
+                f"Servidor ADB no disponible en {self.host}:{self.port}: {e}") from e
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _is_alive(sock: socket.socket) -> bool:
+        """Comprueba sin bloquear que el servidor no haya cerrado un socket en espera."""
+        try:
+            sock.setblocking(False)
+            try:
+                return sock.recv(1, socket.MSG_PEEK) != b""
+            finally:
+                sock.setblocking(True)
+        except (BlockingIOError, InterruptedError):
+            return True  # Sin datos pendientes: sigue abierto
+        except OSError:
+            return False
+
+    def _acquire(self, timeout: Optional[float] = None) -> tuple[socket.socket, bool]:
+        """Devuelve (socket, reutilizado): un socket del pool si hay alguno vivo o uno nuevo."""
+        with self._lock:
+            while self._idle:
+                sock = self._idle.pop()
+                if self._is_alive(sock):
+                    sock.settimeout(self.timeout if timeout is None else timeout)
+                    return sock, True
+                sock.close()
+        return self._open_socket(timeout), False
+
+    def _schedule_refill(self):
+        """Pide al hilo de reposición que complete el pool (sin bloquear a quien llama)."""
+        if self.pool_size <= 0:
+            return
+        with self._lock:
+            if len(self._idle) >= self.pool_size:
+                return
+            if self._refill_thread is None or not self._refill_thread.is_alive():
+                self._refill_thread = threading.Thread(target=self._refill_loop, name="adb-pool-refill", daemon=True)
+                self._refill_thread.start()
+        self._refill_wanted.set()
+
+    def _refill_loop(self):
+        # Termina tras un rato sin peticiones; la siguiente lo vuelve a arrancar
+        while self._refill_wanted.wait(REFILL_IDLE_SECONDS):
+            self._refill_wanted.clear()
+            self._refill()
+
+    def _refill(self):
+        """Deja sockets preconectados para las próximas peticiones."""
+        with self._lock:
+            missing = self.pool_size - len(self._idle)
+        for _ in range(max(0, missing)):
+            try:
+                sock = self._open_socket()
+            except AdbServerUnavailableError:
+                return
+            with self._lock:
+                self._idle.append(sock)
+
+    def close(self):
+        """Cierra todas las conexiones en espera del pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock in idle:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    # --- Primitivas del protocolo ---
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise AdbConnectionClosedError("El servidor ADB cerró la conexión inesperadamente.")
+            data.extend(chunk)
+        return bytes(data)
+
+    @classmethod
+    def _read_length_prefixed(cls, sock: socket.socket) -> str:
+        length_hex = cls._recv_exact(sock, 4)
+        try:
+            length = int(length_hex, 16)
+        except ValueError:
+            raise AdbError(f"Longitud inválida en respuesta ADB: {length_hex!r}")
+        return cls._recv_exact(sock, length).decode("utf-8", errors="replace")
+
+    @classmethod
+    def _send_request(cls, sock: socket.socket, request: str):
+        payload = request.encode("utf-8")
+        sock.sendall(f"{len(payload):04x}".encode("ascii") + payload)
+        status = cls._recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbError(cls._read_length_prefixed(sock))
+        raise AdbError(f"Respuesta ADB inesperada: {status!r}")
+
+    def _open_service(self, request: str, timeout: Optional[float] = None) -> socket.socket:
+        """Abre una conexión y envía la petición; reintenta una vez si el socket del pool estaba muerto."""
+        self._slots.acquire()
+        try:
+            sock, reused = self._acquire(timeout)
+            try:
+                self._send_request(sock, request)
+                return sock
+            except (ConnectionError, AdbConnectionClosedError):
+                sock.close()
+                if not reused:
+                    raise
+            except BaseException:
+                sock.close()
+                raise
+            # El socket del pool había caducado (p. ej. el servidor se reinició)
+            sock = self._open_socket(timeout)
+            try:
+                self._send_request(sock, request)
+            except BaseException:
+                sock.close()
+                raise
+            return sock
+        except ConnectionError as e:
+            self._slots.release()
+            raise AdbServerUnavailableError(f"Conexión con el servidor ADB perdida: {e}") from e
+        except socket.timeout as e:
+            self._slots.release()
+            raise AdbError(f"Timeout esperando respuesta a '{request}'") from e
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _finish(self, sock: socket.socket):
+        try:
+            sock.close()
+        finally:
+            self._slots.release()
+        self._schedule_refill()
+
+    def _observe(self, request: str, started: float, ok: bool):
+        if self.observer:
+            self.observer(request_label(request), time.perf_counter() - started, ok)
+
+    def query(self, request: str, timeout: Optional[float] = None) -> str:
+        """Envía una petición host: que responde con un bloque de longitud prefijada."""
+        started = time.perf_counter()
+        ok = False
+        try:
+            sock = self._open_service(request, timeout)
+            try:
+                response = self._read_length_prefixed(sock)
+            except socket.timeout as e:
+                raise AdbError(f"Timeout esperando respuesta de '{request}'") from e
+            except ConnectionError as e: # p. ej. RST a mitad de la respuesta
+                raise AdbServerUnavailableError(f"Conexión con el servidor ADB perdida: {e}") from e
+            except OSError as e:
+                raise AdbError(f"Error leyendo la respuesta de '{request}': {e}") from e
+            finally:
+                self._finish(sock)
+            ok = True
+            return response
+        finally:
+            self._observe(request, started, ok)
+
+    # --- Servicios host: ---
+
+    def version(self) -> int:
+        """Versión interna del servidor ADB (host:version)."""
+        return int(self.query("host:version"), 16)
+
+    def devices(self, timeout: Optional[float] = None) -> List[AdbDevice]:
+        """Dispositivos conocidos por el servidor con sus detalles (host:devices-l)."""
+        return parse_device_list(self.query("host:devices-l", timeout=timeout), long_format=True)
+
+    def connect(self, host: str, port: int = 5555, timeout: Optional[float] = 15.0) -> str:
+        """Conecta un dispositivo ADB sobre TCP. Devuelve el mensaje del servidor."""
+        return self.query(f"host:connect:{host}:{port}", timeout=timeout)
+
+    def disconnect(self, serial: str) -> str:
+        """Desconecta un dispositivo ADB sobre TCP. Devuelve el mensaje del servidor."""
+        return self.query(f"host:disconnect:{serial}")
+
+    def kill_server(self, timeout: Optional[float] = None):
+        """Pide al servidor ADB que termine (equivalente a 'adb kill-server')."""
+        self.close()
+        sock = self._open_service("host:kill", timeout)
+        self._slots.release()
+        sock.close()
+
+    def is_port_open(self, timeout: float = 0.1) -> bool:
+        """True si algo acepta conexiones en el puerto del servidor (sin enviar ninguna petición)."""
+        try:
+            socket.create_connection((self.host, self.port), timeout=timeout).close()
+            return True
+        except OSError:
+            return False
+
+    def wait_for_shutdown(self, timeout: float = 3.0, interval: float = 0.02) -> bool:
+        """Sondea el puerto hasta que deje de aceptar conexiones. Devuelve False si vence el plazo."""
+        deadline = time.monotonic() + timeout
+        while self.is_port_open(min(interval * 5, 0.5)):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+        return True
+
+    def wait_for_server(self, timeout: float = 5.0, interval: float = 0.02) -> bool:
+        """Sondea host:version hasta que el servidor responda. Devuelve False si vence el plazo."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.query("host:version", timeout=max(0.05, min(1.0, deadline - time.monotonic())))
+                return True
+            except AdbError:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def shell(self, serial: Optional[str], command: str, timeout: Optional[float] = None) -> str:
+        """
+        Ejecuta un comando shell en el dispositivo y devuelve su salida completa.
+
+        Args:
+            serial: Serial del dispositivo, o None para el único conectado.
+            command: Comando a ejecutar en el dispositivo.
+        """
+        transport = f"host:transport:{serial}" if serial else "host:transport-any"
+        started = time.perf_counter()
+        ok = False
+        try:
+            sock = self._open_service(transport, timeout)
+            try:
+                self._send_request(sock, f"shell:{command}")
+                chunks = []
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                ok = True
+                return b"".join(chunks).decode("utf-8", errors="replace")
+            except socket.timeout as e:
+                raise AdbError(f"Timeout ejecutando '{command}' en {serial or 'dispositivo'}") from e
+            except ConnectionError as e:
+                raise AdbServerUnavailableError(f"Conexión con el servidor ADB perdida: {e}") from e
+            except OSError as e:
+                raise AdbError(f"Error ejecutando '{command}' en {serial or 'dispositivo'}: {e}") from e
+            finally:
+                sock.close()
+                self._slots.release()
+        finally:
+            self._observe("shell:", started, ok)
+
+    def is_server_running(self) -> bool:
+        """True si el servidor ADB responde a host:version."""
+        try:
+            self.version()
+            return True
+        except AdbError:
+            return False
+
+
+@dataclass
+class DeviceEvent:
+    """Cambio en la tabla de dispositivos detectado por DeviceTracker."""
+    kind: str  # "added", "removed" o "state_changed"
+    device: AdbDevice
+    previous_state: Optional[str] = None
+
+
+class DeviceTracker:
+    """
+    Vigila los dispositivos con host:track-devices-l sin hacer sondeos periódicos.
+
+    El servidor ADB envía la lista completa cada vez que algo cambia; el tracker
+    la compara con su tabla en memoria y notifica a los suscriptores con eventos
+    DeviceEvent. Los callbacks se ejecutan en el hilo del tracker.
+    """
+
+    def __init__(self, client: Optional[AdbClient] = None, reconnect_delay: float = 0.5,
+                 max_reconnect_delay: float = 5.0):
+        self.client = client or AdbClient()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._devices: Dict[str, AdbDevice] = {}
+        self._subscribers: List = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._ready_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sock: Optional[socket.socket] = None
+
+    def subscribe(self, callback):
+        """
+        Registra un callback(DeviceEvent). Devuelve una función para cancelar la suscripción.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def devices(self) -> List[AdbDevice]:
+        """Copia de la tabla actual de dispositivos."""
+        with self._lock:
+            return list(self._devices.values())
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Espera a recibir la primera lista del servidor."""
+        return self._ready_event.wait(timeout)
+
+    def start(self):
+        """Arranca el hilo de seguimiento (no hace nada si ya está en marcha)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="adb-device-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Detiene el seguimiento y cierra el stream con el servidor."""
+        self._stop_event.set()
+        sock = self._sock
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            try:
+                self._sock = self._open_stream()
+                delay = self.reconnect_delay
+                while not self._stop_event.is_set():
+                    payload = AdbClient._read_length_prefixed(self._sock)
+                    self._apply_snapshot(parse_device_list(payload, long_format=True))
+                    self._ready_event.set()
+            except (AdbError, OSError):
+                pass
+            finally:
+                if self._sock:
+                    self._sock.close()
+                    self._sock = None
+            if self._stop_event.is_set():
+                break
+            # Sin servidor no hay dispositivos utilizables
+            self._apply_snapshot([])
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _open_stream(self) -> socket.socket:
+        sock = self.client._open_socket()
+        try:
+            try:
+                AdbClient._send_request(sock, "host:track-devices-l")
+            except AdbConnectionClosedError:
+                raise
+            except AdbError:
+                # Servidores antiguos sin la variante -l
+                sock.close()
+                sock = self.client._open_socket()
+                AdbClient._send_request(sock, "host:track-devices")
+        except BaseException:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        return sock
+
+    def _apply_snapshot(self, snapshot: List[AdbDevice]):
+        events = []
+        with self._lock:
+            current = {device.serial: device for device in snapshot}
+            for serial, device in current.items():
+                previous = self._devices.get(serial)
+                if previous is None:
+                    events.append(DeviceEvent("added", device))
+                elif previous.state != device.state:
+                    events.append(DeviceEvent("state_changed", device, previous.state))
+            for serial, device in self._devices.items():
+                if serial not in current:
+                    events.append(DeviceEvent("removed", device, device.state))
+            self._devices = current
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception:
+                    pass  # Un suscriptor defectuoso no debe detener el seguimiento
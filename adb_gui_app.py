@@ -1,11 +1,44 @@
 import customtkinter
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 import queue
 import subprocess
 import re
 import os
+import time
+
+APP_START_TIME = time.perf_counter() # Referencia para medir las fases de arranque
+
+# Log de actividad: líneas retenidas en pantalla y ritmo de refresco del widget
+LOG_MAX_LINES = 5000
+LOG_BATCH_MAX = 20000 # Mensajes extraídos de la cola por ciclo como máximo
+LOG_POLL_FAST_MS = 20 # Intervalo mientras quedan mensajes pendientes
+LOG_POLL_IDLE_MS = 100
+LOG_STATS_INTERVAL = 5.0 # Segundos entre avisos de mensajes descartados/agrupados
+
+from wifi_tools import split_targets
+from gui_tasks import TaskRunner
+from launch_profiles import BUILTIN_PROFILES
+from stream_metrics import format_metrics
+
+NO_PROFILE = "Ninguno"
+
+# Menú de diagnóstico (informe de tiempos de las llamadas a adb/scrcpy)
+DIAGNOSTICS_MENU = "Diagnóstico..."
+DIAGNOSTICS_TIMINGS = "Informe de tiempos"
+DIAGNOSTICS_TIMINGS_JSON = "Exportar tiempos (JSON)"
+DIAGNOSTICS_WIFI_POOL = "Conexiones Wi-Fi mantenidas"
+DIAGNOSTICS_WIFI_DISCONNECT = "Desconectar todo el Wi-Fi"
+
+# Plazos máximos (segundos) de las tareas en segundo plano
+TASK_TIMEOUT_SCAN = 30
+TASK_TIMEOUT_CONNECT = 30
+TASK_TIMEOUT_ADB_RESTART = 60
+TASK_TIMEOUT_NETWORK_SCAN = 120
+TASK_TIMEOUT_MIRROR = 60
+
+METRICS_REFRESH_MS = 1000 # Refresco de la lectura de FPS por dispositivo
 
 # Placeholder para la clase AndroidMirror que se importaría de adb_script_core.py
 # En un escenario real, esta clase provendría de: from adb_script_core import AndroidMirror
@@ -139,7 +172,19 @@ class App(customtkinter.CTk):
         customtkinter.set_default_color_theme("blue") # Themes: blue (default), dark-blue, green
 
         self.log_queue = queue.Queue()
-        self.after(100, self.process_log_queue)
+        self.log_stats = {"rendered": 0, "coalesced": 0, "dropped": 0, "trimmed": 0}
+        self._log_stats_reported = (0, 0)
+        self._log_stats_last_report = time.monotonic()
+        self.after(LOG_POLL_IDLE_MS, self.process_log_queue)
+        # Instantáneas de dispositivos enviadas por el DeviceTracker (hilo propio)
+        self.device_queue = queue.Queue()
+        self.after(50, self.process_device_queue)
+        # Actualizaciones de widgets pedidas desde hilos de fondo (Tk no es seguro entre hilos)
+        self.ui_queue = queue.Queue()
+        self.after(50, self.process_ui_queue)
+        # Grupo acotado de hilos para las acciones de los botones; los resultados vuelven por ui_queue
+        self.tasks = TaskRunner(dispatch=self.call_in_ui, log_callback=self.log_message)
+        self.after(METRICS_REFRESH_MS, self.process_metrics)
 
         self.is_fullscreen = False
         self.bind("<F11>", self.toggle_fullscreen)
@@ -172,20 +217,181 @@ class App(customtkinter.CTk):
         self._create_widgets()
         # self.android_mirror.check_dependencies() # Se llamará explícitamente después de la asignación completa en __main__
 
+    def process_metrics(self):
+        """Actualiza la lectura de FPS de las sesiones lanzadas con métricas (solo lectura, hilo de Tk)."""
+        label = getattr(self, "metrics_label", None)
+        get_metrics = getattr(self.android_mirror, "get_stream_metrics", None)
+        if label is not None and get_metrics is not None:
+            lines = [format_metrics(snapshot) for snapshot in get_metrics() if snapshot["running"]]
+            label.configure(text="\n".join(lines))
+        self.after(METRICS_REFRESH_MS, self.process_metrics)
+
     def log_message(self, message):
         self.log_queue.put(message)
 
     def process_log_queue(self):
+        """
+        Vuelca la cola de log en lotes: una sola inserción y un solo auto-scroll por
+        ciclo, con el historial limitado a LOG_MAX_LINES líneas. El intervalo se
+        acorta mientras quedan mensajes pendientes.
+        """
+        messages = []
+        try:
+            while len(messages) < LOG_BATCH_MAX:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        lines = self._coalesce_log_messages(messages)
+        if len(lines) > LOG_MAX_LINES:
+            # Lo que no cabe en el historial no se llega a dibujar
+            self.log_stats["dropped"] += len(lines) - LOG_MAX_LINES
+            lines = lines[-LOG_MAX_LINES:]
+        report = self._log_stats_report()
+        if report:
+            lines.append(report)
+
+        if lines:
+            self.log_area.configure(state='normal')
+            self.log_area.insert(tk.END, "\n".join(lines) + "\n")
+            self._trim_log_area()
+            self.log_area.configure(state='disabled')
+            self.log_area.see(tk.END) # Auto-scroll
+            self.log_stats["rendered"] += len(lines)
+
+        pending = len(messages) >= LOG_BATCH_MAX or not self.log_queue.empty()
+        self.after(LOG_POLL_FAST_MS if pending else LOG_POLL_IDLE_MS, self.process_log_queue) # Re-programar
+
+    def _coalesce_log_messages(self, messages):
+        """Agrupa mensajes consecutivos idénticos en una sola línea "mensaje (xN)"."""
+        lines = []
+        previous, repeats = None, 0
+        for message in messages:
+            if message == previous:
+                repeats += 1
+                continue
+            if previous is not None:
+                lines.append(previous if repeats == 1 else f"{previous} (x{repeats})")
+            previous, repeats = message, 1
+        if previous is not None:
+            lines.append(previous if repeats == 1 else f"{previous} (x{repeats})")
+        self.log_stats["coalesced"] += len(messages) - len(lines)
+        return lines
+
+    def _trim_log_area(self):
+        line_count = int(self.log_area.index("end-1c").split(".")[0])
+        excess = line_count - LOG_MAX_LINES
+        if excess > 0:
+            self.log_area.delete("1.0", f"{excess + 1}.0")
+            self.log_stats["trimmed"] += excess
+
+    def _log_stats_report(self):
+        """Línea de aviso si desde el último informe se descartaron o agruparon mensajes."""
+        now = time.monotonic()
+        if now - self._log_stats_last_report < LOG_STATS_INTERVAL:
+            return None
+        current = (self.log_stats["dropped"], self.log_stats["coalesced"])
+        if current == self._log_stats_reported:
+            return None
+        dropped = current[0] - self._log_stats_reported[0]
+        coalesced = current[1] - self._log_stats_reported[1]
+        self._log_stats_reported, self._log_stats_last_report = current, now
+        return f"[log] {dropped} mensajes descartados y {coalesced} agrupados en los últimos {LOG_STATS_INTERVAL:.0f}s."
+
+    def process_device_queue(self):
+        devices = None
+        try:
+            while True:
+                devices = self.device_queue.get_nowait() # Solo importa la instantánea más reciente
+        except queue.Empty:
+            pass
+        if devices is not None:
+            self._render_devices(devices)
+        self.after(50, self.process_device_queue)
+
+    def call_in_ui(self, func, *args, **kwargs):
+        """Ejecuta func(*args, **kwargs) en el hilo de Tk desde cualquier hilo."""
+        self.ui_queue.put((func, args, kwargs))
+
+    def process_ui_queue(self):
         try:
             while True:
-                message = self.log_queue.get_nowait()
-                self.log_area.configure(state='normal')
-                self.log_area.insert(tk.END, message + "\n")
-                self.log_area.configure(state='disabled')
-                self.log_area.see(tk.END) # Auto-scroll
+                func, args, kwargs = self.ui_queue.get_nowait()
+                func(*args, **kwargs)
         except queue.Empty:
             pass
-        self.after(100, self.process_log_queue) # Re-programar
+        self.after(50, self.process_ui_queue)
+
+    def start_startup_pipeline(self):
+        """
+        Arranque en segundo plano: la ventana ya está visible y la verificación de
+        dependencias, la preparación del servidor ADB y el primer escaneo corren en
+        paralelo, actualizando los indicadores de estado a medida que terminan.
+        """
+        self.startup_timings = {"ventana": time.perf_counter() - APP_START_TIME}
+        self._startup_lock = threading.Lock()
+        self.log_message(f"⏱️  Ventana lista en {self.startup_timings['ventana']:.2f}s. Preparando entorno...")
+        self.deps_status_label.configure(text="Dependencias: Verificando...")
+        self.refresh_profiles()
+        self.adb_status_label.configure(text="Estado ADB: Iniciando...")
+        self.run_threaded(self._startup_dependencies_task, key="startup-deps")
+        self.run_threaded(self._startup_adb_task, key="startup-adb")
+
+    def _record_startup_phase(self, phase):
+        elapsed = time.perf_counter() - APP_START_TIME
+        with self._startup_lock:
+            self.startup_timings[phase] = elapsed
+            finished = {"dependencias", "servidor ADB", "escaneo inicial"} <= self.startup_timings.keys()
+        self.log_message(f"⏱️  Arranque - {phase}: {elapsed:.2f}s")
+        if finished:
+            summary = ", ".join(f"{name} {value:.2f}s" for name, value in self.startup_timings.items())
+            self.log_message(f"🚀 Arranque completado ({summary}).")
+
+    def _startup_dependencies_task(self):
+        ok = self.android_mirror.check_dependencies()
+        self.call_in_ui(self.deps_status_label.configure, text=f"Dependencias: {'OK' if ok else 'Error'}")
+        self._record_startup_phase("dependencias")
+
+    def _startup_adb_task(self):
+        ready = self.android_mirror.ensure_adb_server() if hasattr(self.android_mirror, 'ensure_adb_server') else True
+        self.call_in_ui(self.adb_status_label.configure, text=f"Estado ADB: {'OK' if ready else 'Error'}")
+        self._record_startup_phase("servidor ADB")
+        if ready and self.start_device_watch():
+            # El tracker entrega la lista inicial en cuanto el servidor responde
+            self.android_mirror.device_tracker.wait_ready(timeout=5)
+        else:
+            self._scan_devices_task()
+        self._record_startup_phase("escaneo inicial")
+
+    def start_device_watch(self):
+        """Actualiza la lista de dispositivos por eventos del servidor ADB en lugar de escanear a mano."""
+        if not hasattr(self.android_mirror, 'start_device_tracking'):
+            return False
+        tracker = self.android_mirror.start_device_tracking(callback=self._on_device_event)
+        if not tracker:
+            return False
+        self.log_message("Seguimiento de dispositivos en tiempo real activado.")
+        return True
+
+    def _on_device_event(self, event):
+        tracker = self.android_mirror.device_tracker
+        if tracker:
+            self.device_queue.put([device.as_tuple() for device in tracker.devices()])
+
+    def _render_devices(self, devices):
+        """Redibuja el Listbox conservando la selección actual si el dispositivo sigue presente."""
+        selected = None
+        selected_indices = self.devices_listbox.curselection()
+        if selected_indices:
+            selected = self.devices_listbox.get(selected_indices[0]).split(" ")[0]
+        self.devices_listbox.delete(0, tk.END)
+        if devices:
+            for i, (serial, status) in enumerate(devices):
+                self.devices_listbox.insert(tk.END, f"{serial} ({status})")
+                if serial == selected:
+                    self.devices_listbox.selection_set(i)
+        else:
+            self.devices_listbox.insert(tk.END, "No se encontraron dispositivos o error.")
 
     def _create_widgets(self):
         # --- Controles ADB (Panel Izquierdo) ---
@@ -199,6 +405,11 @@ class App(customtkinter.CTk):
         # Indicador de estado ADB (simplificado)
         self.adb_status_label = customtkinter.CTkLabel(adb_frame, text="Estado ADB: Desconocido", font=customtkinter.CTkFont(size=12))
         self.adb_status_label.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.deps_status_label = customtkinter.CTkLabel(adb_frame, text="Dependencias: Pendiente", font=customtkinter.CTkFont(size=12))
+        self.deps_status_label.grid(row=2, column=0, columnspan=2, padx=5, pady=(0,5), sticky="ew")
+        self.diagnostics_var = tk.StringVar(value=DIAGNOSTICS_MENU)
+        self.diagnostics_menu = customtkinter.CTkOptionMenu(adb_frame, values=[DIAGNOSTICS_TIMINGS, DIAGNOSTICS_TIMINGS_JSON, DIAGNOSTICS_WIFI_POOL, DIAGNOSTICS_WIFI_DISCONNECT], variable=self.diagnostics_var, command=self.on_diagnostics_selected, corner_radius=8)
+        self.diagnostics_menu.grid(row=3, column=0, columnspan=2, padx=5, pady=(0,5), sticky="ew")
 
         # --- Gestión de Dispositivos (Panel Izquierdo) ---
         devices_frame = customtkinter.CTkFrame(self.left_panel, corner_radius=10) # Aumentar corner_radius
@@ -225,6 +436,14 @@ class App(customtkinter.CTk):
         self.connect_selected_btn = customtkinter.CTkButton(devices_frame, text="Iniciar Mirroring Dispositivo Seleccionado", command=self.start_mirroring_selected_threaded, corner_radius=8)
         self.connect_selected_btn.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
+        self.stop_selected_btn = customtkinter.CTkButton(devices_frame, text="Detener Mirroring Seleccionado", command=self.stop_mirroring_selected_threaded, corner_radius=8)
+        self.stop_selected_btn.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+
+        # Lectura de FPS/descartes por dispositivo (sesiones con "Métricas de FPS")
+        self.metrics_label = customtkinter.CTkLabel(devices_frame, text="", justify="left", anchor="w",
+                                                    font=customtkinter.CTkFont(size=11))
+        self.metrics_label.grid(row=4, column=0, columnspan=2, padx=5, pady=(0, 5), sticky="ew")
+
         # --- Conexión Manual IP (Panel Izquierdo) ---
         ip_conn_frame = customtkinter.CTkFrame(self.left_panel, corner_radius=10) # Aumentar corner_radius
         ip_conn_frame.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
@@ -232,10 +451,12 @@ class App(customtkinter.CTk):
 
         customtkinter.CTkLabel(ip_conn_frame, text="Conexión Manual IP", font=customtkinter.CTkFont(weight="bold", size=16)).grid(row=0, column=0, columnspan=2, pady=(0,10))
         customtkinter.CTkLabel(ip_conn_frame, text="IP:Puerto", font=customtkinter.CTkFont(size=12)).grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        self.ip_entry = customtkinter.CTkEntry(ip_conn_frame, placeholder_text="Ej: 192.168.1.100:5555", corner_radius=8)
+        self.ip_entry = customtkinter.CTkEntry(ip_conn_frame, placeholder_text="Ej: 192.168.1.100:5555 (varias separadas por comas)", corner_radius=8)
         self.ip_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
         self.connect_ip_btn = customtkinter.CTkButton(ip_conn_frame, text="Conectar por IP", command=self.connect_ip_threaded, corner_radius=8)
         self.connect_ip_btn.grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        self.scan_network_btn = customtkinter.CTkButton(ip_conn_frame, text="Buscar en Red (CIDR o /24 local)", command=self.scan_network_threaded, corner_radius=8)
+        self.scan_network_btn.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
 
         # --- Opciones de Scrcpy (Panel Derecho) ---
         # Usar CTkScrollableFrame para las opciones de Scrcpy para manejar el desbordamiento
@@ -246,6 +467,11 @@ class App(customtkinter.CTk):
         # El frame interno del CTkScrollableFrame es el que contendrá los widgets
         scrcpy_options_frame = scrcpy_scrollable_frame
 
+        self.scrcpy_profile_var = tk.StringVar(value=NO_PROFILE)
+        customtkinter.CTkLabel(scrcpy_options_frame, text="Perfil:", font=customtkinter.CTkFont(size=12)).grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.profile_menu = customtkinter.CTkOptionMenu(scrcpy_options_frame, values=[NO_PROFILE] + list(BUILTIN_PROFILES), variable=self.scrcpy_profile_var, command=self.on_profile_selected, corner_radius=8)
+        self.profile_menu.grid(row=0, column=1, padx=5, pady=2, sticky="ew")
+
         self.scrcpy_max_size_var = tk.StringVar(value="1024") # Default max-size
         customtkinter.CTkLabel(scrcpy_options_frame, text="Max Size (ej: 1024, 0 para original):", font=customtkinter.CTkFont(size=12)).grid(row=1, column=0, padx=5, pady=2, sticky="w")
         customtkinter.CTkEntry(scrcpy_options_frame, textvariable=self.scrcpy_max_size_var, corner_radius=8).grid(row=1, column=1, padx=5, pady=2, sticky="ew")
@@ -266,6 +492,15 @@ class App(customtkinter.CTk):
         self.scrcpy_fullscreen_var = tk.BooleanVar()
         customtkinter.CTkCheckBox(scrcpy_options_frame, text="Scrcpy en Pantalla Completa", variable=self.scrcpy_fullscreen_var, corner_radius=8, font=customtkinter.CTkFont(size=12)).grid(row=6, column=0, columnspan=2, padx=5, pady=2, sticky="w")
 
+        self.scrcpy_adaptive_var = tk.BooleanVar()
+        customtkinter.CTkCheckBox(scrcpy_options_frame, text="Calidad Adaptativa (solo Wi-Fi)", variable=self.scrcpy_adaptive_var, corner_radius=8, font=customtkinter.CTkFont(size=12)).grid(row=7, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
+        self.scrcpy_fps_var = tk.BooleanVar()
+        customtkinter.CTkCheckBox(scrcpy_options_frame, text="Métricas de FPS", variable=self.scrcpy_fps_var, corner_radius=8, font=customtkinter.CTkFont(size=12)).grid(row=8, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
+        self.scrcpy_reconnect_var = tk.BooleanVar()
+        customtkinter.CTkCheckBox(scrcpy_options_frame, text="Reconexión Automática (solo Wi-Fi)", variable=self.scrcpy_reconnect_var, corner_radius=8, font=customtkinter.CTkFont(size=12)).grid(row=9, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+
         # Asegurar que la columna 1 del frame de opciones se expanda para los Entry widgets
         scrcpy_options_frame.grid_columnconfigure(1, weight=1)
 
@@ -292,6 +527,25 @@ class App(customtkinter.CTk):
         # Aplicar colores de CustomTkinter al ScrolledText (se sobrescribirán los de arriba si el tema es Light)
         self._configure_scrolledtext_colors()
 
+    def refresh_profiles(self):
+        """Incluye en el selector los perfiles de usuario cargados por AndroidMirror."""
+        profiles = getattr(self.android_mirror, 'profiles', None)
+        if profiles:
+            self.profile_menu.configure(values=[NO_PROFILE] + list(profiles))
+
+    def on_profile_selected(self, name):
+        """Muestra en los campos la resolución y el bitrate del perfil (se pueden retocar)."""
+        if name == NO_PROFILE:
+            self.log_message("Perfil de lanzamiento desactivado.")
+            return
+        profiles = getattr(self.android_mirror, 'profiles', None) or BUILTIN_PROFILES
+        profile = profiles.get(name, {})
+        if "max_size" in profile:
+            self.scrcpy_max_size_var.set(str(profile["max_size"]))
+        if "bit_rate" in profile:
+            self.scrcpy_bit_rate_var.set(profile["bit_rate"])
+        self.log_message(f"Perfil seleccionado: {name} - {profile.get('description', '')}")
+
     def _apply_appearance_mode_to_tk_widget(self, property_name):
         # Intenta obtener colores de CTk para widgets Tk estándar
         # Esto es una aproximación, puede no ser perfecto para todos los widgets/temas
@@ -315,6 +569,40 @@ class App(customtkinter.CTk):
                                            selectbackground=self._apply_appearance_mode_to_tk_widget("select_bg"),
                                            selectforeground=self._apply_appearance_mode_to_tk_widget("select_fg")) # Añadir selectforeground
 
+    def on_diagnostics_selected(self, choice):
+        self.diagnostics_var.set(DIAGNOSTICS_MENU) # Se comporta como un menú de acciones, no como un selector
+        if choice in (DIAGNOSTICS_WIFI_POOL, DIAGNOSTICS_WIFI_DISCONNECT):
+            self.on_wifi_pool_selected(choice)
+            return
+        if not hasattr(self.android_mirror, "get_command_timings"):
+            self.log_message("El informe de tiempos no está disponible con esta versión del núcleo.")
+            return
+        if choice == DIAGNOSTICS_TIMINGS:
+            self.log_message(self.android_mirror.command_timings_report())
+        elif choice == DIAGNOSTICS_TIMINGS_JSON:
+            path = filedialog.asksaveasfilename(title="Guardar informe de tiempos", defaultextension=".json",
+                                                initialfile="tiempos_adb_scrcpy.json",
+                                                filetypes=[("JSON", "*.json"), ("Todos los archivos", "*.*")])
+            if path:
+                self.android_mirror.save_command_timings(path)
+
+    def on_wifi_pool_selected(self, choice):
+        if not hasattr(self.android_mirror, "get_wifi_pool_status"):
+            self.log_message("El pool de conexiones Wi-Fi no está disponible con esta versión del núcleo.")
+            return
+        if choice == DIAGNOSTICS_WIFI_DISCONNECT:
+            self.run_threaded(self.android_mirror.disconnect_wifi, key="wifi_disconnect")
+            return
+        status = self.android_mirror.get_wifi_pool_status()
+        if not status["connections"]:
+            self.log_message("🔗 No hay conexiones Wi-Fi mantenidas.")
+            return
+        self.log_message(f"🔗 Conexiones Wi-Fi mantenidas ({len(status['connections'])}):")
+        for row in status["connections"]:
+            keepalive = (f"keep-alive hace {row['last_keepalive_seconds_ago']:.0f}s"
+                         if row["last_keepalive_seconds_ago"] is not None else "sin keep-alive aún")
+            self.log_message(f"   {row['serial']:22} {row['state']:10} inactiva {row['idle_seconds']:.0f}s · {keepalive}")
+
     def change_appearance_mode(self, new_mode):
         customtkinter.set_appearance_mode(new_mode)
         self._configure_scrolledtext_colors() # Re-aplicar colores a widgets Tk
@@ -333,36 +621,40 @@ class App(customtkinter.CTk):
         self.log_message(f"Modo pantalla completa: {'Activado' if self.is_fullscreen else 'Desactivado'}")
         return "break" # Para evitar que el evento se propague más
 
-    def run_threaded(self, target_func, *args):
-        thread = threading.Thread(target=target_func, args=args, daemon=True)
-        thread.start()
+    def run_threaded(self, target_func, *args, key=None, on_done=None, on_error=None, timeout=None):
+        """
+        Ejecuta target_func en el grupo de hilos de la GUI.
+
+        Las peticiones con la misma `key` que llegan mientras una está en curso se
+        unen a ella; on_done/on_error se ejecutan en el hilo de Tk.
+        """
+        return self.tasks.submit(target_func, *args, key=key, on_done=on_done,
+                                 on_error=on_error, timeout=timeout)
 
     def restart_adb_server_threaded(self):
-        self.run_threaded(self._restart_adb_server_task)
+        self.run_threaded(self._restart_adb_server_task, key="adb-restart",
+                          on_done=self._on_adb_restarted, timeout=TASK_TIMEOUT_ADB_RESTART)
 
     def _restart_adb_server_task(self):
         self.log_message("Solicitando reinicio de ADB...")
         success, message = self.android_mirror.restart_adb_server()
         self.log_message(message)
+        return success
+
+    def _on_adb_restarted(self, success):
         self.adb_status_label.configure(text=f"Estado ADB: {'OK' if success else 'Error'}")
         if success:
             self.scan_devices_threaded() # Escanear después de reiniciar
 
     def scan_devices_threaded(self):
-        self.run_threaded(self._scan_devices_task)
+        if self.tasks.in_flight("scan-devices"):
+            self.log_message("Ya hay un escaneo en curso; se reutilizará su resultado.")
+        self.run_threaded(self._scan_devices_task, key="scan-devices", timeout=TASK_TIMEOUT_SCAN)
 
     def _scan_devices_task(self):
         self.log_message("Solicitando escaneo de dispositivos...")
-        self.devices_listbox.delete(0, tk.END)
         devices = self.android_mirror.get_connected_devices()
-        if devices:
-            for i, (serial, status) in enumerate(devices):
-                self.devices_listbox.insert(tk.END, f"{serial} ({status})")
-                # Colorear según estado (opcional, requiere más lógica de tk.Listbox)
-                # if status == "unauthorized": self.devices_listbox.itemconfig(i, {'fg': 'orange'})
-                # elif status == "offline": self.devices_listbox.itemconfig(i, {'fg': 'red'})
-        else:
-            self.devices_listbox.insert(tk.END, "No se encontraron dispositivos o error.")
+        self.device_queue.put(devices) # El hilo de Tk redibuja la lista
         self.log_message("Escaneo de dispositivos completado.")
 
     def connect_ip_threaded(self):
@@ -371,7 +663,21 @@ class App(customtkinter.CTk):
             messagebox.showwarning("Entrada Vacía", "Por favor, introduce una dirección IP y puerto.")
             self.log_message("Intento de conexión IP sin dirección.")
             return
-        self.run_threaded(self._connect_ip_task, ip_address)
+        targets = split_targets(ip_address)
+        if len(targets) > 1:
+            if not hasattr(self.android_mirror, 'connect_wifi_many'):
+                self.log_message("La instancia actual de AndroidMirror no admite conexión masiva.")
+                return
+            self.run_threaded(self._connect_many_task, targets, key="connect-many:" + ",".join(targets))
+            return
+        self.run_threaded(self._connect_ip_task, ip_address, key=f"connect:{ip_address.strip()}",
+                          timeout=TASK_TIMEOUT_CONNECT)
+
+    def _connect_many_task(self, targets):
+        self.log_message(f"Solicitando conexión masiva a {len(targets)} destinos...")
+        results = self.android_mirror.connect_wifi_many(targets) # La tabla de resultados se loguea dentro
+        if any(row["connected"] for row in results):
+            self.scan_devices_threaded()
 
     def _connect_ip_task(self, ip_address):
         self.log_message(f"Solicitando conexión a {ip_address}...")
@@ -387,6 +693,20 @@ class App(customtkinter.CTk):
             self.log_message(f"Falló la conexión Wi-Fi con {ip_address}.")
             # El mensaje de error específico ya fue logueado por AndroidMirror
 
+    def scan_network_threaded(self):
+        if not hasattr(self.android_mirror, 'discover_wifi_devices'):
+            self.log_message("La instancia actual de AndroidMirror no admite búsqueda en red.")
+            return
+        entry = self.ip_entry.get().strip()
+        network = entry if "/" in entry else None # Sin CIDR explícito se usa la /24 local
+        self.run_threaded(self._scan_network_task, network, key=f"scan-network:{network}",
+                          timeout=TASK_TIMEOUT_NETWORK_SCAN)
+
+    def _scan_network_task(self, network):
+        hits = self.android_mirror.discover_wifi_devices(network, verify_banner=True, connect=True)
+        if hits:
+            self.scan_devices_threaded()
+
     def start_mirroring_selected_threaded(self):
         selected_indices = self.devices_listbox.curselection()
         if not selected_indices:
@@ -433,8 +753,13 @@ class App(customtkinter.CTk):
             "no_control": self.scrcpy_no_control_var.get(),
             "no_audio": self.scrcpy_no_audio_var.get(),
             "no_video_optimization": self.scrcpy_no_video_opt_var.get(),
-            "fullscreen_scrcpy": self.scrcpy_fullscreen_var.get()
+            "fullscreen_scrcpy": self.scrcpy_fullscreen_var.get(),
+            "adaptive_quality": self.scrcpy_adaptive_var.get(),
+            "fps_metrics": self.scrcpy_fps_var.get(),
+            "auto_reconnect": self.scrcpy_reconnect_var.get()
         }
+        if self.scrcpy_profile_var.get() != NO_PROFILE:
+            options["profile"] = self.scrcpy_profile_var.get()
         # Validar max_size (debe ser numérico o 0)
         if options["max_size"]:
             try:
@@ -447,10 +772,23 @@ class App(customtkinter.CTk):
                 self.log_message("Error en valor de Max Size para scrcpy.")
                 return
 
-        self.run_threaded(self.android_mirror.start_mirroring, device_serial, options)
+        self.run_threaded(self.android_mirror.start_mirroring, device_serial, options,
+                          key=f"mirror:{device_serial}", timeout=TASK_TIMEOUT_MIRROR)
+
+    def stop_mirroring_selected_threaded(self):
+        selected_indices = self.devices_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("Sin Selección", "Por favor, selecciona un dispositivo de la lista.")
+            return
+        device_serial = self.devices_listbox.get(selected_indices[0]).split(" ")[0]
+        if not hasattr(self.android_mirror, 'sessions'):
+            self.log_message("La instancia actual de AndroidMirror no gestiona sesiones por dispositivo.")
+            return
+        self.run_threaded(self.android_mirror.stop_scrcpy, device_serial, key=f"stop:{device_serial}")
 
     def on_closing(self):
         self.log_message("Cerrando aplicación...")
+        self.tasks.shutdown() # Descarta las tareas aún en cola
         if hasattr(self.android_mirror, 'cleanup') and callable(self.android_mirror.cleanup):
             self.android_mirror.cleanup()
         self.destroy()
@@ -482,9 +820,9 @@ if __name__ == "__main__":
             placeholder_instance = AndroidMirrorPlaceholder(log_callback=app_instance.log_message)
             app_instance.android_mirror = placeholder_instance
 
-    # Ahora que self.android_mirror está asignado, llamar a check_dependencies
+    # Ahora que self.android_mirror está asignado, arrancar en segundo plano una vez visible la ventana
     if app_instance.android_mirror:
-        app_instance.android_mirror.check_dependencies()
+        app_instance.after_idle(app_instance.start_startup_pipeline)
     else:
         app_instance.log_message("ERROR CRÍTICO: No se pudo inicializar una instancia de AndroidMirror (real o placeholder).")
 
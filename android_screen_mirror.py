@@ -15,70 +15,326 @@ import subprocess
 import sys
 import os
 import argparse
+import atexit
+import json
 import time
 import re
-from typing import Optional, List
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
+
+from adb_client import AdbClient, AdbError, AdbServerUnavailableError, DeviceTracker, DeviceEvent
+from wifi_tools import (parse_target, bulk_connect, format_connect_results, guess_local_network, SubnetScanner,
+                        DEFAULT_ADB_TCP_PORT, DEFAULT_PROBE_TIMEOUT, DEFAULT_CONNECT_WORKERS)
+from dependency_cache import JsonCache, probe_binary
+from device_capabilities import (DeviceCapabilityProbe, select_video_encoder, select_audio_codec,
+                                 DEFAULT_VIDEO_CODEC_PREFERENCE)
+from mirror_events import (LogEvent, EventBus, EventRingBuffer, JsonLinesSink, LogContext,
+                           StringCallbackAdapter, infer_level, log_phase)
+from launch_profiles import load_profiles, apply_profile, default_profiles_path
+from recording import (SegmentedRecorder, check_disk, parse_bit_rate, DEFAULT_SEGMENT_SECONDS,
+                       DEFAULT_SEGMENT_MAX_BYTES, DEFAULT_MIN_FREE_BYTES, DEFAULT_RECORD_FORMAT,
+                       DEFAULT_RECORD_BIT_RATE)
+from adaptive_quality import AdaptiveQualityController, DEFAULT_QUALITY_LADDER, DEFAULT_START_PRESET
+from scrcpy_session import (ScrcpySession, SessionManager, READY_PATTERNS, HEADLESS_READY_PATTERNS,
+                            DEFAULT_LAUNCH_TIMEOUT, DEFAULT_BUFFER_LINES, DEFAULT_LOG_RATE)
+from stream_metrics import format_metrics
+from command_runner import CommandRunner, format_timings, DEFAULT_TOP
+from metrics_exporter import MetricsRegistry, MetricsServer, DEFAULT_METRICS_HOST, DEFAULT_METRICS_PORT
+from session_supervisor import SessionSupervisor, ReconnectPolicy
+from wifi_pool import WifiConnectionPool
+
+
+DEFAULT_RESTART_DEADLINE = 10.0 # Segundos máximos de un reinicio completo del servidor ADB
 
 
 class AndroidMirror:
     """Clase principal para gestionar la duplicación de pantalla y audio Android."""
     
-    def __init__(self, log_callback=None):
+    def __init__(self, log_callback=None, adb_client: Optional[AdbClient] = None, use_native_adb: bool = True,
+                 headless: bool = False, keep_wifi_connections: bool = True):
         self.device_ip: Optional[str] = None
+        self.device_port: int = DEFAULT_ADB_TCP_PORT
         self.connection_type: str = "usb"
+        # Sin ventana ni reproducción: para servidores, contenedores y CI sin X/Wayland
+        self.headless = headless
         self.scrcpy_process: Optional[subprocess.Popen] = None
-        self.log_callback = log_callback if log_callback else print # Usar print si no se provee callback
+        self.scrcpy_session: Optional[ScrcpySession] = None # Última sesión lanzada
+        # Los mensajes se publican como eventos estructurados (nivel, serial, fase, duración);
+        # el callback de texto recibido (o print) es un suscriptor más del bus.
+        self.events = EventBus()
+        self.event_buffer = EventRingBuffer()
+        self.events.subscribe(self.event_buffer)
+        self.events.subscribe(StringCallbackAdapter(log_callback if log_callback else print)) # Usar print si no se provee callback
+        self.log_context = LogContext()
+        # Todas las llamadas a adb/scrcpy pasan por aquí: tiempo, código de salida y fase de cada una
+        self.commands = CommandRunner(context=self.log_context, observer=self._observe_command)
+        self.json_log_sink: Optional[JsonLinesSink] = None
+        self.log_callback = self.emit # Compatible con el callback de texto original
+        # Sesiones scrcpy concurrentes, una por serial de dispositivo
+        self.sessions = SessionManager(log_callback=self.log_callback)
+        # Controladores de calidad adaptativa de las sesiones Wi-Fi, por serial
+        self.quality_controllers: Dict[str, AdaptiveQualityController] = {}
+        # Grabaciones segmentadas en curso, por serial
+        self.recorders: Dict[str, SegmentedRecorder] = {}
+        # Supervisores de reconexión automática de las sesiones Wi-Fi, por serial
+        self.supervisors: Dict[str, SessionSupervisor] = {}
+        # Cliente del protocolo host de ADB; si el servidor no responde se recurre al ejecutable `adb`
+        self.adb_client: Optional[AdbClient] = (adb_client or AdbClient()) if use_native_adb else None
+        # Métricas para Prometheus: se acumulan siempre (coste mínimo); el endpoint HTTP es opcional
+        self.metrics = MetricsRegistry()
+        self._init_metrics()
+        self.metrics_server: Optional[MetricsServer] = None
+        if self.adb_client and self.adb_client.observer is None:
+            self.adb_client.observer = self._observe_adb_request
+        self.device_tracker: Optional[DeviceTracker] = None
+        # Conexiones Wi-Fi que se mantienen entre sesiones (keep-alive); sin pool, cleanup desconecta
+        self.wifi_pool: Optional[WifiConnectionPool] = WifiConnectionPool(
+            connect=self._connect_wifi_target,
+            disconnect=self._adb_disconnect,
+            keepalive=self._wifi_keepalive,
+            device_state=self._device_state,
+            in_use=lambda serial: any(session.serial == serial for session in self.sessions.running()),
+            log_callback=functools.partial(self.emit, phase="wifi_pool")
+        ) if keep_wifi_connections else None
+        self.subnet_scanner = SubnetScanner() # Conserva la caché de barridos recientes
+        # Resultado de check_dependencies: ruta, versión y capacidades de adb y scrcpy
+        self.dependency_info: dict = {}
+        # Codificadores y pantallas de cada dispositivo (se sondean una vez y se guardan en disco)
+        self.device_capabilities = DeviceCapabilityProbe(self._get_build_fingerprint,
+                                                         JsonCache("device_capabilities.json"),
+                                                         run=self.commands.run)
+        # Perfiles de lanzamiento (incluidos + archivo del usuario)
+        self.profiles: Dict[str, dict] = {}
+        self.load_profiles()
         
-    def check_dependencies(self) -> bool:
+    def emit(self, message: str, level: Optional[str] = None, serial: Optional[str] = None,
+             phase: Optional[str] = None, duration: Optional[float] = None, **extra):
+        """
+        Publica un evento de log. Sin nivel explícito se deduce del texto; la fase,
+        el serial y la duración se toman del contexto activo (ver log_phase).
+        """
+        context_phase, context_serial, started = self.log_context.current()
+        if duration is None and started is not None:
+            duration = round(time.monotonic() - started, 4)
+        self.events.publish(LogEvent(
+            message=message,
+            level=level or infer_level(message),
+            serial=serial or context_serial,
+            phase=phase or context_phase,
+            duration=duration,
+            extra=extra
+        ))
+
+    def enable_json_log(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3):
+        """Escribe todos los eventos en un archivo JSON-lines con rotación por tamaño."""
+        self.disable_json_log()
+        self.json_log_sink = JsonLinesSink(path, max_bytes=max_bytes, backup_count=backup_count)
+        self._json_log_unsubscribe = self.events.subscribe(self.json_log_sink)
+
+    def disable_json_log(self):
+        if self.json_log_sink:
+            self._json_log_unsubscribe()
+            self.json_log_sink.close()
+            self.json_log_sink = None
+
+    def get_log_events(self, serial: Optional[str] = None, min_level: Optional[str] = None,
+                       phase: Optional[str] = None, limit: Optional[int] = None) -> List[LogEvent]:
+        """Eventos recientes filtrados por dispositivo, nivel mínimo y/o fase."""
+        return self.event_buffer.query(serial=serial, min_level=min_level, phase=phase, limit=limit)
+
+    def _init_metrics(self):
+        m = self.metrics
+        self._adb_request_seconds = m.histogram(
+            "android_mirror_adb_request_seconds", "Latencia de las peticiones al servidor ADB por servicio", ("command",))
+        self._adb_request_failures = m.counter(
+            "android_mirror_adb_request_failures_total", "Peticiones al servidor ADB fallidas por servicio", ("command",))
+        self._connect_attempts = m.counter("android_mirror_connect_attempts_total", "Intentos de 'adb connect'")
+        self._connect_failures = m.counter("android_mirror_connect_failures_total", "Intentos de 'adb connect' fallidos")
+        self._session_launches = m.counter(
+            "android_mirror_session_launches_total", "Lanzamientos de scrcpy por resultado (ready, running, failed)",
+            ("result",))
+        self._time_to_ready = m.histogram(
+            "android_mirror_session_time_to_ready_seconds", "Tiempo hasta que scrcpy confirma que está listo")
+        self._time_to_first_frame = m.histogram(
+            "android_mirror_session_time_to_first_frame_seconds", "Tiempo hasta el primer fotograma de scrcpy")
+        self._restarts = m.counter(
+            "android_mirror_restarts_total", "Reinicios por tipo (adb_server, adaptive, reconnect)", ("kind",))
+        self._reconnect_downtime = m.histogram(
+            "android_mirror_reconnect_downtime_seconds",
+            "Tiempo sin servicio por incidente de reconexión automática (recovered, gave_up)", ("result",),
+            buckets=(1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+        m.add_collector(self._collect_live_metrics)
+
+    def _observe_adb_request(self, command: str, seconds: float, ok: bool):
+        self._adb_request_seconds.observe(seconds, command=command)
+        if not ok:
+            self._adb_request_failures.inc(command=command)
+        self.commands.record(command, seconds, ok, kind="adb-server")
+
+    def _observe_command(self, record):
+        """Las llamadas al ejecutable adb cuentan también en la latencia de ADB (p. ej. "adb connect")."""
+        if record.kind == "run" and record.name.startswith("adb"):
+            self._adb_request_seconds.observe(record.duration, command=record.name)
+            if record.failed:
+                self._adb_request_failures.inc(command=record.name)
+
+    def get_command_timings(self, top: int = DEFAULT_TOP, include_records: bool = False) -> dict:
+        """Desglose por fase y por comando de las llamadas a adb/scrcpy y las `top` más lentas."""
+        return self.commands.summary(top=top, include_records=include_records)
+
+    def command_timings_report(self, top: int = DEFAULT_TOP) -> str:
+        """Informe de texto de get_command_timings()."""
+        return format_timings(self.get_command_timings(top))
+
+    def save_command_timings(self, path: str, top: int = DEFAULT_TOP) -> bool:
+        """Guarda el desglose de tiempos, con cada llamada registrada, en un archivo JSON."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.get_command_timings(top, include_records=True), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            self.log_callback(f"❌ No se pudo guardar el informe de tiempos en {path}: {e}")
+            return False
+        self.log_callback(f"⏱️  Informe de tiempos guardado en {path}")
+        return True
+
+    def _collect_live_metrics(self):
+        """Valores que ya mantienen sesiones, grabaciones y controladores; se leen al consultar /metrics."""
+        running = self.sessions.running()
+        streams = [snapshot for snapshot in self.get_stream_metrics() if snapshot["running"]]
+        label = lambda serial: {"serial": serial or "default"}
+        yield ("android_mirror_active_sessions", "gauge", "Sesiones scrcpy en ejecución", [({}, len(running))])
+        yield ("android_mirror_stream_fps", "gauge", "FPS del último informe de scrcpy por dispositivo",
+               [(label(snapshot["serial"]), snapshot["fps"]) for snapshot in streams])
+        yield ("android_mirror_stream_avg_fps", "gauge", "FPS medios en la ventana de métricas por dispositivo",
+               [(label(snapshot["serial"]), snapshot["avg_fps"]) for snapshot in streams])
+        yield ("android_mirror_stream_skipped_frames_total", "counter",
+               "Fotogramas descartados por scrcpy en la sesión actual por dispositivo",
+               [(label(snapshot["serial"]), snapshot["total_skipped"]) for snapshot in streams])
+        yield ("android_mirror_stream_stalled", "gauge", "1 si scrcpy dejó de informar FPS (imagen congelada)",
+               [(label(snapshot["serial"]), int(snapshot["stalled"])) for snapshot in streams])
+        yield ("android_mirror_recording_restarts_total", "counter",
+               "Segmentos reabiertos tras una salida inesperada de scrcpy por dispositivo",
+               [(label(serial), recorder.restarts) for serial, recorder in list(self.recorders.items())])
+        yield ("android_mirror_adaptive_level", "gauge", "Peldaño de calidad adaptativa (0 = máxima calidad)",
+               [(label(serial), controller.level) for serial, controller in list(self.quality_controllers.items())])
+        if self.wifi_pool:
+            pool = self.wifi_pool.status()
+            yield ("android_mirror_wifi_pool_connections", "gauge", "Conexiones Wi-Fi del pool por estado",
+                   [({"state": state}, sum(1 for row in pool["connections"] if row["state"] == state))
+                    for state in ("connected", "stale")])
+            yield ("android_mirror_wifi_pool_events_total", "counter",
+                   "Eventos del pool Wi-Fi (hits, misses, connects, keepalives, evictions...)",
+                   [({"event": event}, count) for event, count in pool["stats"].items()])
+
+    def start_metrics_server(self, port: int = DEFAULT_METRICS_PORT, host: str = DEFAULT_METRICS_HOST) -> Optional[str]:
+        """
+        Publica las métricas en http://host:port/metrics (formato de Prometheus).
+
+        Returns:
+            str: URL del endpoint, o None si no se pudo abrir el puerto.
+        """
+        self.stop_metrics_server()
+        server = MetricsServer(self.metrics, host=host, port=port)
+        try:
+            server.start()
+        except OSError as e:
+            self.log_callback(f"❌ No se pudo abrir el endpoint de métricas en {host}:{port}: {e}")
+            return None
+        self.metrics_server = server
+        self.log_callback(f"📈 Métricas de Prometheus en {server.url}")
+        return server.url
+
+    def stop_metrics_server(self):
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def load_profiles(self, path: Optional[str] = None) -> List[str]:
+        """
+        (Re)carga los perfiles de lanzamiento: los incluidos más los del archivo
+        JSON del usuario (por defecto profiles.json en el directorio de configuración).
+
+        Returns:
+            List[str]: Nombres de los perfiles disponibles.
+        """
+        self.profiles, warnings = load_profiles(path)
+        for warning in warnings:
+            self.log_callback(f"⚠️  {warning}")
+        return list(self.profiles)
+
+    def list_profiles(self) -> Dict[str, dict]:
+        """Perfiles disponibles con sus opciones de scrcpy."""
+        return {name: dict(profile) for name, profile in self.profiles.items()}
+
+    def _apply_launch_profile(self, options: dict) -> Optional[dict]:
+        """Completa las opciones con las del perfil options["profile"] (las explícitas prevalecen)."""
+        name = options.get("profile")
+        if not name:
+            return options
+        profile = self.profiles.get(name)
+        if profile is None:
+            self.log_callback(f"❌ Perfil desconocido: '{name}'. Disponibles: {', '.join(self.profiles)}")
+            return None
+        merged = apply_profile({key: value for key, value in options.items() if key != "profile"}, profile)
+        merged["applied_profile"] = name # Ya aplicado: los relanzamientos no lo vuelven a aplicar
+        self.log_callback(f"🎛️  Perfil '{name}': {profile.get('description') or 'definido por el usuario'}.")
+        return merged
+
+    @log_phase("deps")
+    def check_dependencies(self, use_cache: bool = True) -> bool:
         """
         Verifica que ADB y scrcpy estén instalados y accesibles.
+
+        Ambas comprobaciones se ejecutan en paralelo y su resultado (ruta, versión
+        y capacidades) se guarda en una caché en disco indexada por ruta, tamaño y
+        fecha del binario, por lo que no se vuelven a ejecutar mientras no cambien.
         
+        Args:
+            use_cache: False para forzar la ejecución de 'adb version' y 'scrcpy --version'.
+
         Returns:
             bool: True si ambas dependencias están disponibles, False en caso contrario.
         """
         self.log_callback("Verificando dependencias...")
         
+        cache = JsonCache("dependencies.json") if use_cache else None
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            run = functools.partial(self.commands.run, phase="deps") # Los hilos del pool no heredan la fase
+            adb_future = pool.submit(probe_binary, "adb", ["version"], cache, run)
+            scrcpy_future = pool.submit(probe_binary, "scrcpy", ["--version"], cache, run)
+            adb_info, scrcpy_info = adb_future.result(), scrcpy_future.result()
+        self.dependency_info = {"adb": adb_info, "scrcpy": scrcpy_info}
+
         # Verificar ADB
-        try:
-            result = subprocess.run(["adb", "version"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
-                self.log_callback("❌ Error: ADB no está instalado o no está en el PATH.")
-                self._show_adb_installation_help()
-                return False
-            self.log_callback("✅ ADB encontrado y funcionando.")
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        if not adb_info["found"] or adb_info.get("error") or adb_info.get("returncode") != 0:
             self.log_callback("❌ Error: ADB no está instalado o no está en el PATH.")
             self._show_adb_installation_help()
             return False
+        self.log_callback(f"✅ ADB encontrado y funcionando.{' (caché)' if adb_info['cached'] else ''}")
             
         # Verificar scrcpy
-        try:
-            result = subprocess.run(["scrcpy", "--version"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
-                self.log_callback("❌ Error: scrcpy no está instalado o no está en el PATH.")
-                self._show_scrcpy_installation_help()
-                return False
-            self.log_callback("✅ scrcpy encontrado y funcionando.")
-            
-            # Verificar versión de scrcpy para compatibilidad
-            self._check_scrcpy_version(result.stdout)
-            
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        if not scrcpy_info["found"] or scrcpy_info.get("error") or scrcpy_info.get("returncode") != 0:
             self.log_callback("❌ Error: scrcpy no está instalado o no está en el PATH.")
             self._show_scrcpy_installation_help()
             return False
+        self.log_callback(f"✅ scrcpy encontrado y funcionando.{' (caché)' if scrcpy_info['cached'] else ''}")
+            
+        # Verificar versión de scrcpy para compatibilidad
+        self._check_scrcpy_version(scrcpy_info.get("output", ""), scrcpy_info.get("version"))
             
         return True
     
-    def _check_scrcpy_version(self, version_output: str):
+    def _check_scrcpy_version(self, version_output: str, version: Optional[List[int]] = None):
         """Verifica la versión de scrcpy y muestra advertencias de compatibilidad."""
         try:
-            # Extraer número de versión
-            version_match = re.search(r'scrcpy\s+(\d+)\.(\d+)', version_output)
-            if version_match:
-                major, minor = int(version_match.group(1)), int(version_match.group(2))
+            # Extraer número de versión (ya interpretado si viene de la caché)
+            if version is None:
+                version_match = re.search(r'scrcpy\s+(\d+)\.(\d+)', version_output)
+                if version_match:
+                    version = [int(version_match.group(1)), int(version_match.group(2))]
+            if version:
+                major, minor = version
                 self.log_callback(f"📋 Versión de scrcpy detectada: {major}.{minor}")
                 
                 if major < 2:
@@ -86,7 +342,7 @@ class AndroidMirror:
                 elif major == 1 and minor < 24:
                     self.log_callback("⚠️  Advertencia: Versión antigua de scrcpy. Se recomienda actualizar para mejor compatibilidad.")
             else:
-                self.log_callback("⚠️  No se pudo determinar la versión de scrcpy.")
+                self.log_callback("⚠️  No se pudo determinar la versión de scrcpy; se usarán las opciones de las versiones actuales.")
         except Exception:
             self.log_callback("⚠️  No se pudo verificar la versión de scrcpy.")
     
@@ -132,11 +388,26 @@ class AndroidMirror:
         self.log_callback("   • Puede ser necesario instalar drivers ADB específicos")
         self.log_callback("   • Descarga desde el sitio web del fabricante del dispositivo")
     
+    @log_phase("scan")
     def get_connected_devices(self) -> List[tuple[str, str]]:
         """Obtiene la lista de dispositivos Android conectados y su estado."""
+        if self.adb_client:
+            try:
+                devices = [device.as_tuple() for device in self.adb_client.devices()]
+                self.log_callback(f"Dispositivos ADB encontrados: {devices if devices else 'Ninguno'}")
+                return devices
+            except AdbServerUnavailableError:
+                pass # Servidor no disponible: 'adb devices' lo arrancará
+            except AdbError as e:
+                self.log_callback(f"Error del servidor ADB al listar dispositivos: {e}")
+                return []
+        return self._get_connected_devices_cli()
+
+    def _get_connected_devices_cli(self, quiet: bool = False) -> List[tuple[str, str]]:
+        """Obtiene los dispositivos ejecutando 'adb devices' (respaldo sin servidor)."""
         try:
-            result = subprocess.run(["adb", "devices"], 
-                                  capture_output=True, text=True, timeout=10)
+            result = self.commands.run(["adb", "devices"], 
+                                       capture_output=True, text=True, timeout=10)
             if result.returncode != 0:
                 return []
             
@@ -156,11 +427,49 @@ class AndroidMirror:
                         # devices.append((line.strip(), "unknown")) # O manejarlo como prefieras
                         pass # Por ahora, ignorar líneas malformadas para evitar errores de desempaquetado
             
-            self.log_callback(f"Dispositivos ADB encontrados: {devices if devices else 'Ninguno'}")
+            if not quiet:
+                self.log_callback(f"Dispositivos ADB encontrados: {devices if devices else 'Ninguno'}")
             return devices
         except (subprocess.TimeoutExpired, FileNotFoundError):
             return []
     
+    def start_device_tracking(self, callback=None) -> Optional[DeviceTracker]:
+        """
+        Inicia el seguimiento de dispositivos por eventos (host:track-devices).
+
+        Args:
+            callback: Función opcional que recibe cada DeviceEvent (añadido, eliminado o cambio de estado).
+
+        Returns:
+            DeviceTracker: El tracker en marcha, o None si no hay cliente ADB nativo.
+        """
+        if not self.adb_client:
+            self.log_callback("⚠️  Seguimiento de dispositivos no disponible sin el cliente ADB nativo.")
+            return None
+        if not self.device_tracker:
+            self.device_tracker = DeviceTracker(self.adb_client)
+            self.device_tracker.subscribe(self._log_device_event)
+        if callback:
+            self.device_tracker.subscribe(callback)
+        self.device_tracker.start()
+        return self.device_tracker
+
+    def stop_device_tracking(self):
+        """Detiene el seguimiento de dispositivos si estaba activo."""
+        if self.device_tracker:
+            self.device_tracker.stop()
+            self.device_tracker = None
+
+    def _log_device_event(self, event: DeviceEvent):
+        if event.kind == "added":
+            model = f" [{event.device.model}]" if event.device.model else ""
+            self.log_callback(f"🔌 Dispositivo conectado: {event.device.serial}{model} ({event.device.state})")
+        elif event.kind == "removed":
+            self.log_callback(f"🔌 Dispositivo desconectado: {event.device.serial}")
+        else:
+            self.log_callback(f"🔄 {event.device.serial}: {event.previous_state} → {event.device.state}")
+
+    @log_phase("connect")
     def connect_usb(self) -> bool:
         """Establece conexión con dispositivo Android vía USB."""
         self.log_callback("\n🔌 Buscando dispositivos Android conectados por USB...")
@@ -189,36 +498,68 @@ class AndroidMirror:
             self.log_callback("Múltiples dispositivos encontrados. La GUI debe manejar la selección.")
             return False # O True y que la GUI pida la selección
 
-    def restart_adb_server(self) -> tuple[bool, str]:
-        """Reinicia el servidor ADB."""
+    @log_phase("adb_server")
+    def ensure_adb_server(self) -> bool:
+        """Comprueba que el servidor ADB responda y lo arranca con 'adb start-server' si no."""
+        if self.adb_client and self.adb_client.is_server_running():
+            return True
+        try:
+            result = self.commands.run(["adb", "start-server"], capture_output=True, text=True, timeout=15)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            self.log_callback(f"❌ No se pudo iniciar el servidor ADB: {e}")
+            return False
+        if result.returncode != 0:
+            self.log_callback(f"❌ Error al iniciar el servidor ADB: {result.stdout.strip()} {result.stderr.strip()}")
+            return False
+        return True
+
+    @log_phase("adb_server")
+    def restart_adb_server(self, deadline: float = DEFAULT_RESTART_DEADLINE,
+                           reconnect_wifi: bool = True) -> tuple[bool, str]:
+        """
+        Reinicia el servidor ADB sin esperas fijas.
+
+        Detiene el servidor (host:kill, o 'adb kill-server' si no responde),
+        sondea su puerto hasta que deja de aceptar conexiones, lo arranca y
+        sondea host:version hasta que responde, todo dentro de `deadline`
+        segundos. Después vuelve a conectar en paralelo los dispositivos Wi-Fi
+        que estaban conectados antes del reinicio.
+        """
         self.log_callback("Reiniciando servidor ADB...")
+        self._restarts.inc(kind="adb_server")
+        started = time.monotonic()
+        remaining = lambda: max(0.1, deadline - (time.monotonic() - started))
+        probe = self.adb_client or AdbClient()
+        wifi_targets = self._wifi_serials_snapshot() if reconnect_wifi else []
         try:
             # Detener el servidor ADB
-            kill_result = subprocess.run(["adb", "kill-server"], capture_output=True, text=True, timeout=10)
-            if kill_result.returncode == 0 or "server not running" in kill_result.stderr.lower() or not kill_result.stdout.strip():
-                self.log_callback("Servidor ADB detenido (o no estaba en ejecución).")
-            else:
-                self.log_callback(f"Advertencia al detener ADB: {kill_result.stdout.strip()} {kill_result.stderr.strip()}")
+            if not self._kill_adb_server_native(timeout=min(1.0, remaining())):
+                kill_result = self.commands.run(["adb", "kill-server"], capture_output=True, text=True,
+                                                timeout=min(10.0, remaining()))
+                if kill_result.returncode != 0 and kill_result.stdout.strip() and "server not running" not in kill_result.stderr.lower():
+                    self.log_callback(f"Advertencia al detener ADB: {kill_result.stdout.strip()} {kill_result.stderr.strip()}")
+            if not probe.wait_for_shutdown(timeout=remaining()):
+                error_msg = (f"El servidor ADB sigue aceptando conexiones en {probe.host}:{probe.port} "
+                             f"tras {deadline:.0f}s; termina el proceso adb manualmente.")
+                self.log_callback(f"❌ {error_msg}")
+                return False, error_msg
+            stopped = time.monotonic()
+            self.log_callback(f"Servidor ADB detenido en {stopped - started:.2f}s.")
 
-            # Iniciar el servidor ADB
-            # Esperar un poco para que el servidor se detenga completamente
-            time.sleep(1)
-            start_result = subprocess.run(["adb", "start-server"], capture_output=True, text=True, timeout=15)
-            
-            # start-server a menudo no produce salida en stdout en éxito, pero puede en stderr.
-            # La ausencia de errores y un código de retorno 0 es una buena señal.
-            if start_result.returncode == 0:
-                # A veces 'adb start-server' no da output en stdout en éxito
-                # pero puede darlo en stderr (e.g. daemon started successfully)
-                # o no dar output en absoluto.
-                # Una verificación adicional podría ser 'adb devices' después de esto.
-                self.log_callback(f"Servidor ADB iniciado. Salida: {start_result.stdout.strip()} {start_result.stderr.strip()}")
-                return True, "Servidor ADB reiniciado exitosamente."
-            else:
+            # Iniciar el servidor ADB y esperar a que responda de verdad
+            start_result = self.commands.run(["adb", "start-server"], capture_output=True, text=True,
+                                             timeout=remaining())
+            if start_result.returncode != 0:
                 error_msg = f"Error al iniciar ADB: {start_result.stdout.strip()} {start_result.stderr.strip()}"
                 self.log_callback(error_msg)
                 return False, error_msg
-
+            if not probe.wait_for_server(timeout=remaining()):
+                error_msg = f"El servidor ADB no respondió a host:version en {deadline:.0f}s."
+                self.log_callback(f"❌ {error_msg}")
+                return False, error_msg
+            ready = time.monotonic()
+            self.log_callback(f"✅ Servidor ADB reiniciado en {ready - started:.2f}s "
+                              f"(parada {stopped - started:.2f}s, arranque {ready - stopped:.2f}s).")
         except subprocess.TimeoutExpired as e:
             self.log_callback(f"Timeout durante el reinicio de ADB: {e}")
             return False, f"Timeout durante el reinicio de ADB: {e}"
@@ -228,31 +569,83 @@ class AndroidMirror:
         except Exception as e:
             self.log_callback(f"Error inesperado al reiniciar ADB: {e}")
             return False, f"Error inesperado al reiniciar ADB: {e}"
+
+        if wifi_targets:
+            # El servidor nuevo no conoce ningún transporte TCP: el pool debe reconectarlos todos
+            if self.wifi_pool:
+                self.wifi_pool.invalidate()
+            results = self.connect_wifi_many(wifi_targets, skip_probe=True)
+            reconnected = sum(1 for row in results if row["connected"])
+            return True, (f"Servidor ADB reiniciado exitosamente; {reconnected}/{len(wifi_targets)} "
+                          f"dispositivos Wi-Fi reconectados.")
+        return True, "Servidor ADB reiniciado exitosamente."
+
+    def _wifi_serials_snapshot(self) -> List[str]:
+        """Dispositivos TCP conectados ahora mismo (para reconectarlos tras reiniciar el servidor)."""
+        serials = set(self.wifi_pool.serials()) if self.wifi_pool else set()
+        if self.device_tracker and self.device_tracker.wait_ready(0):
+            serials.update(device.serial for device in self.device_tracker.devices())
+        elif self.adb_client:
+            try:
+                # Plazo corto: un servidor bloqueado no debe retrasar su propio reinicio
+                serials.update(device.serial for device in self.adb_client.devices(timeout=0.5))
+            except AdbError:
+                pass
+        if self.connection_type == "wifi" and self.device_ip:
+            serials.add(f"{self.device_ip}:{self.device_port}")
+        targets = []
+        for serial in sorted(serials):
+            try:
+                parse_target(serial)
+            except ValueError:
+                continue # USB, emulador o servicio mDNS
+            if ":" in serial:
+                targets.append(serial)
+        return targets
+
+    def _kill_adb_server_native(self, timeout: Optional[float] = None) -> bool:
+        """Detiene el servidor con host:kill. Devuelve False si hay que recurrir a 'adb kill-server'."""
+        if not self.adb_client:
+            return False
+        try:
+            self.adb_client.kill_server(timeout=timeout)
+            return True
+        except AdbServerUnavailableError:
+            return True # No había servidor en ejecución
+        except AdbError:
+            return False
     
+    @log_phase("connect", serial_arg="ip_address")
     def connect_wifi(self, ip_address: str) -> tuple[bool, str]:
-        """Establece conexión con dispositivo Android vía Wi-Fi."""
+        """Establece conexión con dispositivo Android vía Wi-Fi ("IP" o "IP:puerto", por defecto 5555)."""
         self.log_callback(f"\n📶 Intentando conectar a {ip_address} vía Wi-Fi...")
         
-        # Validar formato de IP (simplificado, asumiendo que la GUI ya valida)
-        # ip_pattern = re.compile(r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$')
-        # if not ip_pattern.match(ip_address):
-        #     self.log_callback("❌ Formato de dirección IP inválido.")
-        #     return False, "Formato de dirección IP inválido."
+        try:
+            host, port = parse_target(ip_address)
+        except ValueError as e:
+            self.log_callback(f"❌ Dirección inválida '{ip_address}': {e}")
+            return False, f"Dirección inválida: {e}"
         
         try:
             # Intentar conectar
-            # Usar el serial del dispositivo IP para scrcpy es ip_address:5555
-            device_serial_to_connect = f"{ip_address}:5555"
-            result = subprocess.run(["adb", "connect", device_serial_to_connect], 
-                                  capture_output=True, text=True, timeout=15)
-            
-            output_msg = result.stdout.strip() + "\n" + result.stderr.strip()
+            # El serial del dispositivo IP para scrcpy es host:puerto
+            if self.wifi_pool:
+                connected, output_msg, reused = self.wifi_pool.acquire(host, port)
+                stdout = output_msg if connected else ""
+                self.wifi_pool.start()
+            else:
+                stdout, output_msg = self._adb_connect(host, port)
+                reused = False
 
-            if "connected to" in result.stdout.lower() or "already connected to" in result.stdout.lower():
-                self.log_callback(f"✅ Conexión Wi-Fi establecida o ya existente con {ip_address}")
-                self.device_ip = ip_address # Guardar la IP base
+            if reused:
+                self.log_callback(f"♻️  Conexión Wi-Fi con {host}:{port} reutilizada del pool (sin 'adb connect').")
+            if self._is_connect_success(stdout):
+                if not reused:
+                    self.log_callback(f"✅ Conexión Wi-Fi establecida o ya existente con {host}:{port}")
+                self.device_ip = host # Guardar la IP base
+                self.device_port = port
                 self.connection_type = "wifi"
-                return True, f"Conectado a {ip_address}"
+                return True, f"Conectado a {host}:{port}"
             else:
                 self.log_callback(f"❌ No se pudo conectar a {ip_address}. Salida: {output_msg}")
                 self.log_callback("\n💡 Posibles soluciones:")
@@ -271,64 +664,620 @@ class AndroidMirror:
         except Exception as e:
             self.log_callback(f"❌ Error inesperado al conectar vía Wi-Fi: {e}")
             return False, f"Error inesperado: {e}"
+
+    @log_phase("connect")
+    def connect_wifi_many(self, targets: List[str], probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                          max_workers: int = DEFAULT_CONNECT_WORKERS, skip_probe: bool = False) -> List[dict]:
+        """
+        Conecta muchos dispositivos Wi-Fi a la vez.
+
+        Primero sondea en paralelo el puerto TCP de cada destino para omitir los
+        equipos apagados y después ejecuta 'adb connect' sobre los que responden,
+        con como máximo `max_workers` conexiones simultáneas.
+
+        Args:
+            targets: Destinos "host[:puerto]".
+            probe_timeout: Segundos máximos del sondeo TCP por destino.
+            max_workers: Conexiones ADB simultáneas como máximo.
+            skip_probe: Omitir el sondeo TCP (p. ej. destinos recién encontrados por un barrido).
+
+        Returns:
+            List[dict]: Resultado por destino (ver wifi_tools.bulk_connect).
+        """
+        self.log_callback(f"\n📶 Conectando {len(targets)} dispositivos Wi-Fi...")
+        start = time.perf_counter()
+        connect = self._connect_wifi_pooled if self.wifi_pool else self._connect_wifi_target
+        results = bulk_connect(targets, connect, probe_timeout=probe_timeout,
+                               max_workers=max_workers, skip_probe=skip_probe)
+        self.log_callback(format_connect_results(results))
+        self.log_callback(f"⏱️  Conexión masiva completada en {time.perf_counter() - start:.2f}s")
+        return results
+
+    @log_phase("discover")
+    def discover_wifi_devices(self, network: Optional[str] = None, port: int = DEFAULT_ADB_TCP_PORT,
+                              verify_banner: bool = False, connect: bool = False) -> List[dict]:
+        """
+        Busca dispositivos con ADB sobre TCP en una red y, opcionalmente, los conecta.
+
+        Args:
+            network: Red CIDR a barrer (por defecto la /24 de la interfaz local).
+            port: Puerto ADB sobre TCP.
+            verify_banner: Confirmar el saludo del protocolo ADB en cada equipo encontrado.
+            connect: Ejecutar 'adb connect' sobre los equipos encontrados.
+
+        Returns:
+            List[dict]: Equipos encontrados (host, port, latency_ms, banner).
+        """
+        network = network or guess_local_network()
+        if not network:
+            self.log_callback("❌ No se pudo determinar la red local. Indica una red CIDR (ej. 192.168.1.0/24).")
+            return []
+        self.log_callback(f"\n🔎 Buscando dispositivos ADB en {network} (puerto {port})...")
+        start = time.perf_counter()
+        try:
+            hits = self.subnet_scanner.scan(network, port=port, verify_banner=verify_banner)
+        except ValueError as e:
+            self.log_callback(f"❌ Red inválida '{network}': {e}")
+            return []
+        elapsed = time.perf_counter() - start
+        targets = [f"{hit['host']}:{hit['port']}" for hit in hits]
+        self.log_callback(f"✅ {len(hits)} dispositivos encontrados en {elapsed:.2f}s: "
+                          f"{', '.join(targets) if targets else 'Ninguno'}")
+        if connect and targets:
+            self.connect_wifi_many(targets, skip_probe=True)
+        return hits
+
+    def _connect_wifi_target(self, host: str, port: int) -> tuple[bool, str]:
+        """Conexión ADB silenciosa usada por la conexión masiva (no cambia el dispositivo actual)."""
+        try:
+            stdout, output_msg = self._adb_connect(host, port)
+        except subprocess.TimeoutExpired:
+            return False, "Timeout al conectar."
+        except FileNotFoundError:
+            return False, "ADB no encontrado."
+        return self._is_connect_success(stdout), output_msg.strip()
+
+    def _connect_wifi_pooled(self, host: str, port: int) -> tuple[bool, str]:
+        """Como _connect_wifi_target, pero reutilizando y registrando la conexión en el pool."""
+        connected, message, _ = self.wifi_pool.acquire(host, port)
+        self.wifi_pool.start()
+        return connected, message.strip()
+
+    def _wifi_keepalive(self, serial: str) -> bool:
+        """Orden mínima sobre el transporte TCP: mantiene viva la entrada NAT y detecta conexiones caídas."""
+        if self.adb_client:
+            try:
+                return "ok" in self.adb_client.shell(serial, "echo ok", timeout=5)
+            except AdbServerUnavailableError:
+                pass
+            except AdbError:
+                return False
+        try:
+            result = self.commands.run(["adb", "-s", serial, "shell", "echo", "ok"], phase="keepalive",
+                                       serial=serial, capture_output=True, text=True, timeout=5)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return False
+        return result.returncode == 0 and "ok" in result.stdout
+
+    def disconnect_wifi(self, device_serial: Optional[str] = None) -> int:
+        """
+        Desconecta explícitamente un dispositivo Wi-Fi (o todos los del pool) y lo saca del pool.
+
+        Returns:
+            int: Dispositivos desconectados.
+        """
+        if not self.wifi_pool:
+            if not device_serial:
+                return 0
+            return int(self._adb_disconnect(device_serial).returncode == 0)
+        if device_serial:
+            if not self.wifi_pool.evict(device_serial):
+                self._adb_disconnect(device_serial)
+            count = 1
+        else:
+            count = self.wifi_pool.evict_all()
+        self.log_callback(f"🔌 {count} conexión(es) Wi-Fi cerrada(s).")
+        return count
+
+    def get_wifi_pool_status(self) -> dict:
+        """Conexiones Wi-Fi mantenidas (estado, inactividad, último keep-alive) y contadores del pool."""
+        return self.wifi_pool.status() if self.wifi_pool else {"connections": [], "stats": {}}
+
+    @staticmethod
+    def _is_connect_success(stdout: str) -> bool:
+        return "connected to" in stdout.lower() or "already connected to" in stdout.lower()
+
+    def _adb_connect(self, host: str, port: int) -> tuple[str, str]:
+        """Ejecuta 'adb connect' (servidor nativo o ejecutable). Devuelve (stdout, salida completa)."""
+        self._connect_attempts.inc()
+        connected = False
+        try:
+            stdout = self._adb_connect_native(host, port)
+            if stdout is not None:
+                connected = self._is_connect_success(stdout)
+                return stdout, stdout.strip()
+            result = self.commands.run(["adb", "connect", f"{host}:{port}"], phase="connect",
+                                       serial=f"{host}:{port}", capture_output=True, text=True, timeout=15)
+            connected = self._is_connect_success(result.stdout)
+            return result.stdout, result.stdout.strip() + "\n" + result.stderr.strip()
+        finally:
+            if not connected:
+                self._connect_failures.inc()
+
+    def _adb_connect_native(self, host: str, port: int) -> Optional[str]:
+        """Ejecuta host:connect en el servidor ADB. Devuelve None si hay que usar el ejecutable."""
+        if not self.adb_client:
+            return None
+        try:
+            return self.adb_client.connect(host, port)
+        except AdbServerUnavailableError:
+            return None
+        except AdbError as e:
+            return str(e) # FAIL del servidor: se trata como salida de 'adb connect'
     
+    @log_phase("launch", serial_arg="device_serial")
     def start_mirroring(self, device_serial: Optional[str], options: dict) -> bool:
-        """Inicia scrcpy con la configuración especificada."""
+        """
+        Inicia scrcpy con la configuración especificada.
+
+        Vuelve en cuanto scrcpy confirma que está listo o termina con error, sin
+        esperas fijas. El plazo máximo se configura con options["launch_timeout"]
+        (segundos) y los tiempos medidos quedan en self.scrcpy_session
+        (time_to_ready y time_to_first_frame).
+
+        La salida de scrcpy se vacía continuamente en un buffer circular de
+        options["output_buffer_lines"] líneas y se reenvía al log a un máximo de
+        options["log_rate_limit"] líneas por segundo (0 = sin límite).
+
+        Con options["adaptive_quality"] en una sesión Wi-Fi, el bitrate, la
+        resolución y los FPS se ajustan según la calidad del enlace (ver
+        start_adaptive_mirroring).
+
+        options["profile"] aplica un perfil de lanzamiento con nombre
+        (low-latency, low-bandwidth, high-fidelity, battery-saver o uno del
+        usuario); las opciones indicadas explícitamente prevalecen sobre el perfil.
+
+        Con options["auto_reconnect"] en una sesión Wi-Fi, un supervisor vuelve a
+        conectar y relanzar scrcpy si la sesión cae (ver start_supervised_mirroring).
+        """
+        options = self._apply_launch_profile(options)
+        if options is None:
+            return False
+        if self.headless and "headless" not in options:
+            options = dict(options, headless=True)
+        if options.get("headless") and not self._supports_headless():
+            self.log_callback("❌ El modo headless requiere scrcpy 2.1 o superior (--no-playback).")
+            return False
+        if options.get("record_dir"):
+            if options.get("adaptive_quality"):
+                self.log_callback("⚠️  La calidad adaptativa no se combina con la grabación segmentada; se ignora.")
+            if options.get("auto_reconnect"):
+                self.log_callback("⚠️  La grabación segmentada ya relanza scrcpy tras un fallo; se ignora la reconexión automática.")
+            return self.start_recording(device_serial, options)
+        if options.get("auto_reconnect"):
+            return self.start_supervised_mirroring(device_serial, options)
+        if options.get("adaptive_quality"):
+            return self.start_adaptive_mirroring(device_serial, options)
+
         self.log_callback("\n🚀 Iniciando scrcpy para transmisión de pantalla y audio...")
-        
+        session = self._launch_session(device_serial, options)
+        if session is None:
+            return False
+        if options.get("headless"):
+            self.log_callback("🖥️  Modo headless: scrcpy sin ventana ni reproducción; se controla con la API de sesiones.")
+        elif not options.get("record_no_playback"):
+            self.log_callback("\n📺 La ventana de duplicación debería aparecer ahora.")
+            self.log_callback("\n⌨️  Controles:")
+            self.log_callback("   • Usa el mouse y teclado para controlar el dispositivo")
+            self.log_callback("   • Cierra la ventana de scrcpy para finalizar la transmisión desde la GUI")
+        # En la GUI, no se llamará a wait_for_completion, el cierre se maneja diferente
+        return True
+
+    def _launch_session(self, device_serial: Optional[str], options: dict,
+                        stop_previous: bool = True) -> Optional[ScrcpySession]:
+        """
+        Construye el comando, lanza scrcpy y espera a que esté listo.
+
+        Returns:
+            ScrcpySession en ejecución, o None si scrcpy no arrancó.
+        """
         scrcpy_cmd = self._build_scrcpy_command(device_serial, options)
         
         self.log_callback(f"Ejecutando: {' '.join(scrcpy_cmd)}")
         
         try:
-            # Iniciar scrcpy
-            self.scrcpy_process = subprocess.Popen(
-                scrcpy_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            session = self.sessions.launch(
+                device_serial, scrcpy_cmd, options=options, stop_previous=stop_previous,
+                log_callback=functools.partial(self.emit, phase="session", serial=device_serial),
+                buffer_lines=int(options.get("output_buffer_lines") or DEFAULT_BUFFER_LINES),
+                log_rate=float(options.get("log_rate_limit", DEFAULT_LOG_RATE)),
+                ready_patterns=HEADLESS_READY_PATTERNS if options.get("headless") else READY_PATTERNS,
+                collect_fps=self._wants_fps_reports(options),
+                popen=self.commands.popen
             )
-            
-            # Esperar un momento para verificar que se inició correctamente
-            time.sleep(2)
-            
-            # Monitorear la salida en un hilo separado podría ser mejor para GUI
-            # Por ahora, verificamos el estado después de un corto tiempo
-            time.sleep(2) # Dar tiempo a scrcpy para que inicie o falle
-
-            if self.scrcpy_process.poll() is None: # Si sigue corriendo, es bueno
-                self.log_callback("✅ scrcpy iniciado exitosamente (proceso en ejecución).")
-                self.log_callback("\n📺 La ventana de duplicación debería aparecer ahora.")
-                self.log_callback("\n⌨️  Controles:")
-                self.log_callback("   • Usa el mouse y teclado para controlar el dispositivo")
-                self.log_callback("   • Cierra la ventana de scrcpy para finalizar la transmisión desde la GUI")
-                # En la GUI, no se llamará a wait_for_completion, el cierre se maneja diferente
-                return True
+            self.scrcpy_session = session
+            self.scrcpy_process = session.process
+
+            launch_timeout = float(options.get("launch_timeout") or DEFAULT_LAUNCH_TIMEOUT)
+            ready = session.wait_ready(launch_timeout)
+
+            if session.is_running(): # Si sigue corriendo, es bueno
+                self._session_launches.inc(result="ready" if ready else "running")
+                if ready:
+                    self._time_to_ready.observe(session.time_to_ready)
+                    self.log_callback(f"✅ scrcpy listo en {session.time_to_ready:.2f}s.")
+                else:
+                    self.log_callback(f"✅ scrcpy en ejecución (sin confirmación de renderizado tras {launch_timeout:.0f}s).")
+                if session.time_to_first_frame is not None:
+                    self._time_to_first_frame.observe(session.time_to_first_frame)
+                    self.log_callback(f"⏱️  Primer fotograma a los {session.time_to_first_frame:.2f}s.")
+                return session
             else:
-                # El proceso terminó rápidamente, probablemente un error
-                stdout, stderr = self.scrcpy_process.communicate(timeout=5) # Intentar obtener salida
-                error_message = f"Scrcpy falló al iniciar (código: {self.scrcpy_process.returncode}).\n"
-                if stdout:
-                    error_message += f"Stdout: {stdout}\n"
-                if stderr:
-                    error_message += f"Stderr: {stderr}"
+                # El proceso terminó antes de estar listo, probablemente un error
+                self._session_launches.inc(result="failed")
+                error_message = f"Scrcpy falló al iniciar (código: {session.returncode}).\n"
+                output = session.startup_output()
+                if output:
+                    error_message += f"Salida: {output}"
                 self.log_callback(f"❌ Error al iniciar scrcpy: {error_message}")
                 self.scrcpy_process = None # Limpiar referencia
-                return False
+                self.scrcpy_session = None
+                if self.wifi_pool and device_serial:
+                    self.wifi_pool.mark_stale(device_serial) # Se comprueba/reconecta en el próximo connect_wifi
+                return None
                 
         except FileNotFoundError:
+            self._session_launches.inc(result="failed")
             self.log_callback("❌ Error: scrcpy no encontrado. Verifica la instalación.")
             self.scrcpy_process = None
-            return False
-        except subprocess.TimeoutExpired:
-            self.log_callback("❌ Timeout al obtener la salida de scrcpy después de un fallo.")
-            self.scrcpy_process = None
-            return False
+            return None
         except Exception as e:
+            self._session_launches.inc(result="failed")
             self.log_callback(f"❌ Error inesperado al iniciar scrcpy: {e}")
             self.scrcpy_process = None
+            return None
+
+    def start_recording(self, device_serial: Optional[str], options: dict) -> bool:
+        """
+        Graba el dispositivo en segmentos rotados dentro de options["record_dir"].
+
+        Opciones:
+            record_segment_seconds: Duración máxima de cada segmento (por defecto 600).
+            record_segment_mb: Tamaño máximo de cada segmento en MiB (por defecto 1024).
+            record_max_total_mb: Retención: se borran los segmentos más antiguos del
+                dispositivo cuando el total supera este tamaño.
+            record_min_free_mb: Espacio libre mínimo para empezar y seguir grabando.
+            record_format: "mkv" (por defecto, legible aunque se interrumpa) o "mp4".
+            record_no_playback: Grabar sin ventana ni reproducción (ahorra GPU/CPU del PC);
+                en este modo los segmentos se solapan al rotar y no se pierden fotogramas.
+
+        Antes de empezar se comprueban el espacio libre y la velocidad de escritura
+        del disco frente al bitrate previsto de todas las grabaciones en curso.
+        """
+        directory = os.path.abspath(options["record_dir"])
+        no_playback = bool(options.get("record_no_playback") or options.get("headless"))
+        min_free = int(float(options.get("record_min_free_mb") or DEFAULT_MIN_FREE_BYTES / 1024 ** 2) * 1024 ** 2)
+        key = device_serial or SessionManager.DEFAULT_KEY
+        self.stop_recording(device_serial)
+
+        video_rate = parse_bit_rate(options.get("bit_rate")) or DEFAULT_RECORD_BIT_RATE
+        audio_rate = 0 if options.get("no_audio") else (parse_bit_rate(options.get("audio_bit_rate")) or 128_000)
+        active = sum(1 for recorder in self.recorders.values() if recorder.is_active())
+        disk = check_disk(directory, min_free, bit_rate=(video_rate + audio_rate) * (active + 1))
+        if not disk["ok"]:
+            self.log_callback(f"❌ No se puede grabar en {directory}: {disk['reason']}")
             return False
-        
+        throughput = (f", escritura {disk['write_bytes_per_s'] / 1024 ** 2:.0f} MiB/s"
+                      if disk["write_bytes_per_s"] else "")
+        self.log_callback(f"💾 Disco de grabación: {disk['free_bytes'] / 1024 ** 3:.1f} GiB libres{throughput}.")
+        if disk["reason"]:
+            self.log_callback(f"⚠️  {disk['reason']}")
+
+        segment_options = {k: v for k, v in options.items() if k != "record_dir"}
+        segment_seconds = options.get("record_segment_seconds")
+        segment_mb = options.get("record_segment_mb")
+        max_total_mb = options.get("record_max_total_mb")
+        recorder = SegmentedRecorder(
+            device_serial, directory,
+            launch=lambda path, replace: self._launch_session(
+                device_serial, dict(segment_options, record_file=path), stop_previous=replace),
+            segment_seconds=DEFAULT_SEGMENT_SECONDS if segment_seconds is None else float(segment_seconds),
+            segment_max_bytes=(DEFAULT_SEGMENT_MAX_BYTES if segment_mb is None
+                               else int(float(segment_mb) * 1024 ** 2)),
+            max_total_bytes=int(float(max_total_mb) * 1024 ** 2) if max_total_mb else None,
+            record_format=options.get("record_format") or DEFAULT_RECORD_FORMAT,
+            min_free_bytes=min_free,
+            overlap=no_playback, # Con ventana, solapar abriría una segunda ventana
+            stop_on_user_exit=not no_playback,
+            log_callback=functools.partial(self.emit, phase="record", serial=device_serial)
+        )
+        self.recorders[key] = recorder
+        self.log_callback(f"\n⏺️  Iniciando grabación segmentada en {directory}...")
+        if not recorder.start():
+            self.recorders.pop(key, None)
+            return False
+        self.log_callback(f"✅ Grabando en {os.path.basename(recorder.current_path)}"
+                          f"{' (sin reproducción)' if no_playback else ''}.")
+        return True
+
+    def stop_recording(self, device_serial: Optional[str] = None):
+        """Detiene la grabación del dispositivo (o todas) cerrando el segmento en curso."""
+        keys = [device_serial or SessionManager.DEFAULT_KEY] if device_serial else list(self.recorders)
+        for key in keys:
+            recorder = self.recorders.get(key) # Se conserva para consultar sus segmentos
+            if recorder:
+                recorder.stop() # También si la rotación ya terminó: cierra un scrcpy que siga grabando
+
+    def get_recording_status(self, device_serial: Optional[str] = None) -> List[dict]:
+        """Segmentos, reinicios y segmentos eliminados por la retención de cada grabación."""
+        if device_serial:
+            recorder = self.recorders.get(device_serial)
+            return [recorder.status()] if recorder else []
+        return [recorder.status() for recorder in self.recorders.values()]
+
+    def get_stream_metrics(self, device_serial: Optional[str] = None) -> List[dict]:
+        """FPS actual, min/media/máx y descartes de las sesiones lanzadas con métricas (fps_metrics)."""
+        sessions = self.sessions.sessions()
+        if device_serial:
+            sessions = [session for session in sessions if session.serial == device_serial]
+        return [dict(session.metrics.snapshot(), running=session.is_running())
+                for session in sessions if session.metrics is not None]
+
+    def start_adaptive_mirroring(self, device_serial: Optional[str], options: dict) -> bool:
+        """
+        Inicia scrcpy en Wi-Fi con control adaptativo de calidad.
+
+        La sesión arranca en el peldaño options["adaptive_start"] (por defecto
+        "media") de DEFAULT_QUALITY_LADDER y un controlador en segundo plano la
+        relanza un peldaño arriba o abajo según el RTT al dispositivo y los
+        fotogramas descartados. Las decisiones quedan en get_quality_status().
+        """
+        try:
+            host, port = parse_target(device_serial or "")
+        except ValueError:
+            host, port = None, None
+        if not device_serial or ":" not in device_serial or not host:
+            self.log_callback("⚠️  La calidad adaptativa sólo se aplica a dispositivos Wi-Fi (IP:Puerto); "
+                              "se usarán las opciones fijas.")
+            return self.start_mirroring(device_serial, dict(options, adaptive_quality=False))
+
+        base_options = dict(options)
+        controller = AdaptiveQualityController(
+            device_serial, host, port,
+            relaunch=lambda preset: self._relaunch_with_preset(device_serial, base_options, preset),
+            ladder=DEFAULT_QUALITY_LADDER,
+            start_preset=options.get("adaptive_start") or DEFAULT_START_PRESET,
+            log_callback=functools.partial(self.emit, phase="adaptive", serial=device_serial)
+        )
+        self.stop_adaptive_quality(device_serial)
+        self.quality_controllers[device_serial] = controller
+        self.log_callback(f"🎚️  Calidad adaptativa activada para {device_serial} "
+                          f"(peldaño inicial: {controller.preset.name}).")
+        if not self.start_mirroring(device_serial, self._adaptive_launch_options(controller, base_options)):
+            self.quality_controllers.pop(device_serial, None)
+            return False
+        controller.attach(self.sessions.get(device_serial))
+        controller.start()
+        return True
+
+    def _adaptive_launch_options(self, controller: AdaptiveQualityController, options: dict) -> dict:
+        # El controlador ya gestiona la sesión: el relanzamiento no debe crear otro
+        return dict(controller.launch_options(options), adaptive_quality=False)
+
+    def _relaunch_with_preset(self, device_serial: str, options: dict, preset) -> Optional[ScrcpySession]:
+        self._restarts.inc(kind="adaptive")
+        launch_options = dict(options, **preset.as_options(), print_fps=True, adaptive_quality=False)
+        if self.start_mirroring(device_serial, launch_options):
+            return self.sessions.get(device_serial)
+        return None
+
+    def stop_adaptive_quality(self, device_serial: Optional[str] = None):
+        """Detiene el control adaptativo del dispositivo (o de todos) sin detener scrcpy."""
+        serials = [device_serial] if device_serial else list(self.quality_controllers)
+        for serial in serials:
+            controller = self.quality_controllers.pop(serial, None)
+            if controller:
+                controller.stop()
+
+    def get_quality_status(self, device_serial: Optional[str] = None) -> List[dict]:
+        """Peldaño actual, umbrales, métricas del enlace y decisiones de cada controlador adaptativo."""
+        controllers = ([self.quality_controllers[device_serial]] if device_serial in self.quality_controllers
+                       else [] if device_serial else list(self.quality_controllers.values()))
+        return [controller.status() for controller in controllers]
+
+    def start_supervised_mirroring(self, device_serial: Optional[str], options: dict) -> bool:
+        """
+        Inicia scrcpy en Wi-Fi con reconexión automática.
+
+        Un SessionSupervisor vigila el proceso scrcpy y el estado ADB del
+        dispositivo; si la sesión falla, vuelve a conectar el dispositivo y la
+        relanza con las mismas opciones, con retardo exponencial y jitter entre
+        intentos. Opciones:
+            reconnect_max_attempts: Intentos por incidente (por defecto 10).
+            reconnect_max_delay: Retardo máximo entre intentos en segundos (por defecto 30).
+            reconnect_budget: Intentos totales permitidos por hora (por defecto 30).
+
+        Los incidentes y el tiempo medio de recuperación quedan en get_reconnect_status().
+        """
+        if not device_serial or ":" not in device_serial:
+            self.log_callback("⚠️  La reconexión automática sólo se aplica a dispositivos Wi-Fi (IP:Puerto); "
+                              "se iniciará sin supervisión.")
+            return self.start_mirroring(device_serial, dict(options, auto_reconnect=False))
+
+        # El supervisor relanza con las mismas opciones: el relanzamiento no debe crear otro supervisor
+        launch_options = dict(options, auto_reconnect=False)
+        defaults = ReconnectPolicy()
+        policy = ReconnectPolicy(
+            max_attempts=int(options.get("reconnect_max_attempts") or defaults.max_attempts),
+            max_delay=float(options.get("reconnect_max_delay") or defaults.max_delay),
+            budget=int(options.get("reconnect_budget") or defaults.budget)
+        )
+        self.stop_supervision(device_serial)
+        if not self.start_mirroring(device_serial, launch_options):
+            return False
+        supervisor = SessionSupervisor(
+            device_serial,
+            get_session=lambda: self.sessions.get(device_serial),
+            reconnect=lambda: self._reconnect_wifi(device_serial),
+            relaunch=lambda: self._supervised_relaunch(device_serial, launch_options),
+            device_state=lambda: self._device_state(device_serial),
+            policy=policy,
+            log_callback=functools.partial(self.emit, phase="reconnect", serial=device_serial),
+            on_incident=lambda incident: self._reconnect_downtime.observe(
+                incident.downtime, result="recovered" if incident.recovered else "gave_up")
+        )
+        self.supervisors[device_serial] = supervisor
+        supervisor.start()
+        self.log_callback(f"🛡️  Reconexión automática activada para {device_serial} "
+                          f"(hasta {policy.max_attempts} intentos por caída).")
+        return True
+
+    def _supervised_relaunch(self, device_serial: str, options: dict) -> bool:
+        self._restarts.inc(kind="reconnect")
+        return self.start_mirroring(device_serial, options)
+
+    def _reconnect_wifi(self, serial: str, settle_timeout: float = 5.0) -> bool:
+        """
+        Vuelve a conectar un dispositivo Wi-Fi sin cambiar el dispositivo actual.
+
+        Un transporte TCP que quedó "offline" en el servidor ADB hace que
+        'adb connect' responda "already connected" sin reconectar nada, así que
+        antes se desconecta. Después se espera a que el dispositivo pase a "device".
+        """
+        state = self._device_state(serial)
+        if state == "device":
+            return True
+        host, port = parse_target(serial)
+        if self.wifi_pool:
+            self.wifi_pool.mark_stale(serial) # Si no, un keep-alive reciente daría el transporte por bueno
+            connected, message, _ = self.wifi_pool.acquire(host, port) # El pool descarta el transporte caído
+        else:
+            if state is not None:
+                self._adb_disconnect(serial)
+            connected, message = self._connect_wifi_target(host, port)
+        if not connected:
+            self.emit(f"❌ Reconexión de {serial} fallida: {message}", phase="reconnect", serial=serial)
+            return False
+        deadline = time.monotonic() + settle_timeout
+        while time.monotonic() < deadline:
+            if self._device_state(serial) == "device":
+                return True
+            time.sleep(0.25)
+        return False
+
+    def _device_state(self, serial: str) -> Optional[str]:
+        """Estado ADB de un serial ("device", "offline"...) o None si no aparece, sin escribir en el log."""
+        if self.device_tracker and self.device_tracker.wait_ready(0):
+            devices = [device.as_tuple() for device in self.device_tracker.devices()]
+        else:
+            devices = None
+            if self.adb_client:
+                try:
+                    devices = [device.as_tuple() for device in self.adb_client.devices()]
+                except AdbError:
+                    pass
+            if devices is None:
+                devices = self._get_connected_devices_cli(quiet=True)
+        return next((state for device_serial, state in devices if device_serial == serial), None)
+
+    def stop_supervision(self, device_serial: Optional[str] = None):
+        """Detiene la reconexión automática del dispositivo (o de todos) sin detener scrcpy."""
+        serials = [device_serial] if device_serial else list(self.supervisors)
+        for serial in serials:
+            supervisor = self.supervisors.get(serial) # Se conserva para consultar sus incidentes
+            if supervisor and supervisor.is_active():
+                supervisor.stop()
+                self._log_reconnect_summary(supervisor)
+
+    def _log_reconnect_summary(self, supervisor: SessionSupervisor):
+        status = supervisor.status()
+        if status["incident_count"]:
+            mttr = f"{status['mttr_seconds']:.1f}s" if status["mttr_seconds"] is not None else "-"
+            self.emit(f"📈 Reconexión de {supervisor.serial}: {status['incident_count']} caídas, "
+                      f"{status['recovered_count']} recuperadas, MTTR {mttr}, "
+                      f"{status['total_downtime_seconds']:.1f}s sin servicio.",
+                      phase="reconnect", serial=supervisor.serial)
+
+    def get_reconnect_status(self, device_serial: Optional[str] = None) -> List[dict]:
+        """Estado, incidentes con su tiempo sin servicio y MTTR de cada supervisor de reconexión."""
+        if device_serial:
+            supervisor = self.supervisors.get(device_serial)
+            return [supervisor.status()] if supervisor else []
+        return [supervisor.status() for supervisor in self.supervisors.values()]
+
+    def get_scrcpy_output_tail(self, count: int = 50, device_serial: Optional[str] = None) -> List[str]:
+        """Devuelve las últimas líneas de salida de la sesión del dispositivo (o de la última lanzada)."""
+        session = self.sessions.get(device_serial) if device_serial else self.scrcpy_session
+        if not session:
+            return []
+        return session.tail(count)
+
+    def list_sessions(self) -> List[dict]:
+        """Estado, código de salida, tiempos y últimas líneas de cada sesión scrcpy."""
+        return self.sessions.list_sessions()
+
+    def _get_build_fingerprint(self, serial: str) -> Optional[str]:
+        """ro.build.fingerprint del dispositivo (cambia con cada actualización del sistema)."""
+        if self.adb_client:
+            try:
+                return self.adb_client.shell(serial, "getprop ro.build.fingerprint").strip() or None
+            except AdbServerUnavailableError:
+                pass
+            except AdbError:
+                return None
+        try:
+            result = self.commands.run(["adb", "-s", serial, "shell", "getprop", "ro.build.fingerprint"],
+                                       capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip() or None
+
+    def get_device_capabilities(self, device_serial: str, force: bool = False) -> Optional[dict]:
+        """
+        Codificadores de vídeo/audio y pantallas del dispositivo.
+
+        El sondeo ('scrcpy --list-encoders --list-displays') sólo se ejecuta la
+        primera vez; después se reutiliza la caché en memoria o en disco, indexada
+        por serial, huella de compilación y versión de scrcpy.
+
+        Args:
+            force: Volver a sondear aunque haya datos en caché.
+        """
+        scrcpy_info = self.dependency_info.get("scrcpy") or {}
+        if scrcpy_info.get("capabilities") and not scrcpy_info["capabilities"].get("list_encoders"):
+            return None # scrcpy < 2.0 no puede listar codificadores
+        version = scrcpy_info.get("version")
+        version_text = ".".join(str(part) for part in version) if version else None
+        capabilities = self.device_capabilities.get(device_serial, version_text, force=force)
+        if capabilities is None:
+            self.log_callback(f"⚠️  No se pudieron obtener los codificadores de {device_serial}; se usará H.264.")
+        elif not capabilities["cached"]:
+            hardware = sorted({enc["codec"] for enc in capabilities["video_encoders"] if enc["hardware"]})
+            self.log_callback(f"🔎 Codificadores de {device_serial}: {', '.join(hardware) or 'sin hardware'} "
+                              f"(sondeo de {capabilities['probe_seconds']:.1f}s, guardado en caché).")
+        return capabilities
+
+    def _select_codecs(self, device_serial: Optional[str], options: dict) -> tuple[List[str], Optional[str]]:
+        """Argumentos de códec/codificador de vídeo y códec de audio para el dispositivo."""
+        if options.get("video_codec"):
+            video_args = [f"--video-codec={options['video_codec']}"]
+            if options.get("video_encoder"):
+                video_args.append(f"--video-encoder={options['video_encoder']}")
+            return video_args, options.get("audio_codec")
+        capabilities = None
+        if device_serial and options.get("auto_encoder", True):
+            capabilities = self.get_device_capabilities(device_serial)
+        if not capabilities:
+            return ["--video-codec=h264"], options.get("audio_codec")
+        preference = options.get("codec_preference") or DEFAULT_VIDEO_CODEC_PREFERENCE
+        encoder = select_video_encoder(capabilities["video_encoders"], preference)
+        audio_codec = options.get("audio_codec") or select_audio_codec(capabilities["audio_encoders"])
+        if not encoder:
+            return ["--video-codec=h264"], audio_codec
+        return [f"--video-codec={encoder['codec']}", f"--video-encoder={encoder['name']}"], audio_codec
+
     def _build_scrcpy_command(self, device_serial: Optional[str], options: dict) -> List[str]:
         """Construye el comando scrcpy basado en el serial y las opciones de la GUI."""
         scrcpy_cmd = ["scrcpy"]
@@ -336,13 +1285,13 @@ class AndroidMirror:
         if device_serial:
             scrcpy_cmd.extend(["-s", device_serial])
         elif self.connection_type == "wifi" and self.device_ip: # Fallback si no hay serial pero es WiFi
-            scrcpy_cmd.extend(["-s", f"{self.device_ip}:5555"])
+            scrcpy_cmd.extend(["-s", f"{self.device_ip}:{self.device_port}"])
         
         # Opciones de la GUI (el diccionario 'options' debe tener claves como 'max_size', 'bit_rate', etc.)
         if options.get("max_size"):
             scrcpy_cmd.extend(["--max-size", str(options["max_size"])])
         
-        if options.get("fullscreen_scrcpy"): # Clave usada en la GUI
+        if options.get("fullscreen_scrcpy") and not options.get("headless"): # Clave usada en la GUI
             scrcpy_cmd.append("--fullscreen")
 
         if options.get("bit_rate"):
@@ -360,33 +1309,131 @@ class AndroidMirror:
         
         if options.get("no_control"):
             scrcpy_cmd.append("--no-control")
+        elif options.get("turn_screen_off"): # Requiere control
+            scrcpy_cmd.append("--turn-screen-off")
+
+        # Búferes (ms): más búfer absorbe el jitter de red a costa de latencia
+        if options.get("video_buffer") is not None:
+            capabilities = (self.dependency_info.get("scrcpy") or {}).get("capabilities") or {}
+            buffer_flag = "--video-buffer" if capabilities.get("video_buffer", True) else "--display-buffer"
+            scrcpy_cmd.append(f"{buffer_flag}={int(options['video_buffer'])}")
         
-        # Manejo de audio
-        if not options.get("no_audio"):
-            # Aquí se podría re-implementar la verificación de compatibilidad de scrcpy si es necesario,
-            # o asumirla basada en check_dependencies.
-            # Por simplicidad, añadimos la opción si no está deshabilitada.
-            scrcpy_cmd.append("--audio-codec=aac") # O la opción de audio que prefieras/detectes
+        # Códec y codificador elegidos según lo que admite el dispositivo (sondeo en caché)
+        video_args, audio_codec = [], options.get("audio_codec")
+        if not options.get("no_video_optimization"):
+            video_args, audio_codec = self._select_codecs(device_serial, options)
+
+        # Manejo de audio (en headless sin grabación nadie lo reproduciría ni guardaría)
+        audio_unused = options.get("headless") and not options.get("record_file")
+        if not options.get("no_audio") and not audio_unused:
+            scrcpy_cmd.append(f"--audio-codec={audio_codec or 'aac'}")
+            if options.get("audio_bit_rate"):
+                scrcpy_cmd.append(f"--audio-bit-rate={options['audio_bit_rate']}")
+            if options.get("audio_buffer") is not None:
+                scrcpy_cmd.append(f"--audio-buffer={int(options['audio_buffer'])}")
             # scrcpy_cmd.append("--no-audio-playback") # Ejemplo si quieres audio del dispositivo pero no en PC
         else:
             scrcpy_cmd.append("--no-audio") # Explícitamente no audio si la GUI lo indica
 
         # Optimizaciones de video
         if not options.get("no_video_optimization"):
-            scrcpy_cmd.append("--video-codec=h264") # Ejemplo
-            scrcpy_cmd.append("--max-fps=60")       # Ejemplo
+            scrcpy_cmd.extend(video_args)
+            scrcpy_cmd.append(f"--max-fps={options.get('max_fps') or 60}")
+        elif options.get("max_fps"):
+            scrcpy_cmd.append(f"--max-fps={options['max_fps']}")
+
+        if self._wants_fps_reports(options):
+            scrcpy_cmd.append("--print-fps") # Informe periódico de FPS (métricas y control adaptativo)
         
+        # Grabación (un archivo; la rotación de segmentos la gestiona SegmentedRecorder)
+        if options.get("record_file"):
+            scrcpy_cmd.extend(["--record", options["record_file"]])
+            if options.get("record_format"):
+                scrcpy_cmd.append(f"--record-format={options['record_format']}")
+
+        # Sin reproducción (grabación sin ventana o modo headless): no se renderiza nada en el PC
+        capabilities = (self.dependency_info.get("scrcpy") or {}).get("capabilities") or {}
+        if options.get("headless") or (options.get("record_file") and options.get("record_no_playback")):
+            scrcpy_cmd.append("--no-playback" if capabilities.get("no_playback", True) else "--no-display")
+        if options.get("headless"):
+            if capabilities.get("no_window", True):
+                scrcpy_cmd.append("--no-window") # Ni siquiera se inicializa el vídeo de SDL
+            if not options.get("no_control"):
+                scrcpy_cmd.append("--no-control") # Sin ventana no hay eventos de entrada que reenviar
+        if options.get("v4l2_sink"):
+            scrcpy_cmd.append(f"--v4l2-sink={options['v4l2_sink']}") # Fotogramas para OpenCV/ffmpeg (Linux)
+        if options.get("time_limit"):
+            scrcpy_cmd.append(f"--time-limit={int(options['time_limit'])}")
+
         # Otras opciones que podrías querer pasar desde la GUI:
-        # if options.get("record_file"):
-        #     scrcpy_cmd.extend(["--record", options["record_file"]])
         # if options.get("always_on_top"):
         #     scrcpy_cmd.append("--always-on-top")
         
         self.log_callback(f"Comando scrcpy construido: {' '.join(scrcpy_cmd)}")
         return scrcpy_cmd
     
-    def wait_for_completion(self):
-        """Espera a que scrcpy termine y maneja la limpieza."""
+    def _wants_fps_reports(self, options: dict) -> bool:
+        """--print-fps para métricas (opción o endpoint de Prometheus activo) y control adaptativo."""
+        return bool(options.get("print_fps") or options.get("fps_metrics") or self.metrics_server)
+
+    def _supports_headless(self) -> bool:
+        capabilities = (self.dependency_info.get("scrcpy") or {}).get("capabilities")
+        return capabilities is None or capabilities.get("no_playback", False)
+
+    def _print_stream_status(self):
+        for snapshot in self.get_stream_metrics():
+            if snapshot["running"]:
+                self.log_callback(f"📊 {format_metrics(snapshot)}")
+
+    def _wait_sessions(self, is_active, status_interval: Optional[float]):
+        """Bloquea mientras is_active() sea cierto, mostrando las métricas cada status_interval segundos."""
+        last_status = time.monotonic()
+        try:
+            while is_active():
+                time.sleep(1)
+                if status_interval and time.monotonic() - last_status >= status_interval:
+                    last_status = time.monotonic()
+                    self._print_stream_status()
+        except KeyboardInterrupt:
+            self.log_callback("\n🛑 Detención por KeyboardInterrupt (CLI)...")
+            self.stop_scrcpy()
+
+    def wait_for_completion(self, status_interval: Optional[float] = None):
+        """
+        Espera a que scrcpy termine y maneja la limpieza.
+
+        Args:
+            status_interval: Segundos entre líneas de estado con las métricas de
+                FPS (solo sesiones lanzadas con fps_metrics). None = sin estado
+                y, en sesiones con ventana, sin bloquear.
+        """
+        if self.recorders:
+            # La rotación de segmentos necesita que el proceso siga vivo
+            self.log_callback("\n⏺️  Grabación en curso. Pulsa Ctrl+C para detenerla.")
+            self._wait_sessions(lambda: any(recorder.is_active() for recorder in self.recorders.values()),
+                                status_interval)
+            return
+        supervisors = [supervisor for supervisor in self.supervisors.values() if supervisor.is_active()]
+        if supervisors:
+            # Una caída no debe terminar la CLI mientras el supervisor relanza la sesión
+            self.log_callback("\n🛡️  Reconexión automática activa. Cierra la ventana de scrcpy o pulsa Ctrl+C para detener.")
+            self._wait_sessions(lambda: any(supervisor.is_active() for supervisor in supervisors), status_interval)
+            for supervisor in supervisors:
+                if not supervisor.is_active(): # Los que siguen activos informan al detenerse
+                    self._log_reconnect_summary(supervisor)
+            return
+        headless_sessions = [session for session in self.sessions.running() if session.options.get("headless")]
+        if headless_sessions:
+            # Sin ventana que cerrar: se espera a que las sesiones terminen (o --duration) o a Ctrl+C
+            self.log_callback("\n⏳ Sesión headless en curso. Pulsa Ctrl+C para detenerla.")
+            self._wait_sessions(lambda: any(session.is_running() for session in headless_sessions),
+                                status_interval)
+            return
+        if status_interval and self.sessions.running():
+            # Con métricas activadas la CLI se queda mostrando el estado hasta que se cierre la ventana
+            self.log_callback("\n⏳ Scrcpy en ejecución. Cierra la ventana de scrcpy o pulsa Ctrl+C para detener.")
+            self._wait_sessions(lambda: bool(self.sessions.running()), status_interval)
+            return
         if self.scrcpy_process:
             try:
                 self.log_callback("\n⏳ Scrcpy en ejecución. Cierra la ventana de scrcpy para detener.")
@@ -398,33 +1445,61 @@ class AndroidMirror:
             # finally:
                 # self.cleanup() # Cleanup se llamará desde la GUI al cerrar o detener explícitamente
     
-    def stop_scrcpy(self):
-        """Detiene el proceso de scrcpy."""
-        if self.scrcpy_process and self.scrcpy_process.poll() is None:
+    @log_phase("stop", serial_arg="device_serial")
+    def stop_scrcpy(self, device_serial: Optional[str] = None):
+        """Detiene la sesión scrcpy del dispositivo indicado, o todas si no se indica ninguno."""
+        self.stop_supervision(device_serial) # Primero: una detención a petición no es una caída
+        self.stop_adaptive_quality(device_serial)
+        self.stop_recording(device_serial) # Antes que las sesiones: evita que se abra otro segmento
+        if device_serial:
+            if not self.sessions.stop(device_serial):
+                self.log_callback(f"No hay ninguna sesión scrcpy para {device_serial}.")
+            return
+        if self.sessions.sessions():
+            self.sessions.stop_all()
+        elif self.scrcpy_process and self.scrcpy_process.poll() is None:
             self.scrcpy_process.terminate()
             try:
                 self.scrcpy_process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 self.scrcpy_process.kill()
     
-    def cleanup(self):
-        """Limpia recursos y conexiones."""
+    @log_phase("cleanup")
+    def cleanup(self, disconnect_wifi: bool = False):
+        """
+        Limpia recursos y conexiones.
+
+        Con el pool Wi-Fi activo las conexiones se mantienen en el servidor ADB
+        para la próxima sesión (también tras terminar el proceso, donde ya nadie
+        las hace caducar); disconnect_wifi=True las cierra todas.
+        """
         self.log_callback("\n🧹 Limpiando recursos...")
-        self.stop_scrcpy() # Asegurarse que scrcpy esté detenido
+        self.stop_scrcpy() # Asegurarse que todas las sesiones scrcpy estén detenidas
+        self.stop_device_tracking()
 
-        if self.connection_type == "wifi" and self.device_ip:
+        if self.wifi_pool:
+            self.wifi_pool.stop()
+            if disconnect_wifi:
+                self.disconnect_wifi()
+            elif self.wifi_pool.serials():
+                self.log_callback(f"🔗 Conexiones Wi-Fi mantenidas para la próxima sesión: "
+                                  f"{', '.join(self.wifi_pool.serials())}")
+        elif self.connection_type == "wifi" and self.device_ip:
+            wifi_serial = f"{self.device_ip}:{self.device_port}"
             try:
-                self.log_callback(f"Intentando desconectar de {self.device_ip}:5555...")
-                result = subprocess.run(["adb", "disconnect", f"{self.device_ip}:5555"], 
-                                      capture_output=True, text=True, timeout=10)
+                self.log_callback(f"Intentando desconectar de {wifi_serial}...")
+                result = self._adb_disconnect(wifi_serial)
                 if result.returncode == 0 and ("disconnected" in result.stdout or not result.stdout):
-                    self.log_callback(f"✅ Desconectado de {self.device_ip}:5555")
+                    self.log_callback(f"✅ Desconectado de {wifi_serial}")
                 elif result.stdout or result.stderr:
-                    self.log_callback(f"Salida al desconectar de {self.device_ip}:5555: {result.stdout} {result.stderr}")
+                    self.log_callback(f"Salida al desconectar de {wifi_serial}: {result.stdout} {result.stderr}")
                 else:
-                    self.log_callback(f"No se pudo confirmar la desconexión de {self.device_ip}:5555, o ya estaba desconectado.")
+                    self.log_callback(f"No se pudo confirmar la desconexión de {wifi_serial}, o ya estaba desconectado.")
             except Exception as e:
-                self.log_callback(f"Error al intentar desconectar ADB de {self.device_ip}:5555: {e}")
+                self.log_callback(f"Error al intentar desconectar ADB de {wifi_serial}: {e}")
+
+        if self.adb_client:
+            self.adb_client.close()
         
         # Limpiar variable de entorno si se estableció (aunque preferimos -s)
         if 'ANDROID_SERIAL' in os.environ:
@@ -435,70 +1510,24 @@ class AndroidMirror:
                 self.log_callback(f"Error al eliminar ANDROID_SERIAL: {e}")
         
         self.log_callback("✅ Limpieza completada.")
+        self.stop_metrics_server()
+        self.disable_json_log()
 
+    def _adb_disconnect(self, serial: str) -> subprocess.CompletedProcess:
+        """Desconecta un dispositivo TCP, por el servidor ADB o con 'adb disconnect' como respaldo."""
+        if self.adb_client:
+            try:
+                message = self.adb_client.disconnect(serial)
+                return subprocess.CompletedProcess(["adb", "disconnect", serial], 0, message, "")
+            except AdbServerUnavailableError:
+                pass
+            except AdbError as e:
+                return subprocess.CompletedProcess(["adb", "disconnect", serial], 1, "", str(e))
+        return self.commands.run(["adb", "disconnect", serial], 
+                                 capture_output=True, text=True, timeout=10)
 
-# --- Lógica para ejecución como script independiente --- 
-
-def main():
-    """Función principal para ejecución desde línea de comandos."""
-    parser = create_argument_parser()
-    args = parser.parse_args()
-
-    # Usar print para la salida de la CLI, ya que no hay GUI log_callback aquí
-    mirror_app = AndroidMirror(log_callback=print) 
-
-    if not mirror_app.check_dependencies():
-        sys.exit(1)
-
-    connected = False
-    if args.wifi:
-        connected, _ = mirror_app.connect_wifi(args.wifi) # connect_wifi ahora devuelve tupla
-    elif args.usb:
-        connected = mirror_app.connect_usb()
-    else:
-        # Modo interactivo si no se especifica conexión
-        print("Selecciona el modo de conexión:")
-        print("1. USB")
-        print("2. Wi-Fi")
-        choice = input("Opción: ")
-        if choice == '1':
-            connected = mirror_app.connect_usb()
-        elif choice == '2':
-            ip = input("Introduce la IP del dispositivo: ")
-            connected, _ = mirror_app.connect_wifi(ip)
-        else:
-            print("Opción inválida.")
-            sys.exit(1)
-
-    if connected:
-        # Para la CLI, creamos un diccionario de opciones a partir de args
-        cli_options = {
-            "max_size": args.max_size,
-            "fullscreen_scrcpy": args.fullscreen, # argparse usa 'fullscreen'
-            "bit_rate": args.bit_rate,
-            "no_control": args.no_control,
-            "no_audio": args.no_audio,
-            "no_video_optimization": args.no_video_optimization
-        }
-        # Para la CLI, el device_serial se maneja internamente por connect_usb/wifi o ANDROID_SERIAL
-        # o se podría pasar explícitamente si connect_usb devolviera el serial.
-        # Si es WiFi, el serial es la IP:puerto.
-        device_serial_for_cli = None
-        if mirror_app.connection_type == "wifi" and mirror_app.device_ip:
-            device_serial_for_cli = f"{mirror_app.device_ip}:5555"
-        # Si es USB y se seleccionó uno, ANDROID_SERIAL está seteado, o scrcpy lo toma por defecto si solo hay uno.
-        # Para ser más explícito, connect_usb podría devolver el serial.
-
-        if mirror_app.start_mirroring(device_serial_for_cli, cli_options):
-            mirror_app.wait_for_completion()
-        else:
-            mirror_app.cleanup()
-    else:
-        print("No se pudo establecer conexión con el dispositivo.")
-
-if __name__ == "__main__":
-    main()
 
+# --- Lógica para ejecución como script independiente --- 
 
 def create_argument_parser() -> argparse.ArgumentParser:
     """Crea y configura el parser de argumentos de línea de comandos."""
@@ -512,7 +1541,11 @@ Ejemplos de uso:
   %(prog)s --wifi 192.168.1.100               # Conexión Wi-Fi
   %(prog)s --wifi 192.168.1.100 --max-size 1024 --bit-rate 8M
   %(prog)s --usb --no-control                 # Solo visualización, sin control
-        """
+  %(prog)s --watch-devices                    # Mostrar conexiones/desconexiones en tiempo real
+  %(prog)s --connect-many 10.0.0.5 10.0.0.6:5556 @laboratorio.txt
+  %(prog)s --scan-network 192.168.1.0/24 --verify-banner --scan-connect
+        """,
+        fromfile_prefix_chars="@"
     )
     
     # Opciones de conexión
@@ -525,6 +1558,34 @@ Ejemplos de uso:
         "--wifi", metavar="IP",
         help="Conectar vía Wi-Fi usando la IP especificada"
     )
+    connection_group.add_argument(
+        "--watch-devices", action="store_true",
+        help="Vigilar conexiones y cambios de estado de dispositivos hasta Ctrl+C"
+    )
+    connection_group.add_argument(
+        "--connect-many", nargs="+", metavar="HOST[:PUERTO]",
+        help="Conectar en paralelo muchos dispositivos Wi-Fi (@archivo lee un destino por línea)"
+    )
+    connection_group.add_argument(
+        "--scan-network", nargs="?", const="auto", metavar="CIDR",
+        help="Buscar dispositivos ADB sobre TCP en la red (por defecto la /24 local)"
+    )
+    parser.add_argument(
+        "--verify-banner", action="store_true",
+        help="Con --scan-network, confirmar el saludo del protocolo ADB en cada equipo"
+    )
+    parser.add_argument(
+        "--scan-connect", action="store_true",
+        help="Con --scan-network, conectar los dispositivos encontrados"
+    )
+    parser.add_argument(
+        "--probe-timeout", type=float, metavar="SEGUNDOS", default=DEFAULT_PROBE_TIMEOUT,
+        help=f"Tiempo máximo del sondeo TCP previo en --connect-many (por defecto {DEFAULT_PROBE_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--connect-workers", type=int, metavar="N", default=DEFAULT_CONNECT_WORKERS,
+        help=f"Conexiones simultáneas en --connect-many (por defecto {DEFAULT_CONNECT_WORKERS})"
+    )
     
     # Opciones de scrcpy
     parser.add_argument(
@@ -551,6 +1612,125 @@ Ejemplos de uso:
         "--fullscreen", action="store_true",
         help="Abrir scrcpy en modo pantalla completa"
     )
+    parser.add_argument(
+        "--no-dependency-cache", action="store_true",
+        help="Verificar ADB y scrcpy ejecutándolos aunque haya resultados en caché"
+    )
+    parser.add_argument(
+        "--log-json", metavar="ARCHIVO",
+        help="Guardar los eventos de log estructurados en un archivo JSON-lines (con rotación)"
+    )
+    parser.add_argument(
+        "--launch-timeout", type=float, metavar="SEGUNDOS", default=DEFAULT_LAUNCH_TIMEOUT,
+        help=f"Tiempo máximo de espera a que scrcpy esté listo (por defecto {DEFAULT_LAUNCH_TIMEOUT:.0f})"
+    )
+    parser.add_argument(
+        "--profile", metavar="NOMBRE",
+        help="Perfil de lanzamiento: low-latency, low-bandwidth, high-fidelity, battery-saver "
+             "o uno definido en el archivo de perfiles (las opciones explícitas prevalecen)"
+    )
+    parser.add_argument(
+        "--profiles-file", metavar="ARCHIVO",
+        help=f"Archivo JSON con perfiles de usuario (por defecto {default_profiles_path()})"
+    )
+    parser.add_argument(
+        "--list-profiles", action="store_true",
+        help="Mostrar los perfiles disponibles y salir"
+    )
+    parser.add_argument(
+        "--record-dir", metavar="CARPETA",
+        help="Grabar la sesión en segmentos rotados dentro de esta carpeta"
+    )
+    parser.add_argument(
+        "--segment-seconds", type=float, metavar="SEGUNDOS", default=DEFAULT_SEGMENT_SECONDS,
+        help=f"Duración máxima de cada segmento (por defecto {DEFAULT_SEGMENT_SECONDS}; 0 = sin límite)"
+    )
+    parser.add_argument(
+        "--segment-size-mb", type=float, metavar="MIB", default=DEFAULT_SEGMENT_MAX_BYTES // 1024 ** 2,
+        help=f"Tamaño máximo de cada segmento (por defecto {DEFAULT_SEGMENT_MAX_BYTES // 1024 ** 2})"
+    )
+    parser.add_argument(
+        "--record-max-total-mb", type=float, metavar="MIB",
+        help="Retención: borrar los segmentos más antiguos al superar este total por dispositivo"
+    )
+    parser.add_argument(
+        "--record-format", choices=["mkv", "mp4"], default=DEFAULT_RECORD_FORMAT,
+        help="Contenedor de los segmentos (mkv sigue siendo legible si se interrumpe)"
+    )
+    parser.add_argument(
+        "--record-only", action="store_true",
+        help="Grabar sin ventana ni reproducción (menos CPU/GPU en el PC)"
+    )
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="Sin ventana ni reproducción (servidores, contenedores, CI); se activa solo si no hay pantalla"
+    )
+    parser.add_argument(
+        "--v4l2-sink", metavar="DISPOSITIVO",
+        help="Enviar los fotogramas a un dispositivo v4l2loopback, p. ej. /dev/video2 (solo Linux)"
+    )
+    parser.add_argument(
+        "--duration", type=int, metavar="SEGUNDOS",
+        help="Finalizar la sesión tras este tiempo (scrcpy 2.3+, útil en trabajos de captura)"
+    )
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Al salir, mostrar el tiempo de cada llamada a adb/scrcpy por fase y las más lentas"
+    )
+    parser.add_argument(
+        "--timings-json", metavar="ARCHIVO",
+        help="Al salir, guardar el desglose de tiempos (con cada llamada) en un archivo JSON"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, metavar="PUERTO",
+        help=f"Publicar métricas de Prometheus en http://HOST:PUERTO/metrics (p. ej. {DEFAULT_METRICS_PORT})"
+    )
+    parser.add_argument(
+        "--metrics-host", default=DEFAULT_METRICS_HOST, metavar="HOST",
+        help=f"Interfaz del endpoint de métricas (por defecto: {DEFAULT_METRICS_HOST})"
+    )
+    parser.add_argument(
+        "--fps", action="store_true",
+        help="Mostrar periódicamente FPS y fotogramas descartados (scrcpy --print-fps)"
+    )
+    parser.add_argument(
+        "--status-interval", type=float, default=5.0, metavar="SEGUNDOS",
+        help="Segundos entre líneas de estado con --fps (por defecto: 5)"
+    )
+    parser.add_argument(
+        "--video-codec", choices=["h264", "h265", "av1"],
+        help="Forzar el códec de vídeo (por defecto se elige el codificador por hardware más eficiente)"
+    )
+    parser.add_argument(
+        "--no-auto-encoder", action="store_true",
+        help="No sondear los codificadores del dispositivo; usar H.264"
+    )
+    parser.add_argument(
+        "--adaptive-quality", action="store_true",
+        help="Ajustar bitrate, resolución y FPS según la calidad del enlace (sólo Wi-Fi)"
+    )
+    parser.add_argument(
+        "--adaptive-start", choices=[preset.name for preset in DEFAULT_QUALITY_LADDER],
+        default=DEFAULT_START_PRESET,
+        help=f"Peldaño de calidad inicial con --adaptive-quality (por defecto {DEFAULT_START_PRESET})"
+    )
+    parser.add_argument(
+        "--auto-reconnect", action="store_true",
+        help="Reconectar y relanzar scrcpy automáticamente si la sesión Wi-Fi cae"
+    )
+    parser.add_argument(
+        "--reconnect-attempts", type=int, default=ReconnectPolicy.max_attempts, metavar="N",
+        help=f"Intentos por caída con --auto-reconnect (por defecto: {ReconnectPolicy.max_attempts})"
+    )
+    parser.add_argument(
+        "--reconnect-max-delay", type=float, default=ReconnectPolicy.max_delay, metavar="SEGUNDOS",
+        help=f"Espera máxima entre intentos con --auto-reconnect (por defecto: {ReconnectPolicy.max_delay:.0f})"
+    )
+    parser.add_argument(
+        "--disconnect-wifi", action="store_true",
+        help="Desconectar los dispositivos Wi-Fi al salir (por defecto la conexión se mantiene en el "
+             "servidor ADB para la próxima ejecución, sin caducidad por inactividad)"
+    )
     
     return parser
 
@@ -570,7 +1750,8 @@ def interactive_menu(mirror: AndroidMirror) -> bool:
             elif choice == "2":
                 ip = input("Introduce la dirección IP del dispositivo Android (ej. 192.168.1.100): ").strip()
                 if ip:
-                    return mirror.connect_wifi(ip)
+                    connected, _ = mirror.connect_wifi(ip)
+                    return connected
                 else:
                     print("❌ Dirección IP no puede estar vacía.")
             else:
@@ -580,6 +1761,84 @@ def interactive_menu(mirror: AndroidMirror) -> bool:
             return False
 
 
+def watch_devices(mirror: AndroidMirror) -> int:
+    """Muestra los eventos de dispositivos en tiempo real hasta Ctrl+C."""
+    tracker = mirror.start_device_tracking()
+    if not tracker:
+        return 1
+    print("👀 Vigilando dispositivos (Ctrl+C para salir)...")
+    if not tracker.wait_ready(timeout=5):
+        print("⚠️  El servidor ADB no responde todavía; se reintentará automáticamente.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n👋 Vigilancia finalizada.")
+    finally:
+        mirror.stop_device_tracking()
+    return 0
+
+
+def print_profiles(mirror: AndroidMirror):
+    """Muestra los perfiles de lanzamiento disponibles y sus opciones."""
+    print("\n🎛️  Perfiles de lanzamiento:")
+    for name, profile in mirror.list_profiles().items():
+        description = profile.pop("description", "")
+        print(f"\n  {name}: {description}")
+        print("     " + ", ".join(f"{key}={value}" for key, value in sorted(profile.items())))
+
+
+def report_timings(mirror: AndroidMirror, show: bool, json_path: Optional[str]):
+    """Informe de tiempos de las llamadas externas al terminar (--timings / --timings-json)."""
+    if show:
+        print("\n" + mirror.command_timings_report())
+    if json_path:
+        mirror.save_command_timings(json_path)
+
+
+def release_wifi(mirror: AndroidMirror):
+    """--disconnect-wifi: cierra las conexiones del pool al salir, salvo las que usa un scrcpy que sigue abierto."""
+    if not mirror.wifi_pool:
+        return
+    in_use = {session.serial for session in mirror.sessions.running()}
+    for serial in mirror.wifi_pool.serials():
+        if serial in in_use:
+            mirror.log_callback(f"🔗 {serial} sigue en uso por scrcpy; la conexión Wi-Fi se mantiene.")
+        else:
+            mirror.disconnect_wifi(serial)
+
+
+def build_cli_options(args: argparse.Namespace) -> dict:
+    """Convierte los argumentos de la CLI en el diccionario de opciones de start_mirroring."""
+    return {
+        "max_size": args.max_size,
+        "fullscreen_scrcpy": args.fullscreen, # argparse usa 'fullscreen'
+        "bit_rate": args.bit_rate,
+        "no_control": args.no_control,
+        "no_audio": args.no_audio,
+        "no_video_optimization": args.no_video_optimization,
+        "launch_timeout": args.launch_timeout,
+        "adaptive_quality": args.adaptive_quality,
+        "adaptive_start": args.adaptive_start,
+        "auto_reconnect": args.auto_reconnect,
+        "reconnect_max_attempts": args.reconnect_attempts,
+        "reconnect_max_delay": args.reconnect_max_delay,
+        "video_codec": args.video_codec,
+        "auto_encoder": not args.no_auto_encoder,
+        "profile": args.profile,
+        "record_dir": args.record_dir,
+        "record_segment_seconds": args.segment_seconds,
+        "record_segment_mb": args.segment_size_mb,
+        "record_max_total_mb": args.record_max_total_mb,
+        "record_format": args.record_format,
+        "record_no_playback": args.record_only,
+        "headless": args.headless,
+        "v4l2_sink": args.v4l2_sink,
+        "time_limit": args.duration,
+        "fps_metrics": args.fps
+    }
+
+
 def main():
     """Función principal del script."""
     print("🎯 Bienvenido al Duplicador de Pantalla y Audio Android")
@@ -589,14 +1848,51 @@ def main():
     parser = create_argument_parser()
     args = parser.parse_args()
     
+    # Sin X/Wayland scrcpy no puede abrir ventana: se pasa a modo headless automáticamente
+    if not args.headless and sys.platform.startswith("linux") and not (
+            os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        print("🖥️  No se detectó pantalla (DISPLAY/WAYLAND_DISPLAY); activando el modo headless.")
+        args.headless = True
+
     # Crear instancia del mirror
-    mirror = AndroidMirror()
+    mirror = AndroidMirror(headless=args.headless)
+    if args.log_json:
+        mirror.enable_json_log(args.log_json)
+    if args.timings or args.timings_json:
+        # atexit: el informe sale también si la sesión termina con Ctrl+C o por un error
+        atexit.register(report_timings, mirror, args.timings, args.timings_json)
+    if args.metrics_port is not None and not mirror.start_metrics_server(args.metrics_port, args.metrics_host):
+        return 1
+    
+    if args.profiles_file:
+        mirror.load_profiles(args.profiles_file)
+    if args.list_profiles:
+        print_profiles(mirror)
+        return 0
+    if args.profile and args.profile not in mirror.profiles:
+        print(f"❌ Perfil desconocido: '{args.profile}'. Disponibles: {', '.join(mirror.profiles)}")
+        return 1
     
     try:
+        # La vigilancia sólo necesita el servidor ADB, no scrcpy
+        if args.watch_devices:
+            return watch_devices(mirror)
+
+        if args.connect_many:
+            results = mirror.connect_wifi_many(args.connect_many, probe_timeout=args.probe_timeout,
+                                               max_workers=args.connect_workers)
+            return 0 if any(row["connected"] for row in results) else 1
+
+        if args.scan_network:
+            network = None if args.scan_network == "auto" else args.scan_network
+            hits = mirror.discover_wifi_devices(network, verify_banner=args.verify_banner,
+                                                connect=args.scan_connect)
+            return 0 if hits else 1
+
         # Verificar dependencias
-        if not mirror.check_dependencies():
+        if not mirror.check_dependencies(use_cache=not args.no_dependency_cache):
             return 1
-        
+
         # Mostrar instrucciones de configuración Android
         mirror.show_android_setup_instructions()
         
@@ -606,7 +1902,7 @@ def main():
         if args.usb:
             connection_established = mirror.connect_usb()
         elif args.wifi:
-            connection_established = mirror.connect_wifi(args.wifi)
+            connection_established, _ = mirror.connect_wifi(args.wifi)
         else:
             # Modo interactivo
             connection_established = interactive_menu(mirror)
@@ -615,9 +1911,13 @@ def main():
             print("\n❌ No se pudo establecer conexión con el dispositivo.")
             return 1
         
-        # Iniciar scrcpy
-        if mirror.start_scrcpy(args):
-            mirror.wait_for_completion()
+        # Iniciar scrcpy (para Wi-Fi el serial es IP:puerto)
+        device_serial = None
+        if mirror.connection_type == "wifi" and mirror.device_ip:
+            device_serial = f"{mirror.device_ip}:{mirror.device_port}"
+
+        if mirror.start_mirroring(device_serial, build_cli_options(args)):
+            mirror.wait_for_completion(status_interval=args.status_interval if args.fps else None)
             print("\n✅ Sesión de duplicación finalizada exitosamente.")
             return 0
         else:
@@ -626,12 +1926,15 @@ def main():
             
     except KeyboardInterrupt:
         print("\n\n👋 Operación cancelada por el usuario.")
-        mirror.cleanup()
+        mirror.cleanup(disconnect_wifi=args.disconnect_wifi)
         return 0
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
-        mirror.cleanup()
+        mirror.cleanup(disconnect_wifi=args.disconnect_wifi)
         return 1
+    finally:
+        if args.disconnect_wifi:
+            release_wifi(mirror)
 
 
 if __name__ == "__main__":
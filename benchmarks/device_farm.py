@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulador de granja de dispositivos con inyección de fallos
+
+FakeAdbServer implementa el protocolo host de ADB (el mismo que usa
+adb_client) sobre un puerto local y expone N dispositivos virtuales: USB y
+Wi-Fi (estos aparecen al hacer host:connect), con estados device,
+unauthorized u offline, latencia de conexión con jitter, fallos de conexión,
+dispositivos que alternan entre device y offline (flapping) y conexiones TCP
+cortadas antes de responder. Los seguidores de host:track-devices reciben
+cada cambio como el servidor real, y host:kill cierra el puerto, olvida las
+conexiones Wi-Fi y vuelve a escuchar en el mismo puerto tras restart_delay
+(el papel de 'adb start-server').
+
+El scrcpy de imitación de stub_tools completa el escenario: arranque con
+salida realista, informes de FPS y fallos bajo demanda.
+
+El programa principal lleva a AndroidMirror por descubrimiento, conexión
+masiva y lanzamiento de sesiones a escala, y muestra rendimiento, latencias
+de cola (p50/p90/p99) y recursos del proceso anfitrión:
+
+    python benchmarks/device_farm.py --usb 50 --wifi 300 --sessions 40
+    python benchmarks/device_farm.py --wifi 200 --drop-rate 0.05 --flap-interval 1 --crash-rate 0.1 --output farm.json
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+ (Linux/macOS para los stubs y las métricas de recursos)
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from adb_client import AdbClient, request_label # noqa: E402
+from run_benchmarks import percentile # noqa: E402
+from stub_tools import install_stubs # noqa: E402
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+@dataclass
+class FarmConfig:
+    """Composición de la granja y fallos inyectados."""
+    usb_devices: int = 10
+    wifi_devices: int = 100
+    unauthorized: int = 0 # Dispositivos USB sin autorizar
+    offline: int = 0 # Dispositivos USB offline
+    request_latency: float = 0.0 # Segundos antes de responder a cualquier petición
+    connect_latency: float = 0.05 # Segundos de host:connect...
+    connect_jitter: float = 0.02 # ... ± este margen
+    connect_failure_rate: float = 0.0 # Fracción de host:connect que fallan
+    drop_rate: float = 0.0 # Fracción de conexiones cortadas sin respuesta
+    flap_interval: float = 0.0 # Segundos entre cambios device <-> offline (0 = sin flapping)
+    flap_fraction: float = 0.05 # Fracción de dispositivos que cambian en cada intervalo
+    listen: bool = False # Abrir un puerto real por dispositivo Wi-Fi (para el sondeo TCP)
+    restart_delay: float = 0.1 # Segundos sin servidor tras host:kill
+    seed: Optional[int] = None
+
+
+@dataclass
+class VirtualDevice:
+    serial: str
+    state: str = "device"
+    transport: str = "usb" # usb | tcp
+    connected: bool = True # Los dispositivos Wi-Fi solo aparecen tras host:connect
+    model: str = "Pixel_7"
+    transport_id: int = 0
+
+
+class FakeAdbServer:
+    """Servidor ADB simulado en 127.0.0.1 (puerto libre, ver .port)."""
+
+    def __init__(self, config: Optional[FarmConfig] = None):
+        self.config = config or FarmConfig()
+        self.random = random.Random(self.config.seed)
+        self.devices: Dict[str, VirtualDevice] = {}
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._version = 0 # Se incrementa con cada cambio de la lista de dispositivos
+        self._stop = threading.Event()
+        self._server: Optional[socket.socket] = None
+        self._port = 0
+        self._generation = 0 # Se incrementa con cada host:kill (cierra los seguimientos abiertos)
+        self._listeners: List[socket.socket] = []
+        self._threads: List[threading.Thread] = []
+        self._create_devices()
+
+    def _create_devices(self):
+        config = self.config
+        for index in range(config.usb_devices):
+            state = ("unauthorized" if index < config.unauthorized
+                     else "offline" if index < config.unauthorized + config.offline else "device")
+            self.devices[f"FARM{index:05d}"] = VirtualDevice(f"FARM{index:05d}", state, model=f"Farm_{index % 7}")
+        for index in range(config.wifi_devices):
+            if config.listen:
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                listener.bind(("127.0.0.1", 0))
+                listener.listen(16) # El sondeo TCP solo necesita completar el saludo
+                self._listeners.append(listener)
+                serial = f"127.0.0.1:{listener.getsockname()[1]}"
+            else:
+                serial = f"10.99.{index // 250}.{index % 250 + 1}:5555"
+            self.devices[serial] = VirtualDevice(serial, transport="tcp", connected=False, model=f"Farm_{index % 7}")
+        for transport_id, device in enumerate(self.devices.values(), 1):
+            device.transport_id = transport_id
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    def wifi_targets(self) -> List[str]:
+        return [serial for serial, device in self.devices.items() if device.transport == "tcp"]
+
+    def _listen(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", self._port))
+        server.listen(512)
+        self._server = server
+        self._port = server.getsockname()[1]
+        self._spawn(lambda: self._accept_loop(server), "fake-adb-accept")
+
+    def start(self):
+        self._listen()
+        if self.config.flap_interval > 0:
+            self._spawn(self._flap_loop, "fake-adb-flap")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        for sock in [self._server] + self._listeners:
+            if sock:
+                sock.close()
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    # --- Estado de la granja ---
+
+    def _visible(self) -> List[VirtualDevice]:
+        return [device for device in self.devices.values() if device.connected]
+
+    def _notify(self):
+        """Llamar con el bloqueo tomado."""
+        self._version += 1
+        self._changed.notify_all()
+
+    def _device_list(self, long_format: bool) -> str:
+        with self._lock:
+            devices = self._visible()
+        if not long_format:
+            return "".join(f"{device.serial}\t{device.state}\n" for device in devices)
+        return "".join(f"{device.serial:<22} {device.state} product:farm model:{device.model} "
+                       f"device:farm transport_id:{device.transport_id}\n" for device in devices)
+
+    def _flap_loop(self):
+        while not self._stop.wait(self.config.flap_interval):
+            with self._lock:
+                candidates = [device for device in self._visible() if device.state in ("device", "offline")]
+                count = max(1, int(len(candidates) * self.config.flap_fraction)) if candidates else 0
+                for device in self.random.sample(candidates, count):
+                    device.state = "offline" if device.state == "device" else "device"
+                if count:
+                    self._notify()
+            self._count("flaps")
+
+    # --- Protocolo ---
+
+    def _kill(self):
+        """host:kill: deja de escuchar, pierde las conexiones Wi-Fi y vuelve tras restart_delay."""
+        with self._lock:
+            self._generation += 1
+            for device in self.devices.values():
+                if device.transport == "tcp":
+                    device.connected = False
+            self._notify()
+            self.stats["restarts"] = self.stats.get("restarts", 0) + 1
+        self._server.close()
+        timer = threading.Timer(self.config.restart_delay, lambda: None if self._stop.is_set() else self._listen())
+        timer.daemon = True
+        timer.start()
+
+    def _accept_loop(self, server: socket.socket):
+        while not self._stop.is_set():
+            try:
+                client, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_request(self, sock: socket.socket) -> Optional[str]:
+        header = self._recv_exact(sock, 4)
+        if header is None:
+            return None
+        payload = self._recv_exact(sock, int(header, 16))
+        return payload.decode("utf-8", errors="replace") if payload is not None else None
+
+    @staticmethod
+    def _okay(sock: socket.socket, payload: Optional[str] = None):
+        data = b"OKAY"
+        if payload is not None:
+            encoded = payload.encode("utf-8")
+            data += f"{len(encoded):04x}".encode("ascii") + encoded
+        sock.sendall(data)
+
+    @staticmethod
+    def _fail(sock: socket.socket, message: str):
+        encoded = message.encode("utf-8")
+        sock.sendall(b"FAIL" + f"{len(encoded):04x}".encode("ascii") + encoded)
+
+    def _handle(self, sock: socket.socket):
+        with sock:
+            try:
+                request = self._read_request(sock)
+                if request is None:
+                    return
+                self._count(request_label(request))
+                if self.config.drop_rate and self.random.random() < self.config.drop_rate:
+                    self._count("dropped")
+                    return # Se cierra sin responder
+                if self.config.request_latency:
+                    time.sleep(self.config.request_latency)
+                if request == "host:version":
+                    self._okay(sock, "0029")
+                elif request in ("host:devices", "host:devices-l"):
+                    self._okay(sock, self._device_list(request.endswith("-l")))
+                elif request.startswith("host:track-devices"):
+                    self._track(sock, request.endswith("-l"))
+                elif request.startswith("host:connect:"):
+                    self._okay(sock, self._connect(request[len("host:connect:"):]))
+                elif request.startswith("host:disconnect:"):
+                    self._okay(sock, self._disconnect(request[len("host:disconnect:"):]))
+                elif request == "host:kill":
+                    self._okay(sock)
+                    self._kill()
+                elif request.startswith("host:transport"):
+                    self._transport(sock, request)
+                else:
+                    self._fail(sock, f"unknown host service '{request}'")
+            except OSError:
+                pass
+
+    def _connect(self, target: str) -> str:
+        config = self.config
+        if ":" not in target:
+            target += ":5555"
+        time.sleep(max(0.0, config.connect_latency + self.random.uniform(-config.connect_jitter, config.connect_jitter)))
+        with self._lock:
+            device = self.devices.get(target)
+            if device is None or device.transport != "tcp":
+                self.stats["connect_refused"] = self.stats.get("connect_refused", 0) + 1
+                return f"failed to connect to '{target}': Connection refused"
+            if config.connect_failure_rate and self.random.random() < config.connect_failure_rate:
+                self.stats["connect_failed"] = self.stats.get("connect_failed", 0) + 1
+                return f"failed to connect to '{target}': Connection timed out"
+            if device.connected:
+                return f"already connected to {target}"
+            device.connected = True
+            self._notify()
+        return f"connected to {target}"
+
+    def _disconnect(self, serial: str) -> str:
+        with self._lock:
+            device = self.devices.get(serial)
+            if device is None or not device.connected or device.transport != "tcp":
+                return f"error: no such device '{serial}'"
+            device.connected = False
+            self._notify()
+        return f"disconnected {serial}"
+
+    def _transport(self, sock: socket.socket, request: str):
+        serial = request[len("host:transport:"):] if request.startswith("host:transport:") else None
+        with self._lock:
+            visible = self._visible()
+            device = (self.devices.get(serial) if serial else (visible[0] if len(visible) == 1 else None))
+            if device is not None and not device.connected:
+                device = None
+        if device is None:
+            self._fail(sock, f"device '{serial}' not found" if serial else "more than one device/emulator")
+            return
+        if device.state != "device":
+            self._fail(sock, f"device {device.state}")
+            return
+        self._okay(sock)
+        command = self._read_request(sock)
+        if command is None:
+            return
+        sock.sendall(b"OKAY")
+        if command.startswith("shell:getprop ro.build.fingerprint"):
+            sock.sendall(f"farm/{device.model}/farm:14/FARM.240101/{device.transport_id}:user/release-keys\n"
+                         .encode("utf-8"))
+        elif command.startswith("shell:echo "):
+            sock.sendall(command[len("shell:echo "):].encode("utf-8") + b"\n") # Keep-alive del pool Wi-Fi
+
+    def _track(self, sock: socket.socket, long_format: bool):
+        self._okay(sock)
+        sent_version = -1
+        generation = self._generation
+        while not self._stop.is_set() and generation == self._generation:
+            with self._changed:
+                if sent_version == self._version:
+                    self._changed.wait(1.0)
+                    if sent_version == self._version:
+                        continue
+                sent_version = self._version
+            payload = self._device_list(long_format).encode("utf-8")
+            sock.sendall(f"{len(payload):04x}".encode("ascii") + payload)
+
+
+# --- Carga sobre AndroidMirror ---
+
+def latency_summary(values_seconds: List[float]) -> dict:
+    """count, media, p50, p90, p99 y máximo en milisegundos."""
+    if not values_seconds:
+        return {"count": 0}
+    values = [value * 1000 for value in values_seconds]
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 2),
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p90_ms": round(percentile(values, 0.90), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+        "max_ms": round(max(values), 2),
+    }
+
+
+class ResourceSampler:
+    """Muestrea en segundo plano la memoria, hilos y descriptores del proceso anfitrión."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_fds = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="farm-resources", daemon=True)
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    @staticmethod
+    def _open_fds() -> Optional[int]:
+        try:
+            return len(os.listdir("/proc/self/fd"))
+        except OSError:
+            return None
+
+    def _sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        self.peak_fds = max(self.peak_fds, self._open_fds() or 0)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self._sample()
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        usage = {
+            "wall_seconds": round(wall, 2),
+            "cpu_seconds": round(cpu, 2),
+            "cpu_percent": round(100 * cpu / wall, 1) if wall else 0.0,
+            "peak_threads": self.peak_threads,
+            "peak_open_fds": self.peak_fds or None,
+        }
+        if resource is not None:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            usage["max_rss_mb"] = round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        return usage
+
+
+def run_discovery(mirror, rounds: int, concurrency: int) -> dict:
+    """get_connected_devices() repetido desde varios hilos (como varias vistas de la GUI)."""
+    def one(_):
+        start = time.perf_counter()
+        devices = mirror.get_connected_devices()
+        return time.perf_counter() - start, len(devices)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(rounds)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rounds": rounds,
+        "concurrency": concurrency,
+        "throughput_per_s": round(rounds / elapsed, 1) if elapsed else None,
+        "empty_results": sum(1 for _, count in samples if count == 0), # Conexión cortada o error
+        "latency": latency_summary([seconds for seconds, _ in samples]),
+    }
+
+
+def run_bulk_connect(mirror, targets: List[str], workers: int, probe: bool) -> dict:
+    start = time.perf_counter()
+    rows = mirror.connect_wifi_many(targets, max_workers=workers, skip_probe=not probe)
+    elapsed = time.perf_counter() - start
+    connected = sum(1 for row in rows if row["connected"])
+    return {
+        "targets": len(targets),
+        "workers": workers,
+        "connected": connected,
+        "failed": len(targets) - connected,
+        "seconds": round(elapsed, 2),
+        "throughput_per_s": round(len(targets) / elapsed, 1) if elapsed else None,
+        "connect_latency": latency_summary([row["connect_ms"] / 1000 for row in rows if row["connect_ms"] is not None]),
+    }
+
+
+def run_sessions(mirror, serials: List[str], workers: int, hold: float) -> dict:
+    options = {"auto_encoder": False, "no_audio": True, "fps_metrics": True}
+
+    def launch(serial):
+        start = time.perf_counter()
+        ok = mirror.start_mirroring(serial, options)
+        return serial, ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        launches = list(pool.map(launch, serials))
+    elapsed = time.perf_counter() - start
+    time.sleep(hold) # Sesiones en marcha: informes de FPS y caídas programadas
+    running = {session.serial for session in mirror.sessions.running()}
+    started = [serial for serial, ok, _ in launches if ok]
+    streams = mirror.get_stream_metrics()
+    mirror.stop_scrcpy()
+    return {
+        "requested": len(serials),
+        "workers": workers,
+        "started": len(started),
+        "failed_to_start": len(serials) - len(started),
+        "crashed_while_running": sum(1 for serial in started if serial not in running),
+        "seconds": round(elapsed, 2),
+        "throughput_per_s": round(len(serials) / elapsed, 1) if elapsed else None,
+        "launch_latency": latency_summary([seconds for _, ok, seconds in launches if ok]),
+        "fps_reports": sum(snapshot["reports"] for snapshot in streams),
+    }
+
+
+def run_restart(mirror) -> dict:
+    """restart_adb_server(): parada, arranque y reconexión en paralelo de los dispositivos Wi-Fi."""
+    before = sum(1 for device in mirror.adb_client.devices() if ":" in device.serial)
+    start = time.perf_counter()
+    ok, message = mirror.restart_adb_server()
+    elapsed = time.perf_counter() - start
+    after = sum(1 for device in mirror.adb_client.devices() if ":" in device.serial and device.state == "device")
+    return {"ok": ok, "seconds": round(elapsed, 3), "wifi_before": before, "wifi_after": after, "message": message}
+
+
+def run_farm(args) -> dict:
+    from android_screen_mirror import AndroidMirror
+
+    config = FarmConfig(usb_devices=args.usb, wifi_devices=args.wifi, unauthorized=args.unauthorized,
+                        offline=args.offline, request_latency=args.request_latency,
+                        connect_latency=args.connect_latency, connect_jitter=args.connect_jitter,
+                        connect_failure_rate=args.connect_failure_rate, drop_rate=args.drop_rate,
+                        flap_interval=args.flap_interval, flap_fraction=args.flap_fraction,
+                        listen=args.probe, restart_delay=args.restart_delay, seed=args.seed)
+    server = FakeAdbServer(config).start()
+    report = {"config": asdict(config)}
+    with tempfile.TemporaryDirectory(prefix="mirror-farm-") as workdir:
+        install_stubs(os.path.join(workdir, "bin"),
+                      scrcpy={"ready_delay": args.scrcpy_ready_delay, "crash_rate": args.crash_rate,
+                              "fail": "crash_after" if args.crash_after else None,
+                              "crash_after": args.crash_after or 0}).apply()
+        os.environ["ANDROID_MIRROR_CACHE_DIR"] = os.path.join(workdir, "cache")
+        os.environ["ANDROID_MIRROR_PROFILES"] = os.path.join(workdir, "profiles.json")
+
+        mirror = AndroidMirror(log_callback=lambda message: None,
+                               adb_client=AdbClient(port=server.port, max_connections=args.adb_connections))
+        sampler = ResourceSampler().start()
+        try:
+            mirror.check_dependencies(use_cache=False)
+
+            events = []
+            tracking_start = time.perf_counter()
+            tracker = mirror.start_device_tracking(events.append)
+            tracker.wait_ready(10)
+            report["tracking_ready_ms"] = round((time.perf_counter() - tracking_start) * 1000, 1)
+
+            print(f"🔎 Descubrimiento ({args.discovery_rounds} consultas)...", flush=True)
+            report["discovery"] = run_discovery(mirror, args.discovery_rounds, args.concurrency)
+            print(f"📶 Conexión masiva ({len(server.wifi_targets())} destinos)...", flush=True)
+            report["bulk_connect"] = run_bulk_connect(mirror, server.wifi_targets(), args.connect_workers, args.probe)
+
+            ready = [device.serial for device in mirror.adb_client.devices() if device.state == "device"]
+            serials = ready[:args.sessions]
+            print(f"🚀 Sesiones ({len(serials)})...", flush=True)
+            report["sessions"] = run_sessions(mirror, serials, args.launch_workers, args.hold)
+
+            report["discovery_after_connect"] = run_discovery(mirror, args.discovery_rounds, args.concurrency)
+            if args.restart:
+                print("♻️  Reinicio del servidor ADB...", flush=True)
+                report["adb_restart"] = run_restart(mirror)
+            report["tracker_events"] = len(events)
+        finally:
+            mirror.cleanup()
+            report["host_resources"] = sampler.stop()
+            server.stop()
+    report["server_requests"] = dict(sorted(server.stats.items()))
+    report["command_timings"] = {key: value for key, value in mirror.get_command_timings().items()
+                                 if key in ("calls", "seconds", "failures", "timeouts", "phases")}
+    return report
+
+
+def print_report(report: dict):
+    def latency(summary: dict) -> str:
+        if not summary.get("count"):
+            return "sin muestras"
+        return (f"p50 {summary['p50_ms']:.1f}ms · p90 {summary['p90_ms']:.1f}ms · "
+                f"p99 {summary['p99_ms']:.1f}ms · máx {summary['max_ms']:.1f}ms")
+
+    config = report["config"]
+    print(f"\n🏭 Granja: {config['usb_devices']} USB + {config['wifi_devices']} Wi-Fi "
+          f"({config['unauthorized']} sin autorizar, {config['offline']} offline)")
+    print(f"   Seguimiento listo en {report['tracking_ready_ms']}ms · {report['tracker_events']} eventos recibidos")
+    for key, title in (("discovery", "Descubrimiento"), ("discovery_after_connect", "Descubrimiento tras conectar")):
+        row = report[key]
+        print(f"🔎 {title}: {row['throughput_per_s']} consultas/s · {latency(row['latency'])} · "
+              f"{row['empty_results']} vacías")
+    row = report["bulk_connect"]
+    print(f"📶 Conexión masiva: {row['connected']}/{row['targets']} en {row['seconds']}s "
+          f"({row['throughput_per_s']}/s) · {latency(row['connect_latency'])}")
+    row = report["sessions"]
+    print(f"🚀 Sesiones: {row['started']}/{row['requested']} en {row['seconds']}s · {latency(row['launch_latency'])} · "
+          f"{row['crashed_while_running']} caídas · {row['fps_reports']} informes de FPS")
+    if "adb_restart" in report:
+        row = report["adb_restart"]
+        print(f"♻️  Reinicio ADB: {'ok' if row['ok'] else 'FALLO'} en {row['seconds']}s · "
+              f"Wi-Fi {row['wifi_after']}/{row['wifi_before']} reconectados")
+    usage = report["host_resources"]
+    print(f"🖥️  Anfitrión: CPU {usage['cpu_seconds']}s ({usage['cpu_percent']}%) · "
+          f"RSS máx {usage.get('max_rss_mb', '?')} MB · {usage['peak_threads']} hilos · "
+          f"{usage['peak_open_fds'] or '?'} descriptores")
+    print(f"📡 Servidor simulado: {report['server_requests']}")
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulador de granja de dispositivos para AndroidMirror")
+    farm = parser.add_argument_group("granja")
+    farm.add_argument("--usb", type=int, default=10, help="Dispositivos USB (por defecto: 10)")
+    farm.add_argument("--wifi", type=int, default=100, help="Dispositivos Wi-Fi (por defecto: 100)")
+    farm.add_argument("--unauthorized", type=int, default=0, help="Dispositivos USB sin autorizar")
+    farm.add_argument("--offline", type=int, default=0, help="Dispositivos USB offline")
+    farm.add_argument("--probe", action="store_true",
+                      help="Abrir un puerto real por dispositivo Wi-Fi y hacer el sondeo TCP antes de conectar")
+    faults = parser.add_argument_group("fallos")
+    faults.add_argument("--request-latency", type=float, default=0.0, metavar="SEGUNDOS")
+    faults.add_argument("--connect-latency", type=float, default=0.05, metavar="SEGUNDOS")
+    faults.add_argument("--connect-jitter", type=float, default=0.02, metavar="SEGUNDOS")
+    faults.add_argument("--connect-failure-rate", type=float, default=0.0, metavar="FRACCIÓN")
+    faults.add_argument("--drop-rate", type=float, default=0.0, metavar="FRACCIÓN",
+                        help="Conexiones con el servidor ADB cortadas sin respuesta")
+    faults.add_argument("--flap-interval", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="Alternar dispositivos entre device y offline cada tantos segundos")
+    faults.add_argument("--flap-fraction", type=float, default=0.05, metavar="FRACCIÓN")
+    faults.add_argument("--crash-rate", type=float, default=0.0, metavar="FRACCIÓN",
+                        help="Lanzamientos de scrcpy que fallan al arrancar")
+    faults.add_argument("--crash-after", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="Todas las sesiones scrcpy caen tras este tiempo (0 = nunca)")
+    faults.add_argument("--seed", type=int, help="Semilla para reproducir los fallos del servidor")
+    load = parser.add_argument_group("carga")
+    load.add_argument("--discovery-rounds", type=int, default=200)
+    load.add_argument("--concurrency", type=int, default=8, help="Hilos de descubrimiento simultáneos")
+    load.add_argument("--connect-workers", type=int, default=16)
+    load.add_argument("--adb-connections", type=int, default=16,
+                      help="Conexiones simultáneas del cliente ADB nativo con el servidor")
+    load.add_argument("--sessions", type=int, default=20, help="Sesiones scrcpy a lanzar")
+    load.add_argument("--launch-workers", type=int, default=8)
+    load.add_argument("--hold", type=float, default=3.0, metavar="SEGUNDOS",
+                      help="Tiempo con las sesiones en marcha antes de detenerlas")
+    load.add_argument("--scrcpy-ready-delay", type=float, default=0.05, metavar="SEGUNDOS")
+    load.add_argument("--restart", action="store_true",
+                      help="Reiniciar el servidor ADB al final y medir la reconexión de los dispositivos Wi-Fi")
+    faults.add_argument("--restart-delay", type=float, default=0.1, metavar="SEGUNDOS",
+                        help="Tiempo que el servidor simulado tarda en volver tras host:kill")
+    parser.add_argument("--output", metavar="ARCHIVO", help="Guardar el informe en JSON")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = create_argument_parser().parse_args(argv)
+    report = run_farm(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Informe guardado en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de las rutas críticas de AndroidMirror
+
+Mide, con los ejecutables de imitación de stub_tools en el PATH:
+
+    check_dependencies_cold     'adb version' + 'scrcpy --version' sin caché
+    check_dependencies_cached   la misma verificación con la caché en disco
+    get_connected_devices       'adb devices' con --devices dispositivos
+    get_connected_devices_native  host:devices-l con el cliente nativo contra el FakeAdbServer
+    connect_wifi                'adb connect' por el ejecutable (sin pool de conexiones)
+    connect_wifi_native         host:connect con el cliente nativo (sin pool de conexiones)
+    connect_wifi_pooled         connect_wifi sobre un dispositivo ya conectado del pool
+    start_mirroring             lanzamiento de scrcpy hasta que está listo
+    cleanup                     detener la sesión y desconectar el Wi-Fi (disconnect_wifi=True)
+    gui_log_throughput          mensajes/s por App.process_log_queue (requiere Tk y pantalla)
+
+Los benchmarks sin sufijo usan el núcleo sin el cliente nativo de ADB
+(use_native_adb=False) para medir el camino de los ejecutables; los _native
+miden el cliente del protocolo host (el camino por defecto) contra el
+servidor ADB simulado de device_farm. Los resultados se escriben en JSON y
+se comparan con la línea base guardada (benchmarks/baseline.json): si la
+mediana de un benchmark empeora más que el umbral, el proceso termina con
+código 1, y sin línea base termina con código 2.
+
+    python benchmarks/run_benchmarks.py --update-baseline   # fijar la línea base
+    python benchmarks/run_benchmarks.py                     # comparar con ella
+    python benchmarks/run_benchmarks.py --only connect_wifi --iterations 50 --output r.json
+
+Las cifras incluyen el arranque del intérprete de Python de cada stub, así
+que solo son comparables entre ejecuciones en la misma máquina.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional, List, Dict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from stub_tools import install_stubs # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_ITERATIONS = 15
+DEFAULT_WARMUP = 2
+DEFAULT_THRESHOLD = 0.25 # 25 % más lento que la línea base = regresión...
+DEFAULT_MIN_DELTA = 0.001 # ... y al menos 1 ms más lento (los benchmarks submilisegundo fluctúan más del 25 %)
+DEFAULT_DEVICES = 20
+WIFI_TARGET = "192.168.1.50:5555" # Aparece conectado en 'adb devices' además de los emuladores
+GUI_LOG_MESSAGES = 20000
+
+
+class BenchmarkSkipped(Exception):
+    """El benchmark no puede ejecutarse en este entorno (p. ej. sin pantalla para Tk)."""
+
+
+def _quiet(message):
+    pass
+
+
+def _new_mirror(**kwargs):
+    from android_screen_mirror import AndroidMirror
+    return AndroidMirror(log_callback=_quiet, use_native_adb=False, **kwargs)
+
+
+_fake_servers = [] # FakeAdbServer arrancados por los benchmarks _native (main los detiene)
+
+
+def _new_native_mirror(args, **kwargs):
+    """AndroidMirror con el cliente nativo apuntando a un FakeAdbServer con --devices dispositivos USB y uno Wi-Fi."""
+    from adb_client import AdbClient
+    from android_screen_mirror import AndroidMirror
+    from device_farm import FakeAdbServer, FarmConfig # device_farm importa este módulo; se carga aquí
+    server = FakeAdbServer(FarmConfig(usb_devices=args.devices, wifi_devices=1, connect_latency=0.0,
+                                      connect_jitter=0.0, request_latency=args.adb_latency, seed=0)).start()
+    _fake_servers.append(server)
+    mirror = AndroidMirror(log_callback=_quiet, adb_client=AdbClient(port=server.port), **kwargs)
+    return mirror, server
+
+
+# --- Benchmarks: cada uno devuelve una función que mide una iteración (segundos) ---
+
+def bench_check_dependencies_cold(args):
+    mirror = _new_mirror()
+
+    def run():
+        start = time.perf_counter()
+        assert mirror.check_dependencies(use_cache=False)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_check_dependencies_cached(args):
+    mirror = _new_mirror()
+    mirror.check_dependencies(use_cache=True) # Rellena la caché
+
+    def run():
+        start = time.perf_counter()
+        assert mirror.check_dependencies(use_cache=True)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_get_connected_devices(args):
+    mirror = _new_mirror()
+
+    def run():
+        start = time.perf_counter()
+        devices = mirror.get_connected_devices()
+        elapsed = time.perf_counter() - start
+        assert len(devices) == args.devices + 1, devices
+        return elapsed
+    return run
+
+
+def bench_get_connected_devices_native(args):
+    mirror, _ = _new_native_mirror(args)
+
+    def run():
+        start = time.perf_counter()
+        devices = mirror.get_connected_devices()
+        elapsed = time.perf_counter() - start
+        assert len(devices) == args.devices, devices
+        return elapsed
+    return run
+
+
+def bench_connect_wifi(args):
+    mirror = _new_mirror(keep_wifi_connections=False)
+
+    def run():
+        start = time.perf_counter()
+        connected, message = mirror.connect_wifi(WIFI_TARGET)
+        elapsed = time.perf_counter() - start
+        assert connected, message
+        return elapsed
+    return run
+
+
+def bench_connect_wifi_native(args):
+    mirror, server = _new_native_mirror(args, keep_wifi_connections=False)
+    target = server.wifi_targets()[0]
+
+    def run():
+        start = time.perf_counter()
+        connected, message = mirror.connect_wifi(target)
+        elapsed = time.perf_counter() - start
+        assert connected, message
+        return elapsed
+    return run
+
+
+def bench_connect_wifi_pooled(args):
+    mirror = _new_mirror()
+    assert mirror.connect_wifi(WIFI_TARGET)[0]
+
+    def run():
+        start = time.perf_counter()
+        connected, message = mirror.connect_wifi(WIFI_TARGET)
+        elapsed = time.perf_counter() - start
+        assert connected, message
+        return elapsed
+    return run
+
+
+def bench_start_mirroring(args):
+    mirror = _new_mirror()
+    assert mirror.check_dependencies(use_cache=False)
+    options = {"auto_encoder": False, "no_audio": True}
+
+    def run():
+        start = time.perf_counter()
+        started = mirror.start_mirroring("emulator-5554", options)
+        elapsed = time.perf_counter() - start
+        mirror.stop_scrcpy() # Fuera de la medida
+        assert started, "scrcpy no arrancó"
+        return elapsed
+    return run
+
+
+def bench_cleanup(args):
+    mirror = _new_mirror()
+    assert mirror.check_dependencies(use_cache=False)
+
+    def run():
+        mirror.connect_wifi(WIFI_TARGET)
+        assert mirror.start_mirroring(WIFI_TARGET, {"auto_encoder": False, "no_audio": True})
+        start = time.perf_counter()
+        mirror.cleanup(disconnect_wifi=True)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_gui_log_throughput(args):
+    """Segundos para volcar GUI_LOG_MESSAGES mensajes al widget (el informe lo muestra también en mensajes/s)."""
+    try:
+        import tkinter
+        import adb_gui_app
+        app = adb_gui_app.App()
+    except ImportError as e:
+        raise BenchmarkSkipped(f"dependencia no disponible: {e}")
+    except tkinter.TclError as e:
+        raise BenchmarkSkipped(f"Tk sin pantalla: {e}")
+    app.withdraw()
+
+    def run():
+        for index in range(GUI_LOG_MESSAGES):
+            app.log_message(f"[scrcpy emulator-5554] INFO: línea de prueba {index}")
+        start = time.perf_counter()
+        while not app.log_queue.empty():
+            app.process_log_queue()
+        app.update_idletasks()
+        return time.perf_counter() - start
+    return run
+
+
+BENCHMARKS = {
+    "check_dependencies_cold": bench_check_dependencies_cold,
+    "check_dependencies_cached": bench_check_dependencies_cached,
+    "get_connected_devices": bench_get_connected_devices,
+    "get_connected_devices_native": bench_get_connected_devices_native,
+    "connect_wifi": bench_connect_wifi,
+    "connect_wifi_native": bench_connect_wifi_native,
+    "connect_wifi_pooled": bench_connect_wifi_pooled,
+    "start_mirroring": bench_start_mirroring,
+    "cleanup": bench_cleanup,
+    "gui_log_throughput": bench_gui_log_throughput,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(name: str, args) -> dict:
+    """Ejecuta un benchmark (calentamiento + iteraciones) y resume sus tiempos."""
+    try:
+        run = BENCHMARKS[name](args)
+        for _ in range(args.warmup):
+            run()
+        samples = [run() for _ in range(args.iterations)]
+    except BenchmarkSkipped as e:
+        return {"skipped": str(e)}
+    result = {
+        "unit": "s",
+        "iterations": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "p95": percentile(samples, 0.95),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+    if name == "gui_log_throughput":
+        result["messages_per_second"] = round(GUI_LOG_MESSAGES / result["median"])
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in result.items()}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float,
+            min_delta: float = DEFAULT_MIN_DELTA) -> List[dict]:
+    """
+    Compara las medianas con la línea base; status: ok | regression | improved | new | skipped.
+
+    Un cambio cuenta solo si supera el umbral relativo y, además, min_delta segundos.
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if "skipped" in result:
+            rows.append({"name": name, "status": "skipped", "detail": result["skipped"]})
+            continue
+        if not base or "median" not in base:
+            rows.append({"name": name, "status": "new", "median": result["median"]})
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        delta = abs(result["median"] - base["median"])
+        status = ("ok" if delta < min_delta else "regression" if ratio > 1 + threshold
+                  else "improved" if ratio < 1 - threshold else "ok")
+        rows.append({"name": name, "status": status, "median": result["median"],
+                     "baseline": base["median"], "change": round(ratio - 1, 4)})
+    return rows
+
+
+def print_comparison(rows: List[dict], threshold: float):
+    icons = {"ok": "✅", "improved": "🚀", "regression": "❌", "new": "🆕", "skipped": "⏭️ "}
+    print(f"\n{'benchmark':32} {'mediana':>10} {'base':>10} {'cambio':>8}  (umbral {threshold:.0%})")
+    for row in rows:
+        if row["status"] == "skipped":
+            print(f"{icons['skipped']} {row['name']:30} omitido: {row['detail']}")
+            continue
+        base = f"{row['baseline'] * 1000:8.1f}ms" if "baseline" in row else f"{'-':>10}"
+        change = f"{row['change']:+8.1%}" if "change" in row else f"{'-':>8}"
+        print(f"{icons[row['status']]} {row['name']:30} {row['median'] * 1000:8.1f}ms {base} {change}")
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas con adb/scrcpy de imitación")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), metavar="NOMBRE",
+                        help=f"Benchmarks a ejecutar (por defecto todos: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--devices", type=int, default=DEFAULT_DEVICES,
+                        help=f"Dispositivos que lista el adb de imitación (por defecto: {DEFAULT_DEVICES})")
+    parser.add_argument("--adb-latency", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="Latencia añadida a cada llamada a adb")
+    parser.add_argument("--scrcpy-ready-delay", type=float, default=0.05, metavar="SEGUNDOS",
+                        help="Tiempo del scrcpy de imitación hasta estar listo")
+    parser.add_argument("--output", metavar="ARCHIVO", help="Guardar los resultados en JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, metavar="ARCHIVO",
+                        help="Línea base con la que comparar (por defecto: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Empeoramiento relativo de la mediana que cuenta como regresión (por defecto: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, metavar="SEGUNDOS",
+                        help=f"Diferencia absoluta mínima de la mediana para contar un cambio (por defecto: {DEFAULT_MIN_DELTA})")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar estos resultados como línea base")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = create_argument_parser().parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+
+    with tempfile.TemporaryDirectory(prefix="mirror-bench-") as workdir:
+        stubs = install_stubs(os.path.join(workdir, "bin"),
+                              adb={"latency": args.adb_latency,
+                                   "devices": [[f"emulator-{5554 + 2 * i}", "device"] for i in range(args.devices)]
+                                              + [[WIFI_TARGET, "device"]]},
+                              scrcpy={"ready_delay": args.scrcpy_ready_delay})
+        stubs.apply()
+        # Cachés y perfiles aislados del usuario
+        os.environ["ANDROID_MIRROR_CACHE_DIR"] = os.path.join(workdir, "cache")
+        os.environ["ANDROID_MIRROR_PROFILES"] = os.path.join(workdir, "profiles.json")
+
+        results = {}
+        try:
+            for name in names:
+                print(f"⏱️  {name}...", flush=True)
+                results[name] = measure(name, args)
+        finally:
+            for server in _fake_servers:
+                server.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "devices": args.devices,
+            "adb_latency": args.adb_latency,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    missing_baseline = not os.path.exists(args.baseline)
+    if not missing_baseline and not args.update_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+    rows = compare(results, baseline, args.threshold, args.min_delta)
+    print_comparison(rows, args.threshold)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Línea base guardada en {args.baseline}")
+        return 0
+    if missing_baseline:
+        print(f"\n❌ No existe la línea base {args.baseline}; sin ella no se pueden detectar regresiones.\n"
+              f"   Genérala con --update-baseline (o indica otra con --baseline).")
+        return 2
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ Regresiones: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecutables `adb` y `scrcpy` de imitación para benchmarks y simulaciones
+
+install_stubs() crea en un directorio dos envoltorios (adb y scrcpy) que
+ejecutan este mismo archivo; StubConfig.apply() pone ese directorio al
+principio del PATH. El comportamiento de cada invocación (latencia, salida,
+dispositivos, modos de fallo) se lee de un JSON (STUB_CONFIG_ENV) en cada
+llamada, así que se puede cambiar entre escenarios sin reinstalar nada.
+
+Modos de fallo:
+    adb:    "error" (código 1), "hang" (no responde: provoca el timeout)
+    scrcpy: "crash" (sale con código 1 antes de estar listo), "hang" (no
+            imprime nada), "crash_after" (sale tras scrcpy.crash_after segundos).
+            Además, scrcpy.crash_serials y scrcpy.crash_rate provocan el fallo
+            "crash" solo en esos seriales o en esa fracción de lanzamientos.
+
+Los envoltorios son scripts de shell (Linux/macOS).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import json
+import os
+import random
+import stat
+import sys
+import time
+from typing import Optional
+
+
+STUB_CONFIG_ENV = "ANDROID_MIRROR_STUB_CONFIG"
+
+DEFAULT_STUB_CONFIG = {
+    "adb": {
+        "latency": 0.0, # Segundos antes de responder (cualquier subcomando)
+        "command_latency": {}, # Por subcomando, p. ej. {"connect": 0.2}
+        "fail": None, # None | "error" | "hang"
+        "fail_commands": [], # Subcomandos afectados por "fail" (vacío = todos)
+        "version": "Android Debug Bridge version 1.0.41\nVersion 34.0.5-10900879",
+        "devices": [["emulator-5554", "device"]],
+        "connect_output": "connected to {target}",
+        "shell_output": "google/sdk_gphone64_x86_64/emu64xa:14/UE1A.230829.036/10962197:user/release-keys",
+    },
+    "scrcpy": {
+        "version": "scrcpy 2.4 <https://github.com/Genymobile/scrcpy>",
+        "startup_delay": 0.05, # Hasta la primera línea de arranque
+        "ready_delay": 0.05, # Desde el arranque hasta "INFO: Renderer:" / "INFO: Texture:"
+        "fps": 60,
+        "skipped": 0, # Fotogramas descartados por informe
+        "run_seconds": 3600.0, # Duración de la sesión si nadie la detiene
+        "fail": None, # None | "crash" | "hang" | "crash_after"
+        "crash_after": 5.0,
+        "crash_serials": [], # Seriales (-s) cuyo lanzamiento falla
+        "crash_rate": 0.0, # Fracción de lanzamientos que fallan al azar
+        "encoders": [
+            "--video-codec=h264 --video-encoder=c2.goldfish.h264.encoder (hw)",
+            "--video-codec=h265 --video-encoder=c2.goldfish.hevc.encoder (hw)",
+            "--audio-codec=opus --audio-encoder=c2.android.opus.encoder (sw)",
+            "--audio-codec=aac --audio-encoder=c2.android.aac.encoder (sw)",
+        ],
+        "displays": ["--display-id=0    (1080x2400)"],
+    },
+}
+
+
+def _merge(base: dict, override: dict) -> dict:
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = _merge(base[key], value) if isinstance(base.get(key), dict) and isinstance(value, dict) else value
+    return merged
+
+
+class StubConfig:
+    """
+    Configuración de los ejecutables de imitación, persistida en un JSON.
+
+    Args:
+        directory: Directorio donde se instalan los envoltorios y el JSON.
+    """
+
+    def __init__(self, directory: str, **overrides):
+        self.directory = directory
+        self.path = os.path.join(directory, "stub_config.json")
+        self.data = _merge(DEFAULT_STUB_CONFIG, overrides)
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path) # Un stub nunca lee un archivo a medio escribir
+
+    def update(self, **overrides):
+        """Cambia la configuración, p. ej. update(adb={"latency": 0.1})."""
+        self.data = _merge(self.data, overrides)
+        self.save()
+
+    def apply(self, environ: Optional[dict] = None) -> dict:
+        """Pone los stubs delante en el PATH y apunta STUB_CONFIG_ENV al JSON."""
+        environ = os.environ if environ is None else environ
+        environ["PATH"] = self.directory + os.pathsep + environ.get("PATH", "")
+        environ[STUB_CONFIG_ENV] = self.path
+        return environ
+
+
+def install_stubs(directory: str, **overrides) -> StubConfig:
+    """Crea los envoltorios adb y scrcpy en `directory` y devuelve su configuración."""
+    os.makedirs(directory, exist_ok=True)
+    for tool in ("adb", "scrcpy"):
+        path = os.path.join(directory, tool)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" {tool} "$@"\n')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return StubConfig(directory, **overrides)
+
+
+# --- Comportamiento de los stubs (se ejecuta en el proceso hijo) ---
+
+def _load_config() -> dict:
+    path = os.environ.get(STUB_CONFIG_ENV)
+    if not path:
+        return DEFAULT_STUB_CONFIG
+    with open(path, "r", encoding="utf-8") as f:
+        return _merge(DEFAULT_STUB_CONFIG, json.load(f))
+
+
+def _adb_subcommand(args: list) -> tuple[Optional[str], list]:
+    index = 0
+    while index < len(args) and args[index].startswith("-"):
+        index += 2 if args[index] in ("-s", "-t", "-H", "-P", "-L") else 1
+    rest = args[index:]
+    return (rest[0], rest[1:]) if rest else (None, [])
+
+
+def run_adb(args: list, config: dict) -> int:
+    subcommand, rest = _adb_subcommand(args)
+    time.sleep(config["latency"] + config["command_latency"].get(subcommand or "", 0.0))
+    if config["fail"] and (not config["fail_commands"] or subcommand in config["fail_commands"]):
+        if config["fail"] == "hang":
+            time.sleep(3600)
+        print(f"error: stub configured to fail '{subcommand}'", file=sys.stderr)
+        return 1
+    if subcommand == "version":
+        print(config["version"])
+    elif subcommand == "devices":
+        print("List of devices attached")
+        for serial, state in config["devices"]:
+            print(f"{serial}\t{state}")
+        print()
+    elif subcommand == "connect":
+        target = rest[0] if rest else ""
+        if ":" not in target:
+            target += ":5555"
+        print(config["connect_output"].format(target=target))
+    elif subcommand == "disconnect":
+        print(f"disconnected {rest[0]}" if rest else "disconnected everything")
+    elif subcommand == "shell":
+        print(config["shell_output"])
+    elif subcommand in ("start-server", "kill-server", "tcpip", None):
+        pass
+    else:
+        print(f"adb: unknown command {subcommand}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_scrcpy(args: list, config: dict) -> int:
+    if "--version" in args:
+        print(config["version"])
+        return 0
+    if "--list-encoders" in args or "--list-displays" in args:
+        time.sleep(config["startup_delay"])
+        if "--list-encoders" in args:
+            print("[server] INFO: List of video encoders:")
+            for line in config["encoders"]:
+                print(f"    {line}")
+        if "--list-displays" in args:
+            print("[server] INFO: List of displays:")
+            for line in config["displays"]:
+                print(f"    {line}")
+        return 0
+    # Sesión: salida realista de arranque, informes de FPS y salida limpia con SIGTERM
+    serial = args[args.index("-s") + 1] if "-s" in args[:-1] else None
+    if serial in config["crash_serials"] or random.random() < config["crash_rate"]:
+        config = dict(config, fail="crash")
+    print(config["version"], flush=True)
+    if config["fail"] == "hang":
+        time.sleep(config["run_seconds"])
+        return 0
+    time.sleep(config["startup_delay"])
+    print("INFO: ADB device found:", flush=True)
+    print("[server] INFO: Device: [Google] sdk_gphone64_x86_64 (Android 14)", file=sys.stderr, flush=True)
+    if config["fail"] == "crash":
+        print("ERROR: Server connection failed", file=sys.stderr, flush=True)
+        return 1
+    time.sleep(config["ready_delay"])
+    print("INFO: Renderer: opengl", file=sys.stderr, flush=True)
+    print("INFO: OpenGL version: 4.6 (stub)", file=sys.stderr, flush=True)
+    print("INFO: Texture: 1080x2400", file=sys.stderr, flush=True)
+    started = time.monotonic()
+    print_fps = "--print-fps" in args
+    while time.monotonic() - started < config["run_seconds"]:
+        if config["fail"] == "crash_after" and time.monotonic() - started >= config["crash_after"]:
+            print("ERROR: Demuxer error", file=sys.stderr, flush=True)
+            return 1
+        time.sleep(1)
+        if print_fps:
+            skipped = f" (+{config['skipped']} frames skipped)" if config["skipped"] else ""
+            print(f"INFO: {config['fps']} fps{skipped}", file=sys.stderr, flush=True)
+    return 0
+
+
+def main(argv: list) -> int:
+    tool, args = argv[0], argv[1:]
+    config = _load_config()
+    return run_adb(args, config["adb"]) if tool == "adb" else run_scrcpy(args, config["scrcpy"])
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except (KeyboardInterrupt, BrokenPipeError):
+        sys.exit(0)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecución instrumentada de comandos externos (adb, scrcpy)
+
+Todas las invocaciones de procesos externos pasan por CommandRunner, que
+registra para cada una el tiempo de reloj, el código de salida, si agotó el
+plazo, el tamaño de la salida y la fase activa (connect, launch, deps...)
+tomada del LogContext de AndroidMirror. Con esos registros se obtiene un
+desglose por fase y por comando y la lista de las llamadas más lentas, en
+texto (format_timings) o en JSON (CommandRunner.summary).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict
+
+
+DEFAULT_MAX_RECORDS = 5000
+DEFAULT_TOP = 10
+NO_PHASE = "(sin fase)"
+
+# Opciones globales de adb que llevan valor y preceden al subcomando
+_ADB_GLOBAL_OPTIONS = {"-s", "-t", "-H", "-P", "-L"}
+
+
+@dataclass
+class CommandRecord:
+    """Una invocación de un comando externo (o petición al servidor ADB)."""
+    name: str # "adb connect", "scrcpy --list-encoders", "host:devices-l"...
+    argv: List[str]
+    phase: Optional[str]
+    serial: Optional[str]
+    started_at: float
+    duration: float
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    error: Optional[str] = None
+    output_size: int = 0 # Caracteres (o bytes) de stdout + stderr
+    kind: str = "run" # run | spawn (proceso de larga duración) | adb-server
+
+    @property
+    def failed(self) -> bool:
+        return self.timed_out or self.error is not None or (self.returncode not in (0, None))
+
+
+def command_name(argv: List[str]) -> str:
+    """Nombre agregable de un comando: ejecutable y subcomando sin argumentos variables."""
+    if not argv:
+        return "?"
+    program = os.path.basename(str(argv[0]))
+    if program.lower().endswith(".exe"):
+        program = program[:-4]
+    args = [str(arg) for arg in argv[1:]]
+    if program == "adb":
+        index = 0
+        while index < len(args) and args[index].startswith("-"):
+            index += 2 if args[index] in _ADB_GLOBAL_OPTIONS else 1
+        rest = args[index:]
+        if not rest:
+            return "adb"
+        if rest[0] == "shell" and len(rest) > 1:
+            return f"adb shell {rest[1]}"
+        return f"adb {rest[0]}"
+    if program == "scrcpy":
+        modes = [arg for arg in args if arg.startswith(("--list-", "--version"))]
+        return " ".join(["scrcpy"] + modes)
+    return program
+
+
+def _output_size(*outputs) -> int:
+    return sum(len(output) for output in outputs if output)
+
+
+class CommandRunner:
+    """
+    Punto único de ejecución de procesos externos con registro de tiempos.
+
+    Args:
+        context: LogContext del que se toman la fase y el serial activos.
+        max_records: Registros conservados (los más antiguos se descartan).
+        observer: Función observer(record) llamada tras cada registro (p. ej. métricas).
+    """
+
+    def __init__(self, context=None, max_records: int = DEFAULT_MAX_RECORDS, observer=None):
+        self.context = context
+        self.observer = observer
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def _current(self) -> tuple[Optional[str], Optional[str]]:
+        if self.context is None:
+            return None, None
+        phase, serial, _ = self.context.current()
+        return phase, serial
+
+    def add(self, record: CommandRecord):
+        with self._lock:
+            self._records.append(record)
+        if self.observer:
+            self.observer(record)
+
+    def record(self, name: str, duration: float, ok: bool = True, kind: str = "run", **fields):
+        """Registra una operación medida fuera del runner (p. ej. una petición al servidor ADB)."""
+        phase, serial = self._current()
+        self.add(CommandRecord(name=name, argv=[], phase=phase, serial=serial,
+                               started_at=time.time() - duration, duration=duration,
+                               returncode=0 if ok else 1, kind=kind, **fields))
+
+    def run(self, args: List[str], phase: Optional[str] = None, serial: Optional[str] = None,
+            **kwargs) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(args, **kwargs) con registro de tiempos.
+
+        La fase y el serial se toman del contexto del hilo salvo que se indiquen
+        (necesario en hilos de un pool, que no heredan el contexto). Las
+        excepciones (TimeoutExpired, FileNotFoundError...) se registran y se
+        vuelven a lanzar sin cambios, así que el llamador las maneja como antes.
+        """
+        current_phase, current_serial = self._current()
+        phase, serial = phase or current_phase, serial or current_serial
+        started_at = time.time()
+        start = time.perf_counter()
+        record = CommandRecord(name=command_name(args), argv=[str(arg) for arg in args], phase=phase,
+                               serial=serial, started_at=started_at, duration=0.0)
+        try:
+            result = subprocess.run(args, **kwargs)
+        except subprocess.TimeoutExpired as e:
+            record.timed_out = True
+            record.output_size = _output_size(e.stdout, e.stderr)
+            raise
+        except OSError as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            record.returncode = result.returncode
+            record.output_size = _output_size(result.stdout, result.stderr)
+            return result
+        finally:
+            record.duration = time.perf_counter() - start
+            self.add(record)
+
+    def popen(self, args: List[str], **kwargs) -> subprocess.Popen:
+        """subprocess.Popen(args, **kwargs) registrando el tiempo de arranque del proceso."""
+        phase, serial = self._current()
+        start = time.perf_counter()
+        record = CommandRecord(name=command_name(args), argv=[str(arg) for arg in args], phase=phase,
+                               serial=serial, started_at=time.time(), duration=0.0, kind="spawn")
+        try:
+            return subprocess.Popen(args, **kwargs)
+        except OSError as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.duration = time.perf_counter() - start
+            self.add(record)
+
+    def records(self) -> List[CommandRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def summary(self, top: int = DEFAULT_TOP, include_records: bool = False) -> dict:
+        """
+        Desglose agregado de las invocaciones registradas.
+
+        Returns:
+            dict con totales, "phases" y "commands" (llamadas, segundos totales,
+            medio y máximo, fallos y timeouts, ordenados por tiempo total) y
+            "slowest" con las `top` invocaciones más lentas.
+        """
+        records = self.records()
+        phases: Dict[str, dict] = {}
+        commands: Dict[str, dict] = {}
+        for record in records:
+            for key, table in ((record.phase or NO_PHASE, phases), (record.name, commands)):
+                row = table.setdefault(key, {"name": key, "calls": 0, "seconds": 0.0, "max": 0.0,
+                                             "failures": 0, "timeouts": 0, "output_size": 0})
+                row["calls"] += 1
+                row["seconds"] += record.duration
+                row["max"] = max(row["max"], record.duration)
+                row["failures"] += int(record.failed)
+                row["timeouts"] += int(record.timed_out)
+                row["output_size"] += record.output_size
+
+        def rows(table: Dict[str, dict]) -> List[dict]:
+            result = sorted(table.values(), key=lambda row: row["seconds"], reverse=True)
+            for row in result:
+                row["avg"] = round(row["seconds"] / row["calls"], 4)
+                row["seconds"] = round(row["seconds"], 4)
+                row["max"] = round(row["max"], 4)
+            return result
+
+        slowest = sorted(records, key=lambda record: record.duration, reverse=True)[:top]
+        summary = {
+            "calls": len(records),
+            "seconds": round(sum(record.duration for record in records), 4),
+            "failures": sum(1 for record in records if record.failed),
+            "timeouts": sum(1 for record in records if record.timed_out),
+            "phases": rows(phases),
+            "commands": rows(commands),
+            "slowest": [asdict(record) for record in slowest],
+        }
+        if include_records:
+            summary["records"] = [asdict(record) for record in records]
+        return summary
+
+
+def format_timings(summary: dict) -> str:
+    """Informe de texto de CommandRunner.summary(): por fase, por comando y llamadas más lentas."""
+    if not summary["calls"]:
+        return "⏱️  No se registró ninguna llamada externa."
+    lines = [f"⏱️  {summary['calls']} llamadas externas · {summary['seconds']:.2f}s en total · "
+             f"{summary['failures']} fallidas · {summary['timeouts']} por timeout"]
+    for title, key in (("Por fase", "phases"), ("Por comando", "commands")):
+        lines.append(f"\n{title}:")
+        lines.append(f"   {'':28} {'llamadas':>8} {'total':>9} {'media':>9} {'máx':>9} {'fallos':>7}")
+        for row in summary[key]:
+            lines.append(f"   {row['name'][:28]:28} {row['calls']:>8} {row['seconds']:>8.3f}s "
+                         f"{row['avg']:>8.3f}s {row['max']:>8.3f}s {row['failures']:>7}")
+    lines.append("\nLlamadas más lentas:")
+    for record in summary["slowest"]:
+        status = ("timeout" if record["timed_out"] else record["error"] if record["error"]
+                  else f"código {record['returncode']}" if record["returncode"] is not None else record["kind"])
+        where = f" [{record['phase']}]" if record["phase"] else ""
+        target = f" ({record['serial']})" if record["serial"] else ""
+        lines.append(f"   {record['duration']:>8.3f}s  {record['name']}{target}{where} · {status}")
+    return "\n".join(lines)
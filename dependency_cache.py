@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de la verificación de dependencias (ADB y scrcpy)
+
+Guarda la ruta resuelta, la versión y las capacidades de cada ejecutable,
+indexadas por ruta, tamaño y fecha de modificación del binario. Mientras el
+binario no cambie, los arranques posteriores no necesitan ejecutar
+'adb version' ni 'scrcpy --version'.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Optional
+
+
+CACHE_VERSION = 1
+PROBE_TIMEOUT = 10
+
+
+def get_cache_dir() -> str:
+    """Directorio de caché de la aplicación (ANDROID_MIRROR_CACHE_DIR para cambiarlo)."""
+    override = os.environ.get("ANDROID_MIRROR_CACHE_DIR")
+    if override:
+        return override
+    if os.name == 'nt':  # Windows
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:  # Linux/macOS
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "android-screen-mirror")
+
+
+class JsonCache:
+    """Diccionario persistido en un archivo JSON, con escritura atómica y seguro entre hilos."""
+
+    def __init__(self, filename: str, cache_dir: Optional[str] = None):
+        self.path = os.path.join(cache_dir or get_cache_dir(), filename)
+        self._lock = threading.Lock()
+        self._data: Optional[dict] = None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._data = data if data.get("cache_version") == CACHE_VERSION else {}
+            except (OSError, ValueError, AttributeError):
+                self._data = {}
+            self._data.setdefault("cache_version", CACHE_VERSION)
+            self._data.setdefault("entries", {})
+        return self._data
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._load()["entries"].get(key)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            data = self._load()
+            data["entries"][key] = value
+            self._save(data)
+
+    def _save(self, data: dict):
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass # Sin caché persistente no se pierde funcionalidad
+
+
+def binary_fingerprint(path: str) -> Optional[str]:
+    """Clave de caché de un ejecutable: ruta real, tamaño y fecha de modificación."""
+    try:
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+    except OSError:
+        return None
+    return f"{real_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def parse_adb_version(output: str) -> Optional[str]:
+    """'Android Debug Bridge version 1.0.41' -> '1.0.41'."""
+    match = re.search(r"Android Debug Bridge version\s+([\d.]+)", output)
+    return match.group(1) if match else None
+
+
+def parse_scrcpy_version(output: str) -> Optional[tuple[int, int]]:
+    """'scrcpy 2.4 <https://...>' -> (2, 4)."""
+    match = re.search(r'scrcpy\s+(\d+)\.(\d+)', output)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def scrcpy_capabilities(version: Optional[tuple[int, int]]) -> Optional[dict]:
+    """
+    Opciones de línea de comandos disponibles según la versión de scrcpy.
+
+    Devuelve None si la versión no se pudo detectar: quien consulta asume
+    entonces un scrcpy actual en lugar de desactivar todas las opciones.
+    """
+    if version is None:
+        return None
+    return {
+        "audio": version >= (2, 0),
+        "video_codec": version >= (2, 0),
+        "list_encoders": version >= (2, 0),
+        "list_displays": version >= (1, 20),
+        "no_playback": version >= (2, 1),
+        "no_window": version >= (2, 3),
+        "print_fps": version >= (1, 14),
+        "time_limit": version >= (2, 3),
+        "video_buffer": version >= (3, 0), # Antes --display-buffer
+    }
+
+
+def probe_binary(name: str, version_args: list, cache: Optional[JsonCache] = None, run=subprocess.run) -> dict:
+    """
+    Localiza un ejecutable y obtiene su versión, usando la caché si el binario no ha cambiado.
+
+    `run` sustituye a subprocess.run (p. ej. CommandRunner.run para medir la llamada).
+
+    Returns:
+        dict: found, path, returncode, output, cached y error (si lo hubo).
+    """
+    path = shutil.which(name)
+    if not path:
+        return {"found": False, "path": None, "cached": False, "error": "not_found"}
+    fingerprint = binary_fingerprint(path)
+    if cache and fingerprint:
+        entry = cache.get(f"{name}|{fingerprint}")
+        if entry:
+            return dict(entry, found=True, path=path, cached=True)
+    try:
+        result = run([path] + version_args, capture_output=True, text=True,
+                     timeout=PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"found": True, "path": path, "cached": False, "error": "timeout"}
+    except OSError:
+        return {"found": False, "path": path, "cached": False, "error": "not_found"}
+    info = {"returncode": result.returncode, "output": result.stdout + result.stderr}
+    if name == "scrcpy":
+        version = parse_scrcpy_version(info["output"])
+        info["version"] = list(version) if version else None
+        info["capabilities"] = scrcpy_capabilities(version)
+    elif name == "adb":
+        info["version"] = parse_adb_version(info["output"])
+    if cache and fingerprint and result.returncode == 0:
+        cache.set(f"{name}|{fingerprint}", info)
+    return dict(info, found=True, path=path, cached=False)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capacidades de codificación y pantallas de cada dispositivo
+
+Ejecuta 'scrcpy --list-encoders --list-displays' una sola vez por
+dispositivo, interpreta los códecs, codificadores (hardware/software) y
+pantallas disponibles, y guarda el resultado en disco indexado por serial,
+huella de compilación (ro.build.fingerprint) y versión de scrcpy. Con esa
+información el constructor de comandos elige el codificador por hardware
+más eficiente (AV1 > H.265 > H.264) en lugar de fijar H.264.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy 2.0+ (--list-encoders)
+"""
+
+import re
+import subprocess
+import threading
+import time
+from typing import Optional, List, Dict
+
+from dependency_cache import JsonCache
+
+
+PROBE_TIMEOUT = 20
+DEFAULT_VIDEO_CODEC_PREFERENCE = ("av1", "h265", "h264") # Menor ancho de banda a igual calidad primero
+DEFAULT_AUDIO_CODEC_PREFERENCE = ("opus", "aac")
+
+# "    --video-codec=h265 --video-encoder=c2.qti.hevc.encoder   (hw) [vendor]"
+_ENCODER_PATTERN = re.compile(
+    r"--(video|audio)-codec=(\S+)\s+--(?:video|audio)-encoder=(?:')?([^\s']+)(?:')?(.*)$"
+)
+# "    --display-id=0    (1080x2400)"
+_DISPLAY_PATTERN = re.compile(r"--display-id=(\d+)(?:\s+\((\d+)x(\d+)\))?")
+# Codificadores software de AOSP (scrcpy < 2.1 no indica hw/sw)
+_SOFTWARE_ENCODER_PREFIXES = ("c2.android.", "OMX.google.")
+
+
+def _is_hardware(name: str, flags: str) -> bool:
+    if "(hw)" in flags:
+        return True
+    if "(sw)" in flags:
+        return False
+    return not name.startswith(_SOFTWARE_ENCODER_PREFIXES)
+
+
+def parse_encoder_list(output: str) -> Dict[str, List[dict]]:
+    """
+    Interpreta la salida de 'scrcpy --list-encoders'.
+
+    Returns:
+        dict: {"video": [...], "audio": [...]} con codec, name, hardware y alias por codificador.
+    """
+    encoders = {"video": [], "audio": []}
+    for line in output.splitlines():
+        match = _ENCODER_PATTERN.search(line)
+        if not match:
+            continue
+        kind, codec, name, flags = match.groups()
+        encoders[kind].append({
+            "codec": codec,
+            "name": name,
+            "hardware": _is_hardware(name, flags),
+            "alias": "(alias" in flags,
+        })
+    return encoders
+
+
+def parse_display_list(output: str) -> List[dict]:
+    """Interpreta la salida de 'scrcpy --list-displays' (id y tamaño de cada pantalla)."""
+    displays = []
+    for line in output.splitlines():
+        match = _DISPLAY_PATTERN.search(line)
+        if match:
+            display_id, width, height = match.groups()
+            displays.append({"id": int(display_id),
+                             "size": [int(width), int(height)] if width else None})
+    return displays
+
+
+def select_video_encoder(encoders: List[dict], preference=DEFAULT_VIDEO_CODEC_PREFERENCE) -> Optional[dict]:
+    """
+    Codificador de vídeo más eficiente: el primer códec de `preference` con
+    codificador por hardware (los alias se descartan si hay uno propio).
+    """
+    for codec in preference:
+        candidates = [enc for enc in encoders if enc["codec"] == codec and enc["hardware"]]
+        if candidates:
+            return sorted(candidates, key=lambda enc: enc["alias"])[0]
+    return None
+
+
+def select_audio_codec(encoders: List[dict], preference=DEFAULT_AUDIO_CODEC_PREFERENCE) -> Optional[str]:
+    """Primer códec de audio de `preference` disponible en el dispositivo."""
+    available = {enc["codec"] for enc in encoders}
+    for codec in preference:
+        if codec in available:
+            return codec
+    return None
+
+
+class DeviceCapabilityProbe:
+    """
+    Sondeo de capacidades por dispositivo con caché en memoria y en disco.
+
+    Args:
+        fingerprint_func: Función fingerprint_func(serial) -> huella de compilación (o None).
+        cache: JsonCache persistente (None para no guardar en disco).
+        scrcpy_path: Ejecutable de scrcpy.
+        run: Sustituto de subprocess.run (p. ej. CommandRunner.run).
+    """
+
+    def __init__(self, fingerprint_func, cache: Optional[JsonCache] = None, scrcpy_path: str = "scrcpy",
+                 run=subprocess.run):
+        self.fingerprint_func = fingerprint_func
+        self.cache = cache
+        self.scrcpy_path = scrcpy_path
+        self.run = run
+        self._memory: Dict[str, dict] = {} # serial -> capacidades (vida del proceso)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, serial: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(serial, threading.Lock())
+
+    def get(self, serial: str, scrcpy_version: Optional[str] = None, force: bool = False) -> Optional[dict]:
+        """
+        Capacidades del dispositivo, sondeándolo sólo si no están en caché.
+
+        Returns:
+            dict con video_encoders, audio_encoders, displays, fingerprint,
+            probed_at y cached; None si el sondeo falló.
+        """
+        with self._lock_for(serial): # Dos lanzamientos simultáneos no sondean dos veces
+            if not force and serial in self._memory:
+                return dict(self._memory[serial], cached=True)
+            fingerprint = self.fingerprint_func(serial)
+            key = f"{serial}|{fingerprint}|{scrcpy_version or '?'}" if fingerprint else None
+            if not force and self.cache and key:
+                entry = self.cache.get(key)
+                if entry:
+                    self._memory[serial] = entry
+                    return dict(entry, cached=True)
+            capabilities = self._probe(serial)
+            if capabilities is None:
+                return None
+            capabilities["fingerprint"] = fingerprint
+            self._memory[serial] = capabilities
+            if self.cache and key:
+                self.cache.set(key, capabilities)
+            return dict(capabilities, cached=False)
+
+    def forget(self, serial: str):
+        """Descarta la copia en memoria (p. ej. tras actualizar el sistema del dispositivo)."""
+        with self._lock_for(serial):
+            self._memory.pop(serial, None)
+
+    def _probe(self, serial: str) -> Optional[dict]:
+        start = time.perf_counter()
+        try:
+            # Un único arranque del servidor de scrcpy lista codificadores y pantallas
+            result = self.run([self.scrcpy_path, "-s", serial, "--list-encoders", "--list-displays"],
+                              capture_output=True, text=True, errors="replace", timeout=PROBE_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        output = result.stdout + result.stderr
+        encoders = parse_encoder_list(output)
+        if not encoders["video"]:
+            return None
+        return {
+            "video_encoders": encoders["video"],
+            "audio_encoders": encoders["audio"],
+            "displays": parse_display_list(output),
+            "probed_at": time.time(),
+            "probe_seconds": round(time.perf_counter() - start, 2),
+        }
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecución de tareas en segundo plano para la interfaz gráfica
+
+Un grupo acotado de hilos ejecuta las acciones de los botones. Las peticiones
+idénticas que llegan mientras una está en curso (p. ej. varios clics en
+"Escanear") se unen a la ejecución existente en lugar de repetir el trabajo
+ADB. Cada tarea admite cancelación y plazo máximo, y sus resultados se
+entregan a través de un despachador (normalmente App.call_in_ui) para que
+los callbacks se ejecuten en el hilo de Tk.
+
+Una tarea cancelada o vencida entrega el error a sus callbacks en el acto,
+pero su clave sigue reservada hasta que la función termina de verdad: una
+nueva petición con la misma clave espera a que acabe en lugar de lanzar una
+segunda llamada idéntica a adb o scrcpy.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List, Dict
+
+
+DEFAULT_GUI_WORKERS = 6
+
+
+class TaskCancelledError(Exception):
+    """La tarea se canceló antes de terminar; su resultado se descarta."""
+
+
+class TaskTimeoutError(TaskCancelledError):
+    """La tarea superó su plazo máximo; su resultado se descarta."""
+
+
+class TaskHandle:
+    """
+    Referencia a una tarea enviada a TaskRunner.
+
+    Las funciones de larga duración pueden consultar `cancel_event` para
+    abandonar el trabajo antes de tiempo; en cualquier caso, una tarea
+    cancelada o vencida no entrega su resultado a los callbacks.
+    """
+
+    def __init__(self, key: Optional[str], name: str, on_settled=None):
+        self.key = key
+        self.name = name
+        self._on_settled = on_settled # on_settled(handle, resultado, error, callbacks)
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        self.timer: Optional[threading.Timer] = None # Plazo máximo; se cancela al terminar
+        self.on_returned = None # on_returned(handle) cuando la función deja de ejecutarse
+        self.submitted_at = time.monotonic()
+        self.joined = 0 # Peticiones adicionales unidas a esta ejecución
+        self.error: Optional[BaseException] = None
+        self._callbacks: List[tuple] = []
+        self._lock = threading.Lock()
+        self._finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def done(self) -> bool:
+        return self._finished
+
+    def cancel(self, error: Optional[TaskCancelledError] = None) -> bool:
+        """Cancela la tarea. Devuelve False si ya había terminado."""
+        with self._lock:
+            if self._finished:
+                return False
+            self.cancel_event.set()
+        self._settle(None, error or TaskCancelledError(f"Tarea '{self.name}' cancelada."))
+        if self.future is not None and self.future.cancel() and self.on_returned:
+            self.on_returned(self) # No había empezado: la función ya no se ejecutará
+        return True
+
+    def _add_callbacks(self, on_done, on_error):
+        with self._lock:
+            if not self._finished:
+                self._callbacks.append((on_done, on_error))
+                return True
+        return False
+
+    def _settle(self, result, error: Optional[BaseException]) -> List[tuple]:
+        """Marca la tarea como terminada y entrega el resultado (sólo la primera vez)."""
+        with self._lock:
+            if self._finished:
+                return []
+            self._finished = True
+            self.error = error
+            callbacks, self._callbacks = self._callbacks, []
+        if self._on_settled:
+            self._on_settled(self, result, error, callbacks)
+        return callbacks
+
+
+class TaskRunner:
+    """
+    Grupo acotado de hilos con unión de peticiones idénticas, cancelación y plazos.
+
+    Args:
+        dispatch: Función dispatch(func, *args) que ejecuta func en el hilo de la
+            interfaz. Sin ella, los callbacks se ejecutan en el hilo de trabajo.
+        max_workers: Hilos simultáneos como máximo.
+        log_callback: Función de log opcional para avisos (plazos vencidos, errores).
+    """
+
+    def __init__(self, dispatch=None, max_workers: int = DEFAULT_GUI_WORKERS, log_callback=None):
+        self.dispatch = dispatch
+        self.log_callback = log_callback
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-task")
+        self._in_flight: Dict[str, TaskHandle] = {} # Clave -> tarea cuya función sigue ejecutándose
+        self._waiting: Dict[str, tuple] = {} # Clave -> (tarea, func, args, kwargs, plazo) en espera
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"submitted": 0, "coalesced": 0, "cancelled": 0, "timed_out": 0, "failed": 0}
+
+    def submit(self, func, *args, key: Optional[str] = None, on_done=None, on_error=None,
+               timeout: Optional[float] = None, **kwargs) -> Optional[TaskHandle]:
+        """
+        Ejecuta func(*args, **kwargs) en el grupo de hilos.
+
+        Args:
+            key: Identificador de la petición. Si ya hay una tarea en curso con la
+                misma clave, no se lanza otra: los callbacks se unen a la existente.
+            on_done: callback(resultado), ejecutado mediante `dispatch`.
+            on_error: callback(excepción), ejecutado mediante `dispatch`. Recibe
+                TaskCancelledError/TaskTimeoutError si la tarea se cancela o vence.
+            timeout: Segundos máximos; al vencer se descarta el resultado.
+
+        Returns:
+            TaskHandle de la tarea (nueva o existente), o None si el grupo ya está cerrado.
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            running = self._in_flight.get(key) if key is not None else None
+            if running is not None:
+                waiting = self._waiting.get(key)
+                for existing in (running, waiting[0] if waiting else None):
+                    if existing is not None and existing._add_callbacks(on_done, on_error):
+                        existing.joined += 1
+                        self.stats["coalesced"] += 1
+                        return existing
+            handle = TaskHandle(key, key or getattr(func, "__name__", "tarea"), on_settled=self._on_settled)
+            handle.on_returned = self._on_returned
+            handle._add_callbacks(on_done, on_error)
+            self.stats["submitted"] += 1
+            if running is not None:
+                # La anterior se canceló o venció pero su función sigue en marcha: se espera a que termine
+                self._waiting[key] = (handle, func, args, kwargs, timeout)
+                return handle
+            if key is not None:
+                self._in_flight[key] = handle
+            self._start(handle, func, args, kwargs, timeout)
+        return handle
+
+    def _start(self, handle: TaskHandle, func, args, kwargs, timeout: Optional[float]):
+        """Llamar con self._lock tomado."""
+        if timeout:
+            handle.timer = threading.Timer(timeout, self._expire, args=(handle, timeout))
+            handle.timer.daemon = True
+            handle.timer.start()
+        handle.future = self._executor.submit(self._run, handle, func, args, kwargs)
+
+    def _run(self, handle: TaskHandle, func, args, kwargs):
+        try:
+            if handle.cancelled:
+                return
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                handle._settle(None, e)
+                return
+            handle._settle(result, None)
+        finally:
+            self._on_returned(handle)
+
+    def _on_returned(self, handle: TaskHandle):
+        """La función de la tarea terminó (o no llegará a ejecutarse): libera su clave."""
+        if handle.timer is not None:
+            handle.timer.cancel()
+        if handle.key is None:
+            return
+        with self._lock:
+            if self._in_flight.get(handle.key) is not handle:
+                return
+            del self._in_flight[handle.key]
+            waiting = self._waiting.pop(handle.key, None)
+            if waiting and not waiting[0].done() and not self._closed:
+                self._in_flight[handle.key] = waiting[0]
+                self._start(*waiting)
+
+    def _expire(self, handle: TaskHandle, timeout: float):
+        if handle.cancel(TaskTimeoutError(f"Tarea '{handle.name}' superó el plazo de {timeout:g}s.")):
+            self.stats["timed_out"] += 1
+            self._log(f"⚠️  La tarea '{handle.name}' superó el plazo de {timeout:g}s; su resultado se descartará.")
+
+    def _on_settled(self, handle: TaskHandle, result, error, callbacks):
+        if handle.timer is not None:
+            handle.timer.cancel()
+        if isinstance(error, TaskCancelledError):
+            if not isinstance(error, TaskTimeoutError):
+                self.stats["cancelled"] += 1
+        elif error is not None:
+            self.stats["failed"] += 1
+            if not any(on_error for _, on_error in callbacks):
+                self._log(f"❌ Error en la tarea '{handle.name}': {error}")
+        for on_done, on_error in callbacks:
+            if error is None and on_done:
+                self._deliver(on_done, result)
+            elif error is not None and on_error:
+                self._deliver(on_error, error)
+
+    def _deliver(self, callback, value):
+        if self.dispatch:
+            self.dispatch(callback, value)
+        else:
+            callback(value)
+
+    def _log(self, message: str):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def in_flight(self, key: str) -> Optional[TaskHandle]:
+        """Tarea pendiente con esa clave (la que espera turno o, si no hay, la que se ejecuta)."""
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if waiting and not waiting[0].done():
+                return waiting[0]
+            handle = self._in_flight.get(key)
+            return handle if handle and not handle.done() else None
+
+    def cancel(self, key: str) -> bool:
+        """Cancela la tarea en curso con esa clave. Devuelve False si no había ninguna."""
+        handle = self.in_flight(key)
+        return handle.cancel() if handle else False
+
+    def shutdown(self):
+        """Cancela las tareas pendientes sin esperar a las que ya se están ejecutando."""
+        with self._lock:
+            self._closed = True
+            handles = list(self._in_flight.values()) + [waiting[0] for waiting in self._waiting.values()]
+            self._waiting.clear()
+        for handle in handles:
+            handle.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfiles de lanzamiento de scrcpy
+
+Cada perfil agrupa un conjunto coherente de opciones (bitrate, resolución,
+FPS, búferes de vídeo/audio, códecs...) con un nombre: low-latency,
+low-bandwidth, high-fidelity y battery-saver vienen incluidos, y se pueden
+definir otros en un archivo JSON:
+
+    {
+      "profiles": {
+        "mi-perfil": {"extends": "low-latency", "max_size": 1024, "bit_rate": "6M"}
+      }
+    }
+
+El archivo por defecto es profiles.json en el directorio de configuración
+de la aplicación (ANDROID_MIRROR_PROFILES para indicar otro).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import json
+import os
+from typing import Optional, Dict, List
+
+
+# Opciones de start_mirroring que un perfil puede fijar
+PROFILE_OPTION_KEYS = {
+    "max_size", "bit_rate", "max_fps", "video_codec", "codec_preference", "audio_codec",
+    "audio_bit_rate", "video_buffer", "audio_buffer", "no_audio", "no_control",
+    "turn_screen_off", "fullscreen_scrcpy", "no_video_optimization", "adaptive_quality",
+    "adaptive_start",
+}
+
+BUILTIN_PROFILES: Dict[str, dict] = {
+    # Control remoto: H.264 (menor latencia de codificación/decodificación que H.265/AV1),
+    # resolución moderada, sin búfer de vídeo y búfer de audio mínimo
+    "low-latency": {
+        "description": "Mínima latencia entrada-imagen para control remoto",
+        "max_size": 1280, "bit_rate": "8M", "max_fps": 60,
+        "codec_preference": ["h264"], "video_buffer": 0,
+        "audio_codec": "opus", "audio_buffer": 30,
+    },
+    # Redes lentas: el códec más eficiente disponible y un búfer que absorbe el jitter
+    "low-bandwidth": {
+        "description": "Poco ancho de banda (Wi-Fi congestionado, VPN)",
+        "max_size": 1024, "bit_rate": "2M", "max_fps": 30,
+        "codec_preference": ["av1", "h265", "h264"], "video_buffer": 100,
+        "audio_codec": "opus", "audio_bit_rate": "64K", "audio_buffer": 120,
+    },
+    "high-fidelity": {
+        "description": "Máxima calidad de imagen y audio (presentaciones, grabación)",
+        "max_size": 0, "bit_rate": "16M", "max_fps": 60,
+        "codec_preference": ["h265", "h264"], "video_buffer": 50,
+        "audio_codec": "aac", "audio_bit_rate": "256K", "audio_buffer": 80,
+    },
+    # Menos fotogramas y píxeles que codificar, y la pantalla del dispositivo apagada
+    "battery-saver": {
+        "description": "Menor consumo en el dispositivo",
+        "max_size": 1024, "bit_rate": "2M", "max_fps": 24,
+        "codec_preference": ["h264"], "video_buffer": 50,
+        "audio_codec": "opus", "audio_bit_rate": "64K", "turn_screen_off": True,
+    },
+}
+
+
+def get_config_dir() -> str:
+    """Directorio de configuración de la aplicación."""
+    if os.name == 'nt':  # Windows
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:  # Linux/macOS
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "android-screen-mirror")
+
+
+def default_profiles_path() -> str:
+    return os.environ.get("ANDROID_MIRROR_PROFILES") or os.path.join(get_config_dir(), "profiles.json")
+
+
+def _resolve(name: str, raw: Dict[str, dict], resolved: Dict[str, dict], chain: tuple = ()) -> dict:
+    if name in resolved:
+        return resolved[name]
+    if name in chain:
+        raise ValueError(f"Herencia circular de perfiles: {' -> '.join(chain + (name,))}")
+    if name not in raw:
+        raise ValueError(f"Perfil desconocido: {name}")
+    definition = dict(raw[name])
+    parent = definition.pop("extends", None)
+    profile = dict(_resolve(parent, raw, resolved, chain + (name,))) if parent else {}
+    profile.pop("description", None)
+    profile.update(definition)
+    resolved[name] = profile
+    return profile
+
+
+def load_profiles(path: Optional[str] = None) -> tuple[Dict[str, dict], List[str]]:
+    """
+    Perfiles incluidos más los definidos por el usuario.
+
+    Un perfil de usuario con el nombre de uno incluido lo reemplaza; con
+    "extends" hereda las opciones de otro perfil y solo cambia las indicadas.
+
+    Args:
+        path: Archivo JSON de perfiles (por defecto default_profiles_path()).
+
+    Returns:
+        tuple: (perfiles por nombre, avisos). Los perfiles de usuario inválidos
+        se omiten con un aviso en lugar de impedir el arranque.
+    """
+    path = path or default_profiles_path()
+    warnings = []
+    user_profiles = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            user_profiles = data.get("profiles", {}) if isinstance(data, dict) else None
+            if not isinstance(user_profiles, dict):
+                raise ValueError("se esperaba un objeto \"profiles\"")
+        except (OSError, ValueError) as e:
+            warnings.append(f"No se pudo leer {path}: {e}")
+            user_profiles = {}
+
+    raw = dict(BUILTIN_PROFILES)
+    for name, definition in user_profiles.items():
+        if not isinstance(definition, dict):
+            warnings.append(f"Perfil '{name}' ignorado: debe ser un objeto JSON.")
+            continue
+        unknown = set(definition) - PROFILE_OPTION_KEYS - {"extends", "description"}
+        if unknown:
+            warnings.append(f"Perfil '{name}': opciones desconocidas ignoradas ({', '.join(sorted(unknown))}).")
+            definition = {key: value for key, value in definition.items() if key not in unknown}
+        raw[name] = definition
+
+    profiles = {}
+    resolved: Dict[str, dict] = {}
+    for name in raw:
+        try:
+            profiles[name] = dict(_resolve(name, raw, resolved), description=raw[name].get("description", ""))
+        except ValueError as e:
+            warnings.append(f"Perfil '{name}' ignorado: {e}")
+    return profiles, warnings
+
+
+def apply_profile(options: dict, profile: dict) -> dict:
+    """
+    Opciones del perfil completadas con las explícitas del llamador.
+
+    Los valores vacíos del llamador (None, "", False) no anulan los del perfil,
+    de modo que una casilla sin marcar no deshace, p. ej., turn_screen_off.
+    """
+    merged = {key: value for key, value in profile.items() if key in PROFILE_OPTION_KEYS}
+    for key, value in options.items():
+        if key in merged and (value is None or value == "" or value is False):
+            continue
+        merged[key] = value
+    return merged
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas en formato de texto de Prometheus
+
+Registro mínimo de contadores, gauges e histogramas con etiquetas y un
+servidor HTTP embebido (solo biblioteca estándar) que los publica en
+/metrics para que Prometheus los recoja. Es opcional: sin servidor, las
+métricas se acumulan en memoria con un coste de un bloqueo y una suma por
+observación.
+
+Los valores que ya mantiene la aplicación (sesiones activas, FPS por
+dispositivo...) no se copian en cada cambio: se registran "colectores" que
+los leen en el momento de cada consulta.
+
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Peticiones", ("command",))
+    requests.inc(command="devices")
+    server = MetricsServer(registry, port=9464)
+    server.start()   # curl http://127.0.0.1:9464/metrics
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict
+
+
+DEFAULT_METRICS_HOST = "127.0.0.1" # Solo local salvo que se indique otra interfaz
+DEFAULT_METRICS_PORT = 9464
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de operaciones locales del servidor ADB a arranques lentos de scrcpy
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: se esperaban las etiquetas {self.labelnames}, no {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[tuple[str, Dict[str, str], float]]:
+        """(nombre, etiquetas, valor) de cada serie."""
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in items]
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Counter(_Metric):
+    """Valor que solo crece (peticiones, fallos, relanzamientos...)."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Un contador no puede decrecer.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribución de duraciones en cubetas acumulativas (más _sum y _count)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value) # Primera cubeta con límite ≥ valor
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        samples = []
+        for key, counts, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de la aplicación y colectores evaluados en cada consulta."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames=(), **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"La métrica {name} ya existe con otro tipo ({metric.kind}).")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collector):
+        """
+        Registra collector() -> iterable de (nombre, tipo, ayuda, [(etiquetas, valor), ...]).
+
+        Se llama en cada consulta de /metrics, nunca en las rutas de la aplicación.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e: # Un colector roto no debe tumbar la exportación completa
+                lines.append(f"# colector {getattr(collector, '__name__', collector)!s} falló: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = None # Se asigna en la subclase que crea MetricsServer
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404, "Use /metrics")
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Las consultas periódicas de Prometheus no deben llenar el log
+
+
+class MetricsServer:
+    """
+    Servidor HTTP de /metrics en un hilo daemon.
+
+    Args:
+        registry: Registro a publicar.
+        host: Interfaz de escucha (por defecto solo localhost).
+        port: Puerto; 0 elige uno libre (ver address).
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = DEFAULT_METRICS_HOST,
+                 port: int = DEFAULT_METRICS_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Optional[tuple[str, int]]:
+        return self._server.server_address[:2] if self._server else None
+
+    @property
+    def url(self) -> Optional[str]:
+        if not self._server:
+            return None
+        host, port = self.address
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        """Empieza a escuchar. Lanza OSError si el puerto está ocupado."""
+        if self._server:
+            return
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._server:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._server is not None
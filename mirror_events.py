@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eventos de log estructurados para AndroidMirror
+
+Cada mensaje se publica como un LogEvent (marca de tiempo, nivel, serial del
+dispositivo, fase y duración) en un bus de eventos ligero. Los suscriptores
+incluyen un adaptador para el callback de texto existente, un buffer circular
+indexado por dispositivo y un archivo JSON-lines opcional con rotación.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict
+
+
+LEVELS = ("debug", "info", "warning", "error")
+_LEVEL_ORDER = {level: index for index, level in enumerate(LEVELS)}
+
+
+@dataclass
+class LogEvent:
+    """Evento de log estructurado."""
+    message: str
+    level: str = "info"
+    serial: Optional[str] = None
+    phase: Optional[str] = None # connect, launch, stop, scan, deps, cleanup...
+    duration: Optional[float] = None # Segundos transcurridos desde el inicio de la fase
+    timestamp: float = field(default_factory=time.time)
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        if not data["extra"]:
+            del data["extra"]
+        return data
+
+
+def infer_level(message: str) -> str:
+    """Nivel de un mensaje de texto libre según sus marcas habituales (❌, ⚠️, ERROR:...)."""
+    text = message.lstrip()
+    if "❌" in text or "ERROR:" in text or text.lower().startswith("error"):
+        return "error"
+    if "⚠️" in text or "WARN:" in text or text.lower().startswith("advertencia"):
+        return "warning"
+    if "DEBUG:" in text or "VERBOSE:" in text:
+        return "debug"
+    return "info"
+
+
+class EventBus:
+    """Publicación/suscripción síncrona de LogEvent. Un suscriptor defectuoso no afecta a los demás."""
+
+    def __init__(self):
+        self._subscribers: List = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Registra callback(LogEvent). Devuelve una función para cancelar la suscripción."""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+        return unsubscribe
+
+    def publish(self, event: LogEvent):
+        for callback in self._subscribers: # Lista inmutable: no hace falta bloquear
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+
+class StringCallbackAdapter:
+    """Reenvía el texto de cada evento a un callback de una cadena (print, App.log_message...)."""
+
+    def __init__(self, callback, min_level: str = "debug"):
+        self.callback = callback
+        self.min_level = _LEVEL_ORDER.get(min_level, 0)
+
+    def __call__(self, event: LogEvent):
+        if _LEVEL_ORDER.get(event.level, 1) >= self.min_level:
+            self.callback(event.message)
+
+
+class EventRingBuffer:
+    """
+    Buffer circular de eventos con índice por dispositivo.
+
+    Guarda los últimos `max_events` eventos globales y, por separado, los últimos
+    `max_events_per_device` de cada serial, de modo que filtrar por dispositivo
+    no exige recorrer todo el historial.
+    """
+
+    def __init__(self, max_events: int = 5000, max_events_per_device: int = 1000):
+        self.max_events_per_device = max_events_per_device
+        self._events = deque(maxlen=max_events)
+        self._by_serial: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: LogEvent):
+        self.append(event)
+
+    def append(self, event: LogEvent):
+        with self._lock:
+            self._events.append(event)
+            if event.serial:
+                bucket = self._by_serial.get(event.serial)
+                if bucket is None:
+                    bucket = self._by_serial[event.serial] = deque(maxlen=self.max_events_per_device)
+                bucket.append(event)
+
+    def serials(self) -> List[str]:
+        with self._lock:
+            return list(self._by_serial)
+
+    def query(self, serial: Optional[str] = None, min_level: Optional[str] = None,
+              phase: Optional[str] = None, limit: Optional[int] = None) -> List[LogEvent]:
+        """Eventos más recientes que cumplen los filtros, en orden cronológico."""
+        with self._lock:
+            source = list(self._by_serial.get(serial, ())) if serial else list(self._events)
+        threshold = _LEVEL_ORDER.get(min_level, 0) if min_level else 0
+        events = [event for event in source
+                  if _LEVEL_ORDER.get(event.level, 1) >= threshold and (phase is None or event.phase == phase)]
+        return events[-limit:] if limit else events
+
+
+class JsonLinesSink:
+    """Archivo de eventos JSON-lines de solo anexado, rotado al alcanzar `max_bytes`."""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event: LogEvent):
+        self.write(event)
+
+    def write(self, event: LogEvent):
+        line = json.dumps(event.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            if self.max_bytes and self._file.tell() + len(line.encode("utf-8")) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class LogContext:
+    """Fase y dispositivo activos en el hilo actual (se anidan como una pila)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> tuple[Optional[str], Optional[str], Optional[float]]:
+        """(fase, serial, inicio) del contexto más interno, o (None, None, None)."""
+        stack = self._stack()
+        return stack[-1] if stack else (None, None, None)
+
+    def __call__(self, phase: str, serial: Optional[str] = None):
+        return _LogContextScope(self, phase, serial)
+
+
+class _LogContextScope:
+    def __init__(self, context: LogContext, phase: str, serial: Optional[str]):
+        self.context, self.phase, self.serial = context, phase, serial
+
+    def __enter__(self):
+        _, outer_serial, _ = self.context.current()
+        self.context._stack().append((self.phase, self.serial or outer_serial, time.monotonic()))
+        return self
+
+    def __exit__(self, *exc):
+        self.context._stack().pop()
+        return False
+
+
+def log_phase(phase: str, serial_arg: Optional[str] = None):
+    """
+    Decorador de métodos: los eventos emitidos durante la llamada llevan la fase
+    indicada y, si se da `serial_arg`, el serial tomado de ese argumento.
+    La instancia debe tener un atributo `log_context` (LogContext).
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            serial = None
+            if serial_arg:
+                bound = signature.bind_partial(self, *args, **kwargs)
+                serial = bound.arguments.get(serial_arg)
+            with self.log_context(phase, serial):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
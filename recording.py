@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grabación segmentada de sesiones scrcpy
+
+scrcpy graba en un único archivo por ejecución. Para sesiones largas, la
+grabación se divide en segmentos acotados por duración y/o tamaño: al
+alcanzar el límite se lanza un nuevo scrcpy con el siguiente archivo y se
+detiene el anterior (que cierra su archivo correctamente). Sin
+reproducción, el nuevo segmento arranca antes de detener el anterior, así
+que no se pierde ningún fotograma entre segmentos.
+
+Los segmentos más antiguos se eliminan cuando el total supera el límite de
+retención, y antes de empezar se comprueban el espacio libre y la velocidad
+de escritura del disco destino.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy 2.0+
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Optional, List, Dict
+
+
+DEFAULT_SEGMENT_SECONDS = 600
+DEFAULT_SEGMENT_MAX_BYTES = 1024 ** 3 # 1 GiB
+DEFAULT_MIN_FREE_BYTES = 2 * 1024 ** 3
+DEFAULT_RECORD_FORMAT = "mkv" # Un MKV interrumpido sigue siendo legible; un MP4 no
+THROUGHPUT_TEST_BYTES = 16 * 1024 ** 2
+THROUGHPUT_SAFETY_FACTOR = 4 # Margen sobre el bitrate de vídeo+audio previsto
+MONITOR_INTERVAL = 1.0
+MAX_CONSECUTIVE_FAILURES = 5
+DEFAULT_RECORD_BIT_RATE = 8_000_000 # Bitrate por defecto de scrcpy
+
+
+def parse_bit_rate(value) -> Optional[int]:
+    """'8M' -> 8000000, '512K' -> 512000, 2000000 -> 2000000."""
+    if value is None or value == "":
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kKmM]?)\s*", str(value))
+    if not match:
+        return None
+    number, unit = float(match.group(1)), match.group(2).upper()
+    return int(number * {"": 1, "K": 1000, "M": 1000 ** 2}[unit])
+
+
+def segment_prefix(serial: Optional[str]) -> str:
+    """Prefijo de archivo seguro para un serial ("192.168.1.5:5555" -> "192.168.1.5_5555")."""
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", serial or "device")
+
+
+def check_disk(directory: str, min_free_bytes: int = DEFAULT_MIN_FREE_BYTES,
+               bit_rate: Optional[int] = None, test_bytes: int = THROUGHPUT_TEST_BYTES) -> dict:
+    """
+    Comprueba espacio libre y velocidad de escritura sostenida del directorio.
+
+    Escribe `test_bytes` con fsync para medir el rendimiento real del disco
+    (no el de la caché de páginas) y lo compara con el bitrate previsto.
+
+    Returns:
+        dict: ok, reason, free_bytes, write_bytes_per_s y required_bytes_per_s.
+    """
+    os.makedirs(directory, exist_ok=True)
+    free = shutil.disk_usage(directory).free
+    result = {"ok": True, "reason": "", "free_bytes": free, "write_bytes_per_s": None,
+              "required_bytes_per_s": (bit_rate or DEFAULT_RECORD_BIT_RATE) / 8 * THROUGHPUT_SAFETY_FACTOR}
+    if free < min_free_bytes:
+        result.update(ok=False, reason=f"Espacio libre insuficiente: {free / 1024 ** 3:.1f} GiB "
+                                       f"(mínimo {min_free_bytes / 1024 ** 3:.1f} GiB)")
+        return result
+    if test_bytes <= 0:
+        return result
+    probe_path = os.path.join(directory, f".write-test-{os.getpid()}")
+    block = os.urandom(1024 ** 2)
+    try:
+        start = time.perf_counter()
+        with open(probe_path, "wb") as f:
+            for _ in range(max(1, test_bytes // len(block))):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        result["write_bytes_per_s"] = max(1, test_bytes // len(block)) * len(block) / elapsed
+    except OSError as e:
+        result.update(ok=False, reason=f"No se puede escribir en {directory}: {e}")
+        return result
+    finally:
+        try:
+            os.remove(probe_path)
+        except OSError:
+            pass
+    if result["write_bytes_per_s"] < result["required_bytes_per_s"] / THROUGHPUT_SAFETY_FACTOR:
+        result.update(ok=False, reason=f"Disco demasiado lento: {result['write_bytes_per_s'] / 1024 ** 2:.1f} MiB/s")
+    elif result["write_bytes_per_s"] < result["required_bytes_per_s"]:
+        result["reason"] = (f"Margen de escritura bajo: {result['write_bytes_per_s'] / 1024 ** 2:.1f} MiB/s "
+                            f"(recomendado {result['required_bytes_per_s'] / 1024 ** 2:.1f} MiB/s)")
+    return result
+
+
+def enforce_retention(directory: str, max_total_bytes: int, prefix: str = "",
+                      keep: Optional[set] = None) -> List[str]:
+    """
+    Borra los segmentos más antiguos hasta que el total quede por debajo del límite.
+
+    Args:
+        prefix: Sólo se consideran archivos que empiezan así (un dispositivo).
+        keep: Rutas que nunca se borran (segmentos en escritura).
+
+    Returns:
+        List[str]: Rutas eliminadas.
+    """
+    keep = {os.path.abspath(path) for path in (keep or ())}
+    segments = []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    for entry in entries:
+        if entry.is_file() and entry.name.startswith(prefix) and entry.name.endswith((".mkv", ".mp4")):
+            stat = entry.stat()
+            segments.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in segments)
+    removed = []
+    for _, size, path in sorted(segments):
+        if total <= max_total_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed.append(path)
+    return removed
+
+
+class SegmentedRecorder:
+    """
+    Grabación de un dispositivo en segmentos rotados por tiempo y/o tamaño.
+
+    Args:
+        serial: Serial del dispositivo.
+        directory: Carpeta de los segmentos.
+        launch: Función launch(ruta_segmento, reemplazar) que arranca scrcpy grabando en
+            esa ruta y devuelve la ScrcpySession lista (o None si falló). Con
+            reemplazar=False la sesión anterior no debe detenerse todavía.
+        segment_seconds: Duración máxima de cada segmento (0 = sin límite).
+        segment_max_bytes: Tamaño máximo de cada segmento (0 = sin límite).
+        max_total_bytes: Retención: tamaño total máximo de los segmentos del dispositivo.
+        overlap: Arrancar el segmento nuevo antes de cerrar el anterior (sólo sin reproducción).
+        stop_on_user_exit: Terminar la grabación si scrcpy sale con código 0 (ventana cerrada).
+    """
+
+    def __init__(self, serial: Optional[str], directory: str, launch,
+                 segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+                 max_total_bytes: Optional[int] = None, record_format: str = DEFAULT_RECORD_FORMAT,
+                 min_free_bytes: int = DEFAULT_MIN_FREE_BYTES, overlap: bool = True,
+                 stop_on_user_exit: bool = False, log_callback=None):
+        self.serial = serial
+        self.directory = directory
+        self.launch = launch
+        self.segment_seconds = segment_seconds
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.record_format = record_format
+        self.min_free_bytes = min_free_bytes
+        self.overlap = overlap
+        self.stop_on_user_exit = stop_on_user_exit
+        self.log_callback = log_callback if log_callback else print
+        self.prefix = segment_prefix(serial)
+        self.session = None
+        self.segments: List[Dict] = []
+        self.removed_segments = 0
+        self.restarts = 0
+        self._index = 0
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current_path(self) -> Optional[str]:
+        return self.segments[-1]["path"] if self.segments else None
+
+    def _next_path(self) -> str:
+        self._index += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.directory, f"{self.prefix}_{stamp}_{self._index:04d}.{self.record_format}")
+
+    def _open_segment(self, replace: bool) -> bool:
+        path = self._next_path()
+        session = self.launch(path, replace)
+        if session is None:
+            return False
+        previous, self.session = self.session, session
+        if self.segments:
+            self.segments[-1]["ended_at"] = time.time()
+        self.segments.append({"path": path, "started_at": time.time(), "ended_at": None,
+                              "_started": time.monotonic()})
+        if previous is not None and previous.is_running():
+            previous.stop() # Cierra el segmento anterior (scrcpy finaliza el contenedor)
+        self._failures = 0
+        return True
+
+    def start(self) -> bool:
+        """Abre el primer segmento y arranca el hilo de rotación."""
+        os.makedirs(self.directory, exist_ok=True)
+        if not self._open_segment(replace=True):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{self.prefix}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _segment_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.current_path)
+        except (OSError, TypeError):
+            return 0
+
+    def _needs_rotation(self) -> Optional[str]:
+        elapsed = time.monotonic() - self.segments[-1]["_started"]
+        if self.segment_seconds and elapsed >= self.segment_seconds:
+            return f"{elapsed:.0f}s"
+        size = self._segment_bytes()
+        if self.segment_max_bytes and size >= self.segment_max_bytes:
+            return f"{size / 1024 ** 2:.0f} MiB"
+        return None
+
+    def rotate(self, reason: str = "manual") -> bool:
+        """Cierra el segmento actual y abre el siguiente."""
+        finished = self.current_path
+        if not self._open_segment(replace=not self.overlap):
+            self._failures += 1
+            self.log_callback(f"⚠️  No se pudo abrir un nuevo segmento para {self.prefix}; se sigue grabando en el actual.")
+            return False
+        self.log_callback(f"🎞️  Segmento cerrado ({reason}): {os.path.basename(finished)} → "
+                          f"{os.path.basename(self.current_path)}")
+        self._apply_retention()
+        return True
+
+    def _apply_retention(self):
+        if not self.max_total_bytes:
+            return
+        removed = enforce_retention(self.directory, self.max_total_bytes, f"{self.prefix}_", keep={self.current_path})
+        if removed:
+            self.removed_segments += len(removed)
+            self.log_callback(f"🧹 Retención: {len(removed)} segmentos antiguos eliminados de {self.prefix}.")
+
+    def _run(self):
+        try:
+            self._monitor()
+        finally:
+            # Sea cual sea el motivo de la salida (espacio, fallos, error), scrcpy no debe seguir
+            # grabando sin nadie que lo vigile; tras cerrar la ventana ya no está en marcha
+            if self.session is not None and self.session.is_running():
+                self.session.stop()
+            if self.segments and self.segments[-1]["ended_at"] is None:
+                self.segments[-1]["ended_at"] = time.time()
+
+    def _monitor(self):
+        while not self._stop.wait(MONITOR_INTERVAL):
+            session = self.session
+            if session is not None and not session.is_running():
+                if self._stop.is_set():
+                    break
+                if self.stop_on_user_exit and session.returncode == 0:
+                    self.log_callback(f"⏹️  Grabación de {self.prefix} finalizada (scrcpy cerrado).")
+                    break
+                self._failures += 1
+                if self._failures > MAX_CONSECUTIVE_FAILURES:
+                    self.log_callback(f"❌ Grabación de {self.prefix} detenida tras {MAX_CONSECUTIVE_FAILURES} fallos seguidos.")
+                    break
+                self.restarts += 1
+                self.log_callback(f"⚠️  scrcpy terminó inesperadamente (código {session.returncode}); "
+                                  f"nuevo segmento para {self.prefix}...")
+                if not self._open_segment(replace=True):
+                    self._stop.wait(min(2 ** self._failures, 30))
+                continue
+            reason = self._needs_rotation()
+            if reason:
+                self.rotate(reason)
+            elif shutil.disk_usage(self.directory).free < self.min_free_bytes:
+                self.log_callback(f"❌ Espacio libre por debajo del mínimo; se detiene la grabación de {self.prefix}.")
+                break
+
+    def stop(self):
+        """Detiene la rotación y cierra el segmento en curso."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self.session is not None and self.session.is_running():
+            self.session.stop()
+
+    def is_active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict:
+        """Segmentos grabados (ruta, tamaño, inicio, fin) y contadores de la grabación."""
+        segments = []
+        for segment in self.segments:
+            try:
+                size = os.path.getsize(segment["path"])
+            except OSError:
+                size = None # Eliminado por la retención
+            segments.append({"path": segment["path"], "bytes": size,
+                             "started_at": segment["started_at"], "ended_at": segment["ended_at"]})
+        return {
+            "serial": self.serial,
+            "active": self.is_active(),
+            "directory": self.directory,
+            "current": self.current_path,
+            "segments": segments,
+            "restarts": self.restarts,
+            "removed_segments": self.removed_segments,
+        }
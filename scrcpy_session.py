@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sesión de scrcpy con lectura continua de su salida
+
+Lanza scrcpy, lee stdout/stderr en hilos de fondo y detecta cuándo la
+duplicación está lista (o cuándo scrcpy ha fallado) sin esperas fijas.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy
+"""
+
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Dict
+
+from stream_metrics import StreamMetrics
+
+
+# Líneas que indican que scrcpy ya está mostrando (o grabando) la pantalla
+READY_PATTERNS = (
+    re.compile(r"INFO: Renderer:"),
+    re.compile(r"INFO: Texture:"),
+    re.compile(r"Recording started to"),
+)
+# Sin ventana no hay renderizador: la sesión está lista cuando el servidor responde
+HEADLESS_READY_PATTERNS = READY_PATTERNS + (
+    re.compile(r"INFO: Device: "),
+    re.compile(r"v4l2 sink started"),
+)
+# scrcpy imprime el tamaño de la textura al decodificar el primer fotograma
+FIRST_FRAME_PATTERN = re.compile(r"INFO: Texture:")
+
+DEFAULT_LAUNCH_TIMEOUT = 10.0
+DEFAULT_BUFFER_LINES = 500
+DEFAULT_LOG_RATE = 20.0 # Líneas por segundo reenviadas a log_callback
+
+
+class LineRingBuffer:
+    """Buffer circular de líneas: memoria constante sin importar la duración de la sesión."""
+
+    def __init__(self, max_lines: int = DEFAULT_BUFFER_LINES):
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self.total_lines = 0
+
+    def append(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+            self.total_lines += 1
+
+    def tail(self, count: Optional[int] = None) -> List[str]:
+        """Últimas `count` líneas (todas las retenidas si es None)."""
+        with self._lock:
+            lines = list(self._lines)
+        return lines if count is None else lines[-count:] if count > 0 else []
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._lines)
+
+
+class _RateLimiter:
+    """Cubo de fichas: permite ráfagas cortas y limita el ritmo sostenido."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True # Sin límite
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class ScrcpySession:
+    """
+    Proceso scrcpy en ejecución junto con sus hilos lectores y métricas de arranque.
+
+    Los hilos lectores vacían stdout/stderr de forma continua durante toda la
+    sesión (si la tubería se llena, scrcpy se bloquea), guardan las líneas en un
+    buffer circular y las reenvían a log_callback con un límite de ritmo.
+    """
+
+    def __init__(self, command: List[str], log_callback=None, serial: Optional[str] = None,
+                 buffer_lines: int = DEFAULT_BUFFER_LINES, log_rate: float = DEFAULT_LOG_RATE,
+                 forward_output: bool = True, options: Optional[dict] = None, ready_patterns=READY_PATTERNS,
+                 collect_fps: bool = False, popen=subprocess.Popen):
+        self.command = command
+        self.popen = popen # Sustituible por CommandRunner.popen para medir el arranque
+        self.serial = serial
+        self.options = dict(options or {})
+        self.ready_patterns = ready_patterns
+        self.log_callback = log_callback if log_callback else print
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at: Optional[float] = None
+        self.time_to_ready: Optional[float] = None
+        self.time_to_first_frame: Optional[float] = None
+        self.output = LineRingBuffer(buffer_lines)
+        self.forward_output = forward_output
+        # Con --print-fps: estadísticas de FPS (los informes no se reenvían al log)
+        self.metrics: Optional[StreamMetrics] = StreamMetrics(serial) if collect_fps else None
+        self.suppressed_lines = 0 # Líneas no reenviadas a log_callback por el límite de ritmo
+        self._rate_limiter = _RateLimiter(log_rate)
+        self._lock = threading.Lock()
+        self._settled = threading.Event() # Listo o terminado
+        self._readers: List[threading.Thread] = []
+        self._open_streams = 0
+        self._stop_requested = False
+        self._exit_callbacks: List = []
+        self._output_callbacks: List = []
+        self.ended_at: Optional[float] = None
+
+    def start(self):
+        """
+        Lanza scrcpy y sus hilos lectores.
+
+        Raises:
+            FileNotFoundError: Si el ejecutable scrcpy no existe.
+        """
+        self.started_at = time.monotonic()
+        self.process = self.popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1
+        )
+        self._open_streams = 2
+        for name, stream in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            reader = threading.Thread(target=self._read_stream, args=(stream,),
+                                      name=f"scrcpy-{name}-{self.process.pid}", daemon=True)
+            self._readers.append(reader)
+            reader.start()
+
+    def _read_stream(self, stream):
+        try:
+            for line in iter(stream.readline, ""):
+                self._handle_line(line.rstrip("\r\n"))
+        except (OSError, ValueError):
+            pass # Flujo cerrado durante la detención
+        finally:
+            with self._lock:
+                self._open_streams -= 1
+                last = self._open_streams == 0
+            if last:
+                # Ambos flujos cerrados: el proceso ha terminado o está terminando
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    pass
+                self._settled.set()
+                if self.process.poll() is not None:
+                    self.ended_at = time.monotonic()
+                    for callback in list(self._exit_callbacks):
+                        try:
+                            callback(self)
+                        except Exception:
+                            pass
+
+    def _handle_line(self, line: str):
+        now = time.monotonic() - self.started_at
+        self.output.append(line)
+        is_fps_report = self.metrics is not None and self.metrics.parse_line(line)
+        if self.forward_output and not is_fps_report:
+            self._forward(line)
+        if self.time_to_first_frame is None and FIRST_FRAME_PATTERN.search(line):
+            self.time_to_first_frame = now
+        if self.time_to_ready is None and any(p.search(line) for p in self.ready_patterns):
+            self.time_to_ready = now
+            self._settled.set()
+        for callback in self._output_callbacks:
+            try:
+                callback(self, line)
+            except Exception:
+                pass
+
+    def _forward(self, line: str):
+        prefix = f"[scrcpy {self.serial}]" if self.serial else "[scrcpy]"
+        if self._rate_limiter.allow():
+            with self._lock:
+                suppressed, self.suppressed_lines = self.suppressed_lines, 0
+            if suppressed:
+                self.log_callback(f"{prefix} ... {suppressed} líneas omitidas (ver tail())")
+            self.log_callback(f"{prefix} {line}")
+        else:
+            with self._lock:
+                self.suppressed_lines += 1
+
+    def wait_ready(self, timeout: float = DEFAULT_LAUNCH_TIMEOUT) -> bool:
+        """
+        Espera hasta que scrcpy informe que está listo, termine, o venza el plazo.
+
+        Returns:
+            bool: True si scrcpy confirmó que está listo.
+        """
+        self._settled.wait(timeout)
+        return self.time_to_ready is not None and self.is_running()
+
+    def add_exit_callback(self, callback):
+        """Registra callback(session) que se ejecuta cuando scrcpy termina."""
+        self._exit_callbacks.append(callback)
+
+    def add_output_callback(self, callback):
+        """Registra callback(session, línea) que recibe cada línea de salida (sin límite de ritmo)."""
+        self._output_callbacks.append(callback)
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def state(self) -> str:
+        """starting, running, stopped (detenida a petición), exited (código 0) o failed."""
+        if self.process is None:
+            return "starting"
+        code = self.process.poll()
+        if code is None:
+            return "running" if self._settled.is_set() else "starting"
+        if self._stop_requested:
+            return "stopped"
+        return "exited" if code == 0 else "failed"
+
+    @property
+    def uptime(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+    def summary(self) -> dict:
+        """Resumen del estado de la sesión para listados."""
+        return {
+            "serial": self.serial,
+            "state": self.state,
+            "pid": self.process.pid if self.process else None,
+            "returncode": self.returncode,
+            "uptime": round(self.uptime, 2),
+            "time_to_ready": self.time_to_ready,
+            "time_to_first_frame": self.time_to_first_frame,
+            "options": dict(self.options),
+            "metrics": self.metrics.snapshot() if self.metrics else None,
+            "log_tail": self.tail(5),
+        }
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.process.poll() if self.process else None
+
+    def tail(self, count: Optional[int] = 50) -> List[str]:
+        """Últimas líneas de salida de scrcpy (stdout y stderr intercaladas)."""
+        return self.output.tail(count)
+
+    def startup_output(self) -> str:
+        """Salida retenida tras un fallo de arranque (espera a que los lectores terminen)."""
+        for reader in self._readers:
+            reader.join(timeout=1)
+        return "\n".join(self.tail(None))
+
+    def stop(self, timeout: float = 5.0):
+        """Termina scrcpy (con kill si no responde a tiempo)."""
+        self._stop_requested = True
+        if self.is_running():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class SessionManager:
+    """
+    Registro de sesiones scrcpy concurrentes indexado por serial de dispositivo.
+
+    Lanzar una sesión para un serial que ya tiene una en marcha detiene la
+    anterior, de modo que ningún proceso queda huérfano.
+    """
+
+    DEFAULT_KEY = "default" # Sesiones lanzadas sin serial (único dispositivo USB)
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback if log_callback else print
+        self._sessions: Dict[str, ScrcpySession] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, serial: Optional[str]) -> str:
+        return serial or self.DEFAULT_KEY
+
+    def launch(self, serial: Optional[str], command: List[str], options: Optional[dict] = None,
+               stop_previous: bool = True, **session_kwargs) -> ScrcpySession:
+        """
+        Crea, registra y arranca una sesión para el dispositivo.
+
+        Args:
+            stop_previous: Detener la sesión anterior del serial. Con False queda
+                en marcha (fuera del registro) y el llamador debe detenerla.
+
+        Raises:
+            FileNotFoundError: Si el ejecutable scrcpy no existe.
+        """
+        previous = self.get(serial)
+        if stop_previous and previous and previous.is_running():
+            self.log_callback(f"🔁 Reemplazando la sesión en curso de {self._key(serial)}...")
+            previous.stop()
+        session_kwargs.setdefault("log_callback", self.log_callback)
+        session = ScrcpySession(command, serial=serial, options=options, **session_kwargs)
+        session.add_exit_callback(self._on_session_exit)
+        with self._lock:
+            self._sessions[self._key(serial)] = session
+        try:
+            session.start()
+        except BaseException:
+            with self._lock:
+                if previous is not None and not stop_previous:
+                    self._sessions[self._key(serial)] = previous
+                else:
+                    self._sessions.pop(self._key(serial), None)
+            raise
+        return session
+
+    def _on_session_exit(self, session: ScrcpySession):
+        if session.state == "failed":
+            self.log_callback(f"⚠️  scrcpy ({self._key(session.serial)}) terminó con código {session.returncode}.")
+
+    def get(self, serial: Optional[str]) -> Optional[ScrcpySession]:
+        with self._lock:
+            return self._sessions.get(self._key(serial))
+
+    def sessions(self) -> List[ScrcpySession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def running(self) -> List[ScrcpySession]:
+        return [session for session in self.sessions() if session.is_running()]
+
+    def list_sessions(self) -> List[dict]:
+        """Resumen (estado, código de salida, tiempos, últimas líneas) de todas las sesiones."""
+        return [session.summary() for session in self.sessions()]
+
+    def stop(self, serial: Optional[str], timeout: float = 5.0) -> bool:
+        """Detiene la sesión del dispositivo. Devuelve False si no había ninguna."""
+        session = self.get(serial)
+        if not session:
+            return False
+        session.stop(timeout)
+        return True
+
+    def stop_all(self, timeout: float = 5.0):
+        """Detiene todas las sesiones en paralelo."""
+        threads = [threading.Thread(target=session.stop, args=(timeout,), daemon=True)
+                   for session in self.running()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def remove(self, serial: Optional[str]) -> Optional[ScrcpySession]:
+        """Olvida una sesión terminada (la detiene antes si sigue activa)."""
+        with self._lock:
+            session = self._sessions.pop(self._key(serial), None)
+        if session and session.is_running():
+            session.stop()
+        return session
+
+    def prune(self) -> int:
+        """Elimina del registro las sesiones ya terminadas. Devuelve cuántas se eliminaron."""
+        with self._lock:
+            finished = [key for key, session in self._sessions.items() if not session.is_running()]
+            for key in finished:
+                del self._sessions[key]
+        return len(finished)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supervisión y reconexión automática de sesiones scrcpy sobre Wi-Fi
+
+Cuando un dispositivo Wi-Fi sale de la red, scrcpy termina y la sesión queda
+muerta hasta que alguien lo nota. SessionSupervisor vigila el proceso de la
+sesión y el estado ADB del dispositivo; ante un fallo abre un incidente,
+vuelve a conectar el dispositivo y relanza scrcpy con las mismas opciones,
+esperando entre intentos un retardo exponencial con jitter. Cada incidente
+tiene un límite de intentos y, además, un presupuesto de reintentos por
+ventana de tiempo evita que un dispositivo que cae una y otra vez se
+relance indefinidamente.
+
+Cada incidente registra su inicio, su final, los intentos y el tiempo sin
+servicio, de modo que status() da el tiempo medio de recuperación (MTTR).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+
+@dataclass
+class ReconnectPolicy:
+    """Ritmo de vigilancia y de reintentos; se puede ajustar en caliente (supervisor.policy)."""
+    check_interval: float = 1.0 # Segundos entre comprobaciones del proceso scrcpy
+    state_interval: float = 5.0 # Segundos entre comprobaciones del estado ADB del dispositivo
+    initial_delay: float = 1.0 # Espera antes del primer intento de un incidente
+    multiplier: float = 2.0
+    max_delay: float = 30.0
+    jitter: float = 0.5 # Fracción aleatoria que se resta al retardo (0 = sin jitter)
+    max_attempts: int = 10 # Intentos por incidente antes de rendirse
+    budget: int = 30 # Intentos totales permitidos en cada ventana...
+    budget_window: float = 3600.0 # ... de estos segundos
+
+
+def backoff_delay(attempt: int, policy: ReconnectPolicy, rng: Optional[random.Random] = None) -> float:
+    """
+    Retardo antes del intento `attempt` (1, 2, ...): exponencial acotado con jitter.
+
+    El jitter reparte los reintentos de varios dispositivos que caen a la vez
+    (p. ej. al reiniciarse el punto de acceso) para que no lleguen juntos al
+    servidor ADB.
+    """
+    delay = min(policy.max_delay, policy.initial_delay * policy.multiplier ** max(0, attempt - 1))
+    jitter = min(max(policy.jitter, 0.0), 1.0)
+    return delay * (1 - jitter * (rng or random).random())
+
+
+@dataclass
+class Incident:
+    """Caída de una sesión supervisada y su recuperación."""
+    serial: str
+    reason: str
+    started_at: float # time.time()
+    ended_at: Optional[float] = None
+    attempts: int = 0
+    recovered: bool = False
+    downtime: Optional[float] = None # Segundos sin sesión (hasta recuperarla o rendirse)
+    last_error: Optional[str] = None
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    def close(self, recovered: bool):
+        self.recovered = recovered
+        self.ended_at = time.time()
+        self.downtime = round(time.monotonic() - self._started, 3)
+
+    def as_dict(self) -> dict:
+        return {key: value for key, value in asdict(self).items() if not key.startswith("_")}
+
+
+class SessionSupervisor:
+    """
+    Vigila la sesión scrcpy de un dispositivo y la recupera tras un fallo.
+
+    Args:
+        serial: Serial del dispositivo ("IP:puerto").
+        get_session: get_session() -> ScrcpySession actual del serial (o None). Se
+            consulta en cada comprobación, así que los relanzamientos de otros
+            componentes (calidad adaptativa) no cuentan como fallos.
+        reconnect: reconnect() -> bool que vuelve a conectar el dispositivo por ADB.
+        relaunch: relaunch() -> bool que lanza scrcpy con las opciones originales.
+        device_state: device_state() -> estado ADB del serial ("device", "offline"...)
+            o None si no aparece. Opcional.
+        on_incident: on_incident(Incident) al cerrar cada incidente (p. ej. métricas).
+    """
+
+    MAX_INCIDENTS = 200 # Incidentes conservados para status()
+
+    def __init__(self, serial: str, get_session, reconnect, relaunch, device_state=None,
+                 policy: Optional[ReconnectPolicy] = None, log_callback=None, on_incident=None,
+                 rng: Optional[random.Random] = None):
+        self.serial = serial
+        self.get_session = get_session
+        self.reconnect = reconnect
+        self.relaunch = relaunch
+        self.device_state = device_state
+        self.policy = policy or ReconnectPolicy()
+        self.log_callback = log_callback if log_callback else print
+        self.on_incident = on_incident
+        self.rng = rng or random.Random()
+        self.state = "idle" # idle | watching | recovering | gave_up | finished | stopped
+        self.incidents = deque(maxlen=self.MAX_INCIDENTS)
+        self.current_incident: Optional[Incident] = None
+        self._attempt_times = deque() # Instantes de los intentos dentro de la ventana del presupuesto
+        self._last_state_check = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Detección ---
+
+    def check(self) -> Optional[str]:
+        """
+        Una comprobación. Devuelve el motivo del fallo, "" si la sesión terminó
+        normalmente (ventana cerrada por el usuario) o None si todo está bien.
+        """
+        session = self.get_session()
+        if session is None:
+            return "no hay sesión scrcpy"
+        state = session.state
+        if state == "failed":
+            return f"scrcpy terminó con código {session.returncode}"
+        if state == "exited":
+            # Versiones antiguas de scrcpy también salen con 0 al perder el dispositivo
+            device_state = self.device_state() if self.device_state else "device"
+            return "" if device_state == "device" else f"scrcpy terminó y el dispositivo está {device_state or 'desaparecido'}"
+        if state == "stopped":
+            return None # Detenida a propósito (relanzamiento en curso o detención del usuario)
+        now = time.monotonic()
+        if self.device_state and now - self._last_state_check >= self.policy.state_interval:
+            self._last_state_check = now
+            device_state = self.device_state()
+            if device_state != "device":
+                return f"dispositivo {device_state or 'desaparecido'} en ADB"
+        return None
+
+    # --- Recuperación ---
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        while self._attempt_times and now - self._attempt_times[0] > self.policy.budget_window:
+            self._attempt_times.popleft()
+        if len(self._attempt_times) >= self.policy.budget:
+            return False
+        self._attempt_times.append(now)
+        return True
+
+    def recover(self, reason: str) -> bool:
+        """Abre un incidente y reintenta reconexión + relanzamiento hasta lograrlo o agotar el presupuesto."""
+        incident = self.current_incident = Incident(self.serial, reason, time.time())
+        self.state = "recovering"
+        self.log_callback(f"⚠️  Sesión de {self.serial} caída ({reason}); reconexión automática en curso...")
+        session = self.get_session()
+        if session is not None and session.is_running():
+            session.stop() # p. ej. el dispositivo desapareció de ADB pero scrcpy aún no lo ha notado
+        elif session is not None and session.ended_at is not None:
+            # El tiempo sin servicio cuenta desde la salida de scrcpy, no desde la detección
+            incident.started_at -= time.monotonic() - session.ended_at
+            incident._started = session.ended_at
+        recovered = False
+        while not self._stop.is_set() and incident.attempts < self.policy.max_attempts:
+            if not self._take_budget():
+                incident.last_error = (f"presupuesto de reintentos agotado ({self.policy.budget} "
+                                       f"en {self.policy.budget_window:.0f}s)")
+                break
+            incident.attempts += 1
+            delay = backoff_delay(incident.attempts, self.policy, self.rng)
+            self.log_callback(f"🔁 Intento {incident.attempts}/{self.policy.max_attempts} para {self.serial} "
+                              f"en {delay:.1f}s...")
+            if self._stop.wait(delay):
+                break
+            try:
+                if not self.reconnect():
+                    incident.last_error = "no se pudo reconectar por ADB"
+                    continue
+                if self._stop.is_set():
+                    break
+                if self.relaunch():
+                    recovered = True
+                    break
+                incident.last_error = "scrcpy no arrancó"
+            except Exception as e:
+                incident.last_error = str(e)
+        incident.close(recovered)
+        self.current_incident = None
+        self.incidents.append(incident)
+        if recovered:
+            self.state = "watching"
+            self.log_callback(f"✅ Sesión de {self.serial} recuperada tras {incident.downtime:.1f}s "
+                              f"({incident.attempts} intentos).")
+        elif self._stop.is_set():
+            self.state = "stopped"
+        else:
+            self.state = "gave_up"
+            self.log_callback(f"❌ Reconexión automática de {self.serial} abandonada tras {incident.attempts} intentos "
+                              f"({incident.last_error}).")
+        if self.on_incident:
+            self.on_incident(incident)
+        return recovered
+
+    def _run(self):
+        self.state = "watching"
+        while not self._stop.wait(self.policy.check_interval):
+            try:
+                reason = self.check()
+            except Exception as e:
+                self.log_callback(f"⚠️  Error al supervisar {self.serial}: {e}")
+                continue
+            if reason == "":
+                self.state = "finished"
+                self.log_callback(f"⏹️  Supervisión de {self.serial} finalizada (scrcpy cerrado).")
+                return
+            if reason is not None and not self.recover(reason):
+                return
+        self.state = "stopped"
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"supervisor-{self.serial}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def is_active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict:
+        """Estado, incidentes (con su tiempo sin servicio) y tiempo medio de recuperación."""
+        incidents = list(self.incidents)
+        recovered = [incident.downtime for incident in incidents if incident.recovered]
+        return {
+            "serial": self.serial,
+            "active": self.is_active(),
+            "state": self.state,
+            "policy": asdict(self.policy),
+            "incidents": [incident.as_dict() for incident in incidents],
+            "current_incident": self.current_incident.as_dict() if self.current_incident else None,
+            "incident_count": len(incidents),
+            "recovered_count": len(recovered),
+            "mttr_seconds": round(sum(recovered) / len(recovered), 3) if recovered else None,
+            "total_downtime_seconds": round(sum(incident.downtime or 0.0 for incident in incidents), 3),
+        }
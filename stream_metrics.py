@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas de fluidez de las sesiones scrcpy
+
+Con --print-fps, scrcpy informa cada segundo de los fotogramas mostrados y,
+si los hubo, de los descartados ("INFO: 44 fps (+16 frames skipped)").
+StreamMetrics interpreta esas líneas y mantiene estadísticas sobre una
+ventana deslizante: FPS actual, mínimo, medio y máximo, fotogramas
+descartados y tiempo desde el último informe (para detectar bloqueos).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, scrcpy 1.14+ (--print-fps)
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+# Línea completa del informe: "INFO: 58 fps" o "INFO: 44 fps (+16 frames skipped)". Anclada para
+# no contar otras líneas que mencionan "N fps" (p. ej. opciones o capacidades del dispositivo)
+FPS_PATTERN = re.compile(r"^\s*INFO:\s+(\d+) fps(?: \(\+(\d+) frames? skipped\))?\s*$")
+
+DEFAULT_METRICS_WINDOW = 60.0 # Segundos de historial para min/media/máx
+STALL_SECONDS = 3.0 # Sin informes durante este tiempo = imagen congelada
+
+
+class StreamMetrics:
+    """Estadísticas deslizantes de FPS y descartes de una sesión."""
+
+    def __init__(self, serial: Optional[str] = None, window: float = DEFAULT_METRICS_WINDOW):
+        self.serial = serial
+        self.window = window
+        self.started_at = time.monotonic()
+        self.total_frames = 0
+        self.total_skipped = 0
+        self.reports = 0
+        self._samples = deque() # (instante, fps, descartados)
+        self._last_report: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def parse_line(self, line: str) -> bool:
+        """Registra la línea si es un informe de FPS. Devuelve True si lo era."""
+        match = FPS_PATTERN.search(line)
+        if not match:
+            return False
+        self.record(int(match.group(1)), int(match.group(2) or 0))
+        return True
+
+    def record(self, fps: int, skipped: int = 0, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples.append((now, fps, skipped))
+            while self._samples and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+            self.total_frames += fps
+            self.total_skipped += skipped
+            self.reports += 1
+            self._last_report = now
+
+    def snapshot(self) -> dict:
+        """fps, min/avg/max en la ventana, descartes, uptime y antigüedad del último informe."""
+        now = time.monotonic()
+        with self._lock:
+            samples = list(self._samples)
+            last_report = self._last_report
+            totals = (self.total_frames, self.total_skipped, self.reports)
+        rates = [fps for _, fps, _ in samples]
+        skipped_window = sum(skipped for _, _, skipped in samples)
+        shown_window = sum(rates)
+        last_age = round(now - last_report, 1) if last_report is not None else None
+        return {
+            "serial": self.serial,
+            "fps": rates[-1] if rates else None,
+            "min_fps": min(rates) if rates else None,
+            "avg_fps": round(shown_window / len(rates), 1) if rates else None,
+            "max_fps": max(rates) if rates else None,
+            "skipped_window": skipped_window,
+            "skip_ratio": round(skipped_window / (shown_window + skipped_window), 3)
+                          if shown_window + skipped_window else 0.0,
+            "total_frames": totals[0],
+            "total_skipped": totals[1],
+            "reports": totals[2],
+            "uptime": round(now - self.started_at, 1),
+            "last_report_age": last_age,
+            "stalled": last_age is not None and last_age > STALL_SECONDS,
+        }
+
+
+def format_metrics(snapshot: dict) -> str:
+    """Línea de estado compacta: "serial: 59 fps (min 55 / media 58.7 / máx 60) · 3 descartados · 00:01:23"."""
+    uptime = int(snapshot["uptime"])
+    clock = f"{uptime // 3600:02d}:{uptime % 3600 // 60:02d}:{uptime % 60:02d}"
+    name = snapshot["serial"] or "scrcpy"
+    if snapshot["fps"] is None:
+        return f"{name}: esperando informes de FPS · {clock}"
+    stalled = " ⚠️ sin imagen" if snapshot["stalled"] else ""
+    return (f"{name}: {snapshot['fps']} fps (min {snapshot['min_fps']} / media {snapshot['avg_fps']} / "
+            f"máx {snapshot['max_fps']}) · {snapshot['total_skipped']} descartados · {clock}{stalled}")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del control adaptativo de calidad: escalera de peldaños, histéresis y descartes
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_quality import (DEFAULT_QUALITY_LADDER, AdaptiveQualityController, # noqa: E402
+                              AdaptiveSettings)
+
+
+class FakeSession:
+    def __init__(self):
+        self.callbacks = []
+
+    def add_output_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def emit(self, line):
+        for callback in self.callbacks:
+            callback(self, line)
+
+    def is_running(self):
+        return True
+
+
+class FakeLink:
+    """Sondeo TCP de guion: devuelve el RTT configurado o un fallo si es None."""
+
+    def __init__(self, rtt_ms=20.0):
+        self.rtt_ms = rtt_ms
+
+    def __call__(self, host, port, timeout):
+        return (self.rtt_ms is not None), (self.rtt_ms or timeout * 1000)
+
+
+class AdaptiveQualityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.link = FakeLink()
+        self.relaunched = []
+        self.logs = []
+        settings = AdaptiveSettings(window=3, degrade_after=2, upgrade_after=3, cooldown=0.0)
+        self.controller = AdaptiveQualityController("10.0.0.2:5555", "10.0.0.2", 5555, self.relaunch,
+                                                    settings=settings, log_callback=self.logs.append,
+                                                    probe_func=self.link)
+        self.controller.attach(FakeSession())
+
+    def relaunch(self, preset):
+        self.relaunched.append(preset.name)
+        return FakeSession()
+
+    def run_steps(self, count):
+        return [self.controller.step() for _ in range(count)]
+
+    def test_start_preset_and_launch_options(self):
+        self.assertEqual(self.controller.preset.name, "media")
+        options = self.controller.launch_options({"bit_rate": "8M", "serial": "x"})
+        self.assertEqual(options, {"bit_rate": "4M", "max_size": "1600", "max_fps": 60,
+                                   "print_fps": True, "serial": "x"})
+
+    def test_unknown_start_preset_uses_the_middle(self):
+        controller = AdaptiveQualityController("s", "h", 1, self.relaunch, start_preset="ultra",
+                                               probe_func=self.link)
+        self.assertEqual(controller.level, len(DEFAULT_QUALITY_LADDER) // 2)
+
+    def test_needs_a_full_window_and_consecutive_bad_evaluations(self):
+        self.link.rtt_ms = 400.0
+        decisions = self.run_steps(4)
+        # 3 muestras para llenar la ventana + 2 evaluaciones malas seguidas
+        self.assertEqual(decisions[:3], [None, None, None])
+        self.assertEqual((decisions[3].action, decisions[3].to_preset), ("degrade", "baja"))
+        self.assertIn("RTT 400 ms", decisions[3].reason)
+        self.assertEqual(self.relaunched, ["baja"])
+
+    def test_hysteresis_between_degrade_and_upgrade(self):
+        self.link.rtt_ms = 100.0 # Ni malo (>150) ni bueno (<60): no cambia nada
+        self.assertEqual(self.run_steps(10), [None] * 10)
+        self.link.rtt_ms = 20.0
+        decisions = self.run_steps(5)
+        # La mediana pasa a ser buena en la 2ª muestra; hacen falta 3 evaluaciones buenas seguidas
+        self.assertEqual([d.action if d else None for d in decisions], [None, None, None, "upgrade", None])
+        self.assertEqual(self.controller.preset.name, "media-alta")
+
+    def test_probe_loss_degrades(self):
+        self.link.rtt_ms = None
+        decision = self.run_steps(4)[-1]
+        self.assertEqual(decision.action, "degrade")
+        self.assertIn("pérdida de sondeos 100%", decision.reason)
+
+    def test_drop_ratio_uses_frame_totals(self):
+        session = self.controller.session
+        for _ in range(3):
+            session.emit("INFO: 40 fps (+20 frames skipped)")
+            session.emit("INFO: 60 fps")
+            self.controller.sample()
+        metrics = self.controller.metrics()
+        self.assertEqual(metrics["drop_ratio"], round(60 / 360, 3))
+        self.assertEqual(self.controller.samples[-1].fps, 50.0)
+
+    def test_lines_from_a_previous_session_are_ignored(self):
+        old_session = self.controller.session
+        self.controller.attach(FakeSession())
+        old_session.emit("INFO: 10 fps (+50 frames skipped)")
+        self.assertEqual(self.controller.sample().dropped, 0)
+
+    def test_cooldown_blocks_changes(self):
+        self.controller.settings.cooldown = 3600.0
+        self.link.rtt_ms = 400.0
+        self.assertEqual(self.run_steps(6), [None] * 6)
+
+    def test_failed_relaunch_is_recorded(self):
+        self.controller.relaunch = lambda preset: None
+        self.link.rtt_ms = 400.0
+        decision = self.run_steps(4)[-1]
+        self.assertFalse(decision.applied)
+        self.assertTrue(any("No se pudo relanzar" in line for line in self.logs))
+
+    def test_bottom_of_the_ladder_stays_put(self):
+        self.controller.level = len(DEFAULT_QUALITY_LADDER) - 1
+        self.link.rtt_ms = 400.0
+        self.assertEqual(self.run_steps(6), [None] * 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
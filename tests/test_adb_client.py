@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del cliente nativo del protocolo host de ADB
+
+Cubren el análisis de las listas de dispositivos, el enmarcado con longitud
+prefijada, las respuestas OKAY/FAIL y sus errores y los eventos de
+DeviceTracker, contra un servidor de guion mínimo.
+
+    python -m pytest tests
+    python -m unittest discover tests
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import queue
+import socket
+import sys
+import threading
+import struct
+import time
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from adb_client import (AdbClient, AdbConnectionClosedError, AdbError, AdbServerUnavailableError, # noqa: E402
+                        DeviceTracker, parse_device_list, request_label)
+
+
+def frame(text: str) -> bytes:
+    payload = text.encode("utf-8")
+    return f"{len(payload):04x}".encode("ascii") + payload
+
+
+class ScriptedServer:
+    """
+    Servidor de una respuesta fija por conexión: lee la petición enmarcada y envía
+    `reply` tal cual. Con reset=True, tras una pausa envía `tail` y corta la
+    conexión con RST (SO_LINGER a 0), como un servidor que muere a mitad de respuesta.
+    """
+
+    def __init__(self, reply: bytes, tail: bytes = b"", reset: bool = False):
+        self.reply = reply
+        self.tail = tail
+        self.reset = reset
+        self.requests = queue.Queue()
+        self.accepted = 0
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(16)
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock: socket.socket):
+        with sock:
+            try:
+                length = int(AdbClient._recv_exact(sock, 4), 16)
+                self.requests.put(AdbClient._recv_exact(sock, length).decode("utf-8"))
+                sock.sendall(self.reply)
+                if self.reset:
+                    time.sleep(0.1) # El cliente ya espera el resto de la respuesta
+                    sock.sendall(self.tail)
+                    time.sleep(0.05)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            except (AdbError, OSError):
+                pass # Socket del pool cerrado sin petición
+
+    def close(self):
+        self._server.close()
+
+
+class ParseDeviceListTest(unittest.TestCase):
+
+    def test_short_format(self):
+        devices = parse_device_list("emulator-5554\tdevice\n192.168.1.5:5555\toffline\n", long_format=False)
+        self.assertEqual([device.as_tuple() for device in devices],
+                         [("emulator-5554", "device"), ("192.168.1.5:5555", "offline")])
+
+    def test_long_format_details_and_extras(self):
+        line = "R58M123ABC device usb:1-1 product:beyond1 model:SM_G973F device:beyond1 transport_id:3 extra:x\n"
+        device = parse_device_list(line)[0]
+        self.assertEqual((device.serial, device.state, device.model, device.transport_id, device.usb),
+                         ("R58M123ABC", "device", "SM_G973F", "3", "1-1"))
+        self.assertEqual(device.extras, {"extra": "x"})
+
+    def test_state_with_spaces(self):
+        line = "0123456789 no permissions (user in plugdev group) usb:1-2 transport_id:7\n"
+        device = parse_device_list(line)[0]
+        self.assertEqual(device.state, "no permissions (user in plugdev group)")
+        self.assertEqual(device.transport_id, "7")
+
+    def test_blank_and_truncated_lines_are_ignored(self):
+        self.assertEqual(parse_device_list("\n   \nlonely\n"), [])
+
+    def test_request_label_drops_arguments(self):
+        self.assertEqual(request_label("host:connect:192.168.1.5:5555"), "host:connect")
+        self.assertEqual(request_label("host:devices-l"), "host:devices-l")
+        self.assertEqual(request_label("shell:getprop ro.product.model"), "shell")
+
+
+class ProtocolTest(unittest.TestCase):
+
+    def client_for(self, reply: bytes, tail: bytes = b"", reset: bool = False,
+                   **kwargs) -> tuple[AdbClient, ScriptedServer]:
+        server = ScriptedServer(reply, tail, reset)
+        self.addCleanup(server.close)
+        client = AdbClient(port=server.port, timeout=2.0, **kwargs)
+        self.addCleanup(client.close)
+        return client, server
+
+    def test_okay_with_length_prefixed_payload(self):
+        client, server = self.client_for(b"OKAY" + frame("emulator-5554\tdevice\n"))
+        self.assertEqual(client.query("host:devices"), "emulator-5554\tdevice\n")
+        self.assertEqual(server.requests.get(timeout=1), "host:devices")
+
+    def test_request_is_length_prefixed_in_bytes(self):
+        client, server = self.client_for(b"OKAY" + frame("ok"))
+        client.query("host:connect:dispositivo-ñ:5555")
+        self.assertEqual(server.requests.get(timeout=1), "host:connect:dispositivo-ñ:5555")
+
+    def test_fail_raises_with_server_message(self):
+        client, _ = self.client_for(b"FAIL" + frame("device 'xyz' not found"))
+        with self.assertRaisesRegex(AdbError, "device 'xyz' not found"):
+            client.query("host:transport:xyz")
+
+    def test_unexpected_status(self):
+        client, _ = self.client_for(b"WHAT")
+        with self.assertRaisesRegex(AdbError, "inesperada"):
+            client.query("host:version")
+
+    def test_invalid_length(self):
+        client, _ = self.client_for(b"OKAYzzzz")
+        with self.assertRaisesRegex(AdbError, "Longitud inválida"):
+            client.query("host:version")
+
+    def test_truncated_payload(self):
+        client, _ = self.client_for(b"OKAY0010short")
+        with self.assertRaises(AdbConnectionClosedError):
+            client.query("host:version")
+
+    def test_reset_mid_payload(self):
+        client, _ = self.client_for(b"OKAY0010", tail=b"short", reset=True)
+        with self.assertRaises(AdbServerUnavailableError):
+            client.query("host:devices")
+
+    def test_server_unavailable(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close() # Puerto libre sin nadie escuchando
+        with self.assertRaises(AdbServerUnavailableError):
+            AdbClient(port=port, timeout=1.0, pool_size=0).query("host:version")
+
+    def test_version_is_hex(self):
+        client, _ = self.client_for(b"OKAY" + frame("0029"))
+        self.assertEqual(client.version(), 41)
+
+    def test_observer_receives_label_and_outcome(self):
+        observed = []
+        client, _ = self.client_for(b"FAIL" + frame("device offline"),
+                                    observer=lambda *args: observed.append(args))
+        with self.assertRaises(AdbError):
+            client.query("host:connect:10.0.0.2:5555")
+        (label, seconds, ok), = observed
+        self.assertEqual((label, ok), ("host:connect", False))
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_wait_for_server_and_shutdown(self):
+        client, server = self.client_for(b"OKAY" + frame("0029"), pool_size=0)
+        self.assertTrue(client.is_port_open())
+        self.assertTrue(client.wait_for_server(timeout=1.0))
+        self.assertFalse(client.wait_for_shutdown(timeout=0.1))
+        server.close()
+        self.assertTrue(client.wait_for_shutdown(timeout=1.0))
+        started = time.monotonic()
+        self.assertFalse(client.wait_for_server(timeout=0.2))
+        self.assertLess(time.monotonic() - started, 1.0) # Respeta el plazo sin esperas fijas
+
+    def test_pool_is_refilled_in_background(self):
+        client, server = self.client_for(b"OKAY" + frame("0029"), pool_size=2)
+        client.query("host:version")
+        deadline = time.monotonic() + 2
+        while len(client._idle) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(client._idle), 2)
+        accepted = server.accepted
+        client.query("host:version") # Usa un socket ya conectado del pool
+        self.assertEqual(server.accepted, accepted)
+
+
+class DeviceTrackerTest(unittest.TestCase):
+
+    def test_snapshots_become_events(self):
+        snapshots = ["A device usb:1 transport_id:1\n",
+                     "A device usb:1 transport_id:1\nB offline transport_id:2\n",
+                     "B device transport_id:2\n"]
+        server = ScriptedServer(b"OKAY" + b"".join(frame(text) for text in snapshots))
+        self.addCleanup(server.close)
+        tracker = DeviceTracker(AdbClient(port=server.port, timeout=2.0, pool_size=0), reconnect_delay=5.0)
+        events = queue.Queue()
+        tracker.subscribe(events.put)
+        tracker.start()
+        self.addCleanup(tracker.stop)
+
+        self.assertTrue(tracker.wait_ready(2))
+        self.assertEqual(server.requests.get(timeout=1), "host:track-devices-l")
+        received = [events.get(timeout=2) for _ in range(5)]
+        self.assertEqual([(event.kind, event.device.serial, event.previous_state) for event in received],
+                         [("added", "A", None), ("added", "B", None),
+                          ("state_changed", "B", "offline"), ("removed", "A", "device"),
+                          ("removed", "B", "device")]) # El servidor cerró el stream
+        self.assertEqual(tracker.devices(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de CommandRunner: nombres agregables, registro de llamadas y desglose de tiempos
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_runner import NO_PHASE, CommandRunner, command_name, format_timings # noqa: E402
+from mirror_events import LogContext # noqa: E402
+
+
+class CommandNameTest(unittest.TestCase):
+
+    def test_adb_subcommands(self):
+        self.assertEqual(command_name(["adb", "-s", "emulator-5554", "shell", "getprop", "ro.x"]), "adb shell getprop")
+        self.assertEqual(command_name(["/usr/bin/adb", "connect", "10.0.0.2:5555"]), "adb connect")
+        self.assertEqual(command_name(["adb.exe", "-d", "devices", "-l"]), "adb devices")
+        self.assertEqual(command_name(["adb", "-P", "5038"]), "adb")
+
+    def test_scrcpy_modes(self):
+        self.assertEqual(command_name(["scrcpy", "-s", "A", "--list-encoders", "--list-displays"]),
+                         "scrcpy --list-encoders --list-displays")
+        self.assertEqual(command_name(["scrcpy", "--max-size", "1024"]), "scrcpy")
+        self.assertEqual(command_name([]), "?")
+
+
+class CommandRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = LogContext()
+        self.observed = []
+        self.runner = CommandRunner(self.context, observer=self.observed.append)
+
+    def python(self, code: str) -> list:
+        return [sys.executable, "-c", code]
+
+    def test_run_records_phase_serial_and_output(self):
+        with self.context("connect", "A"):
+            result = self.runner.run(self.python("print('hola')"), capture_output=True, text=True)
+        self.assertEqual(result.stdout, "hola\n")
+        record, = self.runner.records()
+        self.assertEqual((record.phase, record.serial, record.returncode, record.output_size),
+                         ("connect", "A", 0, 5))
+        self.assertFalse(record.failed)
+        self.assertEqual(self.observed, [record])
+
+    def test_explicit_phase_wins_over_the_context(self):
+        with self.context("connect", "A"):
+            self.runner.run(self.python("pass"), phase="deps", serial="B")
+        record, = self.runner.records()
+        self.assertEqual((record.phase, record.serial), ("deps", "B"))
+
+    def test_failures_are_recorded_and_reraised(self):
+        self.runner.run(self.python("raise SystemExit(2)"))
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.runner.run(self.python("import time; time.sleep(5)"), timeout=0.2)
+        with self.assertRaises(FileNotFoundError):
+            self.runner.run(["programa-que-no-existe"])
+        exited, timed_out, missing = self.runner.records()
+        self.assertEqual(exited.returncode, 2)
+        self.assertTrue(timed_out.timed_out)
+        self.assertTrue(missing.error.startswith("FileNotFoundError"))
+        self.assertTrue(all(record.failed for record in (exited, timed_out, missing)))
+
+    def test_popen_records_the_spawn(self):
+        process = self.runner.popen(self.python("pass"))
+        process.wait()
+        record, = self.runner.records()
+        self.assertEqual((record.kind, record.returncode), ("spawn", None))
+        self.assertFalse(record.failed)
+
+    def test_summary_and_report(self):
+        with self.context("launch"):
+            self.runner.record("host:devices-l", 0.25, kind="adb-server")
+            self.runner.record("host:devices-l", 0.75, ok=False, kind="adb-server")
+        self.runner.record("adb connect", 0.5)
+        summary = self.runner.summary(top=2)
+        self.assertEqual((summary["calls"], summary["seconds"], summary["failures"]), (3, 1.5, 1))
+        self.assertEqual([row["name"] for row in summary["phases"]], ["launch", NO_PHASE])
+        devices = summary["commands"][0]
+        self.assertEqual((devices["name"], devices["calls"], devices["avg"], devices["max"]),
+                         ("host:devices-l", 2, 0.5, 0.75))
+        self.assertEqual([record["duration"] for record in summary["slowest"]], [0.75, 0.5])
+
+        report = format_timings(summary)
+        self.assertTrue(report.startswith("⏱️  3 llamadas externas · 1.50s en total · 1 fallidas"))
+        self.assertIn("0.750s  host:devices-l [launch] · código 1", report)
+
+    def test_empty_report_and_record_limit(self):
+        self.assertEqual(format_timings(self.runner.summary()), "⏱️  No se registró ninguna llamada externa.")
+        runner = CommandRunner(max_records=2)
+        for index in range(3):
+            runner.record(f"op{index}", 0.1)
+        self.assertEqual([record.name for record in runner.records()], ["op1", "op2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la caché de dependencias: versiones, capacidades de scrcpy y sondeo
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dependency_cache import (JsonCache, parse_adb_version, parse_scrcpy_version, probe_binary, # noqa: E402
+                              scrcpy_capabilities)
+
+
+class VersionParsingTest(unittest.TestCase):
+
+    def test_adb_version(self):
+        output = "Android Debug Bridge version 1.0.41\nVersion 34.0.5-10900879\n"
+        self.assertEqual(parse_adb_version(output), "1.0.41")
+        self.assertIsNone(parse_adb_version("adb: command not found"))
+
+    def test_scrcpy_version(self):
+        self.assertEqual(parse_scrcpy_version("scrcpy 2.4 <https://github.com/Genymobile/scrcpy>"), (2, 4))
+        self.assertEqual(parse_scrcpy_version("scrcpy v1.25"), None)
+        self.assertIsNone(parse_scrcpy_version("basura"))
+
+
+class CapabilitiesTest(unittest.TestCase):
+
+    def test_capabilities_follow_the_version(self):
+        old = scrcpy_capabilities((1, 25))
+        self.assertTrue(old["list_displays"])
+        self.assertFalse(old["audio"])
+        self.assertFalse(old["no_playback"])
+        recent = scrcpy_capabilities((2, 3))
+        self.assertTrue(recent["audio"] and recent["no_playback"] and recent["no_window"])
+
+    def test_unknown_version_is_not_all_false(self):
+        # Sin versión no se desactivan opciones: quien consulta asume un scrcpy actual
+        self.assertIsNone(scrcpy_capabilities(None))
+
+
+class JsonCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_round_trip_between_instances(self):
+        JsonCache("deps.json", self.tmp.name).set("adb|x", {"version": "1.0.41"})
+        self.assertEqual(JsonCache("deps.json", self.tmp.name).get("adb|x"), {"version": "1.0.41"})
+
+    def test_corrupt_file_is_ignored(self):
+        with open(os.path.join(self.tmp.name, "deps.json"), "w", encoding="utf-8") as f:
+            f.write("{no es json")
+        self.assertIsNone(JsonCache("deps.json", self.tmp.name).get("adb|x"))
+
+
+class ProbeBinaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bin_dir = os.path.join(self.tmp.name, "bin")
+        os.makedirs(self.bin_dir)
+        patcher = mock.patch.dict(os.environ, {"PATH": self.bin_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_binary(self, name, output):
+        path = os.path.join(self.bin_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"#!/bin/sh\necho '{output}'\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    @unittest.skipIf(os.name == 'nt', "usa un script de shell como ejecutable")
+    def test_probe_is_cached_until_the_binary_changes(self):
+        path = self.fake_binary("scrcpy", "scrcpy 2.4 <https://github.com/Genymobile/scrcpy>")
+        cache = JsonCache("deps.json", self.tmp.name)
+        first = probe_binary("scrcpy", ["--version"], cache)
+        self.assertEqual((first["found"], first["cached"], first["version"]), (True, False, [2, 4]))
+        self.assertTrue(first["capabilities"]["audio"])
+        self.assertTrue(probe_binary("scrcpy", ["--version"], cache)["cached"])
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("# binario actualizado\n")
+        self.assertFalse(probe_binary("scrcpy", ["--version"], cache)["cached"])
+
+    @unittest.skipIf(os.name == 'nt', "usa un script de shell como ejecutable")
+    def test_unparsable_version_keeps_capabilities_unknown(self):
+        self.fake_binary("scrcpy", "scrcpy (compilación local)")
+        info = probe_binary("scrcpy", ["--version"])
+        self.assertIsNone(info["version"])
+        self.assertIsNone(info["capabilities"])
+
+    def test_missing_binary(self):
+        self.assertEqual(probe_binary("adb", ["version"])["error"], "not_found")
+
+
+if __name__ == "__main__":
+    unittest.main()
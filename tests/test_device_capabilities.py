@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las capacidades por dispositivo: análisis de codificadores y pantallas,
+elección del códec y caché del sondeo
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dependency_cache import JsonCache # noqa: E402
+from device_capabilities import (DeviceCapabilityProbe, parse_display_list, parse_encoder_list, # noqa: E402
+                                 select_audio_codec, select_video_encoder)
+
+
+ENCODER_LIST = """\
+[server] INFO: List of video encoders:
+    --video-codec=h264 --video-encoder=c2.qti.avc.encoder          (hw) [vendor]
+    --video-codec=h264 --video-encoder=c2.android.avc.encoder      (sw)
+    --video-codec=h265 --video-encoder=OMX.qcom.video.encoder.hevc (hw) (alias for c2.qti.hevc.encoder)
+    --video-codec=h265 --video-encoder=c2.qti.hevc.encoder         (hw) [vendor]
+    --video-codec=av1 --video-encoder=c2.android.av1.encoder       (sw)
+[server] INFO: List of audio encoders:
+    --audio-codec=opus --audio-encoder='c2.android.opus.encoder'   (sw)
+    --audio-codec=aac --audio-encoder=c2.android.aac.encoder       (sw)
+[server] INFO: List of displays:
+    --display-id=0    (1080x2400)
+    --display-id=2
+"""
+
+
+class ParsingTest(unittest.TestCase):
+
+    def test_encoders(self):
+        encoders = parse_encoder_list(ENCODER_LIST)
+        video = [(enc["codec"], enc["name"], enc["hardware"], enc["alias"]) for enc in encoders["video"]]
+        self.assertEqual(video, [
+            ("h264", "c2.qti.avc.encoder", True, False),
+            ("h264", "c2.android.avc.encoder", False, False),
+            ("h265", "OMX.qcom.video.encoder.hevc", True, True),
+            ("h265", "c2.qti.hevc.encoder", True, False),
+            ("av1", "c2.android.av1.encoder", False, False),
+        ])
+        self.assertEqual([enc["name"] for enc in encoders["audio"]],
+                         ["c2.android.opus.encoder", "c2.android.aac.encoder"])
+
+    def test_old_scrcpy_without_hw_flags_uses_name_prefixes(self):
+        encoders = parse_encoder_list("--video-codec=h264 --video-encoder=OMX.google.h264.encoder\n"
+                                      "--video-codec=h264 --video-encoder=OMX.Exynos.AVC.Encoder\n")
+        self.assertEqual([enc["hardware"] for enc in encoders["video"]], [False, True])
+
+    def test_displays(self):
+        self.assertEqual(parse_display_list(ENCODER_LIST),
+                         [{"id": 0, "size": [1080, 2400]}, {"id": 2, "size": None}])
+
+
+class SelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.encoders = parse_encoder_list(ENCODER_LIST)
+
+    def test_best_hardware_codec_without_alias(self):
+        # AV1 sólo existe por software: se elige H.265 por hardware y no su alias
+        encoder = select_video_encoder(self.encoders["video"])
+        self.assertEqual((encoder["codec"], encoder["name"]), ("h265", "c2.qti.hevc.encoder"))
+
+    def test_preference_order_and_no_match(self):
+        self.assertEqual(select_video_encoder(self.encoders["video"], ("h264",))["name"], "c2.qti.avc.encoder")
+        self.assertIsNone(select_video_encoder(self.encoders["video"], ("av1",)))
+        self.assertIsNone(select_video_encoder([]))
+
+    def test_audio_codec(self):
+        self.assertEqual(select_audio_codec(self.encoders["audio"]), "opus")
+        self.assertEqual(select_audio_codec(self.encoders["audio"], ("flac", "aac")), "aac")
+        self.assertIsNone(select_audio_codec([]))
+
+
+@unittest.skipIf(os.name == 'nt', "usa un script de shell como ejecutable")
+class ProbeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calls_file = os.path.join(self.tmp.name, "calls")
+        self.listing = os.path.join(self.tmp.name, "listing.txt")
+        with open(self.listing, "w", encoding="utf-8") as f:
+            f.write(ENCODER_LIST)
+        self.scrcpy = os.path.join(self.tmp.name, "scrcpy")
+        with open(self.scrcpy, "w", encoding="utf-8") as f:
+            f.write(f"#!/bin/sh\necho \"$@\" >> '{self.calls_file}'\ncat '{self.listing}'\n")
+        os.chmod(self.scrcpy, os.stat(self.scrcpy).st_mode | stat.S_IEXEC)
+        self.fingerprint = "google/panther/14"
+
+    def calls(self) -> int:
+        if not os.path.exists(self.calls_file):
+            return 0
+        with open(self.calls_file, encoding="utf-8") as f:
+            return len(f.readlines())
+
+    def new_probe(self) -> DeviceCapabilityProbe:
+        return DeviceCapabilityProbe(lambda serial: self.fingerprint, JsonCache("caps.json", self.tmp.name),
+                                     scrcpy_path=self.scrcpy)
+
+    def test_probe_once_then_memory_then_disk(self):
+        probe = self.new_probe()
+        first = probe.get("SERIAL", "2.4")
+        self.assertFalse(first["cached"])
+        self.assertEqual(first["fingerprint"], self.fingerprint)
+        self.assertEqual(len(first["video_encoders"]), 5)
+        self.assertTrue(probe.get("SERIAL", "2.4")["cached"])
+        self.assertTrue(self.new_probe().get("SERIAL", "2.4")["cached"]) # Otro proceso, misma caché en disco
+        self.assertEqual(self.calls(), 1)
+
+    def test_new_build_or_force_probes_again(self):
+        self.new_probe().get("SERIAL", "2.4")
+        self.fingerprint = "google/panther/15"
+        self.assertFalse(self.new_probe().get("SERIAL", "2.4")["cached"])
+        self.assertFalse(self.new_probe().get("SERIAL", "2.4", force=True)["cached"])
+        self.assertEqual(self.calls(), 3)
+
+    def test_output_without_encoders_is_a_failure(self):
+        with open(self.listing, "w", encoding="utf-8") as f:
+            f.write("ERROR: Could not find any ADB device\n")
+        self.assertIsNone(self.new_probe().get("SERIAL"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de TaskRunner: unión de peticiones, cancelación, plazos y número de hilos
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui_tasks import TaskCancelledError, TaskRunner, TaskTimeoutError # noqa: E402
+
+
+class Blocker:
+    """Función de tarea que se bloquea hasta release() y cuenta sus ejecuciones."""
+
+    def __init__(self, result="ok"):
+        self.result = result
+        self.calls = 0
+        self.started = threading.Event()
+        self._release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self._release.wait(5)
+        return self.result
+
+    def release(self):
+        self._release.set()
+
+
+class TaskRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = TaskRunner(max_workers=3)
+        self.addCleanup(self.runner.shutdown)
+        self.events = queue.Queue()
+
+    def callbacks(self, tag):
+        return {"on_done": lambda result: self.events.put((tag, "done", result)),
+                "on_error": lambda error: self.events.put((tag, "error", error))}
+
+    def wait_returned(self, key, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.runner._in_flight.get(key) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_identical_requests_are_coalesced(self):
+        work = Blocker("dispositivos")
+        first = self.runner.submit(work, key="scan", **self.callbacks("a"))
+        second = self.runner.submit(work, key="scan", **self.callbacks("b"))
+        self.assertIs(first, second)
+        work.release()
+        results = sorted([self.events.get(timeout=2), self.events.get(timeout=2)])
+        self.assertEqual(results, [("a", "done", "dispositivos"), ("b", "done", "dispositivos")])
+        self.assertEqual(work.calls, 1)
+        self.assertEqual(self.runner.stats["coalesced"], 1)
+
+    def test_different_keys_run_separately(self):
+        work = Blocker()
+        work.release()
+        self.runner.submit(work, key="a", **self.callbacks("a"))
+        self.runner.submit(work, key="b", **self.callbacks("b"))
+        self.events.get(timeout=2), self.events.get(timeout=2)
+        self.assertEqual(work.calls, 2)
+
+    def test_cancel_delivers_error_and_discards_result(self):
+        work = Blocker()
+        handle = self.runner.submit(work, key="connect", **self.callbacks("a"))
+        work.started.wait(2)
+        self.assertTrue(self.runner.cancel("connect"))
+        tag, kind, error = self.events.get(timeout=2)
+        self.assertEqual(kind, "error")
+        self.assertIsInstance(error, TaskCancelledError)
+        self.assertTrue(handle.cancel_event.is_set())
+        work.release()
+        self.wait_returned("connect")
+        self.assertTrue(self.events.empty())
+        self.assertEqual(self.runner.stats["cancelled"], 1)
+
+    def test_timeout_keeps_key_reserved_until_the_worker_returns(self):
+        work = Blocker()
+        self.runner.submit(work, key="scan", timeout=0.1, **self.callbacks("a"))
+        tag, kind, error = self.events.get(timeout=2)
+        self.assertIsInstance(error, TaskTimeoutError)
+        self.assertEqual(self.runner.stats["timed_out"], 1)
+
+        # La función sigue en marcha: un nuevo clic espera en lugar de repetir la llamada
+        retry = self.runner.submit(work, key="scan", **self.callbacks("b"))
+        time.sleep(0.1)
+        self.assertEqual(work.calls, 1)
+        self.assertIs(self.runner.in_flight("scan"), retry)
+        work.release()
+        self.assertEqual(self.events.get(timeout=2), ("b", "done", "ok"))
+        self.assertEqual(work.calls, 2)
+
+    def test_timers_do_not_outlive_their_tasks(self):
+        def quick(value):
+            return value
+
+        for index in range(30):
+            self.runner.submit(quick, index, key=f"t{index}", timeout=60, **self.callbacks(index))
+        for _ in range(30):
+            self.events.get(timeout=2)
+        for index in range(30):
+            self.wait_returned(f"t{index}")
+        time.sleep(0.05)
+        timers = [thread for thread in threading.enumerate() if isinstance(thread, threading.Timer)]
+        self.assertEqual(timers, [])
+        workers = [thread for thread in threading.enumerate() if thread.name.startswith("gui-task")]
+        self.assertLessEqual(len(workers), 3)
+
+    def test_errors_reach_on_error(self):
+        def boom():
+            raise RuntimeError("adb no responde")
+
+        self.runner.submit(boom, key="boom", **self.callbacks("a"))
+        tag, kind, error = self.events.get(timeout=2)
+        self.assertEqual((kind, str(error)), ("error", "adb no responde"))
+        self.assertEqual(self.runner.stats["failed"], 1)
+
+    def test_dispatch_runs_callbacks(self):
+        dispatched = []
+        runner = TaskRunner(dispatch=lambda func, *args: dispatched.append(args) or func(*args), max_workers=1)
+        self.addCleanup(runner.shutdown)
+        runner.submit(lambda: 42, on_done=lambda result: self.events.put(result))
+        self.assertEqual(self.events.get(timeout=2), 42)
+        self.assertEqual(dispatched, [(42,)])
+
+    def test_submit_after_shutdown(self):
+        self.runner.shutdown()
+        self.assertIsNone(self.runner.submit(lambda: None, key="x"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los perfiles de lanzamiento: herencia con extends, perfiles de usuario
+y reglas de combinación con las opciones explícitas
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launch_profiles import BUILTIN_PROFILES, apply_profile, load_profiles # noqa: E402
+
+
+class LoadProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "profiles.json")
+
+    def load(self, data):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        return load_profiles(self.path)
+
+    def test_builtins_without_user_file(self):
+        profiles, warnings = load_profiles(os.path.join(self.tmp.name, "no-existe.json"))
+        self.assertEqual(set(profiles), set(BUILTIN_PROFILES))
+        self.assertEqual(warnings, [])
+        self.assertEqual(profiles["low-latency"]["codec_preference"], ["h264"])
+
+    def test_extends_chain(self):
+        profiles, warnings = self.load({"profiles": {
+            "base": {"extends": "low-latency", "bit_rate": "6M"},
+            "sala": {"extends": "base", "description": "Proyector", "max_size": 1920},
+        }})
+        self.assertEqual(warnings, [])
+        sala = profiles["sala"]
+        self.assertEqual((sala["max_size"], sala["bit_rate"], sala["video_buffer"]), (1920, "6M", 0))
+        self.assertEqual(sala["description"], "Proyector")
+        self.assertEqual(profiles["base"]["description"], "") # La descripción no se hereda
+        self.assertNotIn("extends", sala)
+
+    def test_user_profile_replaces_builtin(self):
+        profiles, _ = self.load({"profiles": {"battery-saver": {"max_fps": 15}}})
+        self.assertEqual(profiles["battery-saver"], {"max_fps": 15, "description": ""})
+
+    def test_invalid_profiles_are_skipped_with_warnings(self):
+        profiles, warnings = self.load({"profiles": {
+            "ciclo-a": {"extends": "ciclo-b"},
+            "ciclo-b": {"extends": "ciclo-a"},
+            "huerfano": {"extends": "no-existe"},
+            "texto": "no es un objeto",
+            "raro": {"max_fps": 30, "volumen": 11},
+        }})
+        self.assertNotIn("ciclo-a", profiles)
+        self.assertNotIn("huerfano", profiles)
+        self.assertNotIn("texto", profiles)
+        self.assertEqual(profiles["raro"], {"max_fps": 30, "description": ""})
+        text = "\n".join(warnings)
+        self.assertIn("Herencia circular de perfiles: ciclo-a -> ciclo-b -> ciclo-a", text)
+        self.assertIn("Perfil desconocido: no-existe", text)
+        self.assertIn("opciones desconocidas ignoradas (volumen)", text)
+
+    def test_unreadable_file_keeps_builtins(self):
+        for data in ("{roto", "[1, 2]", {"profiles": []}):
+            profiles, warnings = self.load(data)
+            self.assertEqual(set(profiles), set(BUILTIN_PROFILES))
+            self.assertEqual(len(warnings), 1)
+            self.assertTrue(warnings[0].startswith("No se pudo leer"))
+
+
+class ApplyProfileTest(unittest.TestCase):
+
+    def test_explicit_options_override_the_profile(self):
+        profile = dict(BUILTIN_PROFILES["battery-saver"])
+        merged = apply_profile({"bit_rate": "4M", "max_size": None, "turn_screen_off": False,
+                                "serial": "abc"}, profile)
+        self.assertEqual(merged["bit_rate"], "4M")
+        self.assertEqual(merged["max_size"], 1024) # None no anula el perfil
+        self.assertTrue(merged["turn_screen_off"]) # Una casilla sin marcar tampoco
+        self.assertEqual(merged["serial"], "abc")
+        self.assertNotIn("description", merged)
+
+    def test_zero_is_an_explicit_value(self):
+        merged = apply_profile({"video_buffer": 0, "bit_rate": ""}, BUILTIN_PROFILES["low-bandwidth"])
+        self.assertEqual((merged["video_buffer"], merged["bit_rate"]), (0, "2M"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del registro de métricas y de su publicación por HTTP en formato Prometheus
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import unittest
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics_exporter import CONTENT_TYPE, MetricsRegistry, MetricsServer # noqa: E402
+
+
+class MetricsServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.server = MetricsServer(self.registry, port=0)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def scrape(self, path="/metrics") -> tuple[str, list]:
+        host, port = self.server.address
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=2) as response:
+            self.assertEqual(response.headers["Content-Type"], CONTENT_TYPE)
+            body = response.read().decode("utf-8")
+        return body, body.splitlines()
+
+    def test_counter_and_gauge_with_help_and_type(self):
+        requests = self.registry.counter("adb_requests_total", "Peticiones al servidor ADB", ("service",))
+        requests.inc(service="host:devices")
+        requests.inc(2, service="host:devices")
+        sessions = self.registry.gauge("mirror_sessions", "Sesiones activas")
+        sessions.set(3)
+        sessions.dec()
+
+        body, lines = self.scrape()
+        self.assertIn("# HELP adb_requests_total Peticiones al servidor ADB", lines)
+        self.assertIn("# TYPE adb_requests_total counter", lines)
+        self.assertIn('adb_requests_total{service="host:devices"} 3', lines)
+        self.assertIn("# TYPE mirror_sessions gauge", lines)
+        self.assertIn("mirror_sessions 2", lines)
+        self.assertTrue(body.endswith("\n"))
+
+    def test_label_values_are_escaped(self):
+        failures = self.registry.counter("failures_total", "Fallos", ("message",))
+        failures.inc(message='dijo "no"\\ya\nfin')
+        _, lines = self.scrape()
+        self.assertIn('failures_total{message="dijo \\"no\\"\\\\ya\\nfin"} 1', lines)
+
+    def test_histogram_buckets_sum_and_count(self):
+        latency = self.registry.histogram("adb_request_seconds", "Latencia", ("service",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, service="shell")
+        _, lines = self.scrape()
+        self.assertIn("# TYPE adb_request_seconds histogram", lines)
+        self.assertIn('adb_request_seconds_bucket{service="shell",le="0.1"} 2', lines)
+        self.assertIn('adb_request_seconds_bucket{service="shell",le="1"} 3', lines)
+        self.assertIn('adb_request_seconds_bucket{service="shell",le="+Inf"} 4', lines)
+        self.assertIn('adb_request_seconds_sum{service="shell"} 3.65', lines)
+        self.assertIn('adb_request_seconds_count{service="shell"} 4', lines)
+
+    def test_collectors_are_read_on_scrape(self):
+        fps = {"emulator-5554": 58}
+        self.registry.add_collector(lambda: [("mirror_fps", "gauge", "FPS por dispositivo",
+                                              [({"serial": serial}, value) for serial, value in fps.items()])])
+        self.assertIn('mirror_fps{serial="emulator-5554"} 58', self.scrape()[1])
+        fps["emulator-5554"] = 30
+        self.assertIn('mirror_fps{serial="emulator-5554"} 30', self.scrape()[1])
+
+    def test_other_paths_return_404(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.scrape("/favicon.ico")
+        self.assertEqual(raised.exception.code, 404)
+
+    def test_wrong_labels_are_rejected(self):
+        counter = self.registry.counter("x_total", "X", ("a",))
+        with self.assertRaises(ValueError):
+            counter.inc(b="1")
+        with self.assertRaises(ValueError):
+            counter.inc(-1, a="1")
+
+
+if __name__ == "__main__":
+    unittest.main()
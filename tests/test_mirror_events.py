@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los eventos de log: niveles, buffer circular, archivo JSON-lines y contexto
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mirror_events import (EventBus, EventRingBuffer, JsonLinesSink, LogContext, LogEvent, # noqa: E402
+                           StringCallbackAdapter, infer_level, log_phase)
+
+
+class LevelTest(unittest.TestCase):
+
+    def test_infer_level(self):
+        self.assertEqual(infer_level("❌ No se pudo conectar"), "error")
+        self.assertEqual(infer_level("  ERROR: adb murió"), "error")
+        self.assertEqual(infer_level("⚠️  Versión antigua"), "warning")
+        self.assertEqual(infer_level("DEBUG: socket reutilizado"), "debug")
+        self.assertEqual(infer_level("✅ Conectado"), "info")
+
+    def test_adapter_filters_by_level(self):
+        received = []
+        adapter = StringCallbackAdapter(received.append, min_level="warning")
+        adapter(LogEvent("detalle", level="debug"))
+        adapter(LogEvent("cuidado", level="warning"))
+        self.assertEqual(received, ["cuidado"])
+
+    def test_broken_subscriber_does_not_stop_the_others(self):
+        bus = EventBus()
+        received = []
+
+        def broken(event):
+            raise RuntimeError("fallo")
+
+        bus.subscribe(broken)
+        unsubscribe = bus.subscribe(received.append)
+        bus.publish(LogEvent("uno"))
+        unsubscribe()
+        bus.publish(LogEvent("dos"))
+        self.assertEqual([event.message for event in received], ["uno"])
+
+
+class EventRingBufferTest(unittest.TestCase):
+
+    def test_global_and_per_device_limits(self):
+        buffer = EventRingBuffer(max_events=5, max_events_per_device=2)
+        for index in range(4):
+            buffer(LogEvent(f"a{index}", serial="A"))
+        for index in range(3):
+            buffer(LogEvent(f"b{index}", serial="B"))
+        self.assertEqual([event.message for event in buffer.query()], ["a2", "a3", "b0", "b1", "b2"])
+        # El índice por dispositivo conserva lo suyo aunque el global ya lo haya descartado
+        self.assertEqual([event.message for event in buffer.query(serial="A")], ["a2", "a3"])
+        self.assertEqual(buffer.serials(), ["A", "B"])
+        self.assertEqual(buffer.query(serial="C"), [])
+
+    def test_filters_and_limit(self):
+        buffer = EventRingBuffer()
+        buffer(LogEvent("conectando", phase="connect"))
+        buffer(LogEvent("aviso", level="warning", phase="connect"))
+        buffer(LogEvent("fallo", level="error", phase="launch"))
+        self.assertEqual([event.message for event in buffer.query(min_level="warning")], ["aviso", "fallo"])
+        self.assertEqual([event.message for event in buffer.query(phase="connect", limit=1)], ["aviso"])
+
+
+class JsonLinesSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "logs", "events.jsonl")
+
+    def read_messages(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line)["message"] for line in f]
+
+    def test_lines_are_json_without_empty_extra(self):
+        sink = JsonLinesSink(self.path)
+        sink(LogEvent("ñandú", serial="A", phase="connect", duration=0.5))
+        sink(LogEvent("con extra", extra={"port": 5555}))
+        sink.close()
+        sink(LogEvent("tras cerrar")) # Se ignora sin error
+        with open(self.path, encoding="utf-8") as f:
+            first, second = (json.loads(line) for line in f)
+        self.assertEqual((first["message"], first["serial"], first["duration"]), ("ñandú", "A", 0.5))
+        self.assertNotIn("extra", first)
+        self.assertEqual(second["extra"], {"port": 5555})
+
+    def test_rotation_keeps_backup_count(self):
+        line_size = len(json.dumps(LogEvent("m0", timestamp=0.0).to_dict()) + "\n")
+        sink = JsonLinesSink(self.path, max_bytes=line_size * 2, backup_count=2)
+        for index in range(7):
+            sink(LogEvent(f"m{index}", timestamp=0.0))
+        sink.close()
+        self.assertEqual(self.read_messages(self.path), ["m6"])
+        self.assertEqual(self.read_messages(self.path + ".1"), ["m4", "m5"])
+        self.assertEqual(self.read_messages(self.path + ".2"), ["m2", "m3"])
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_rotation_without_backups(self):
+        sink = JsonLinesSink(self.path, max_bytes=10, backup_count=0)
+        sink(LogEvent("uno"))
+        sink(LogEvent("dos"))
+        sink.close()
+        self.assertEqual(self.read_messages(self.path), ["dos"])
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["events.jsonl"])
+
+
+class LogContextTest(unittest.TestCase):
+
+    def test_nested_scopes_inherit_the_serial(self):
+        context = LogContext()
+        with context("connect", "A"):
+            with context("launch"):
+                phase, serial, _ = context.current()
+                self.assertEqual((phase, serial), ("launch", "A"))
+            self.assertEqual(context.current()[0], "connect")
+        self.assertEqual(context.current(), (None, None, None))
+
+    def test_log_phase_reads_the_serial_argument(self):
+        class Mirror:
+            def __init__(self):
+                self.log_context = LogContext()
+
+            @log_phase("launch", serial_arg="serial")
+            def launch(self, options=None, serial=None):
+                return self.log_context.current()[:2]
+
+        self.assertEqual(Mirror().launch(serial="B"), ("launch", "B"))
+        self.assertEqual(Mirror().launch(), ("launch", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
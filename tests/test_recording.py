@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la grabación segmentada: bitrate, retención, comprobación del disco
+y rotación de segmentos con un lanzador simulado
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import recording # noqa: E402
+from recording import (SegmentedRecorder, check_disk, enforce_retention, parse_bit_rate, # noqa: E402
+                       segment_prefix)
+
+
+class FakeSession:
+    """Sesión scrcpy simulada que escribe `size` bytes en su segmento al arrancar."""
+
+    def __init__(self, path, size):
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        self.running = True
+        self.returncode = None
+
+    def is_running(self):
+        return self.running
+
+    def stop(self):
+        self.running = False
+        self.returncode = 0
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_parse_bit_rate(self):
+        self.assertEqual(parse_bit_rate("8M"), 8_000_000)
+        self.assertEqual(parse_bit_rate("512k"), 512_000)
+        self.assertEqual(parse_bit_rate(" 1.5M "), 1_500_000)
+        self.assertEqual(parse_bit_rate(2_000_000), 2_000_000)
+        for value in (None, "", "8G", "rápido", "-1M"):
+            self.assertIsNone(parse_bit_rate(value), value)
+
+    def test_segment_prefix(self):
+        self.assertEqual(segment_prefix("192.168.1.5:5555"), "192.168.1.5_5555")
+        self.assertEqual(segment_prefix("adb-R58M._adb-tls-connect._tcp"), "adb-R58M._adb-tls-connect._tcp")
+        self.assertEqual(segment_prefix(None), "device")
+
+
+class RetentionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def segment(self, name, size, age):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_oldest_segments_of_the_device_go_first(self):
+        oldest = self.segment("A_1.mkv", 100, age=30)
+        kept = self.segment("A_2.mkv", 100, age=20)
+        newest = self.segment("A_3.mkv", 100, age=10)
+        other = self.segment("B_1.mkv", 500, age=40)
+        notes = self.segment("A_notas.txt", 500, age=50)
+        removed = enforce_retention(self.tmp.name, 250, prefix="A_")
+        self.assertEqual(removed, [oldest])
+        for path in (kept, newest, other, notes):
+            self.assertTrue(os.path.exists(path), path)
+
+    def test_segments_being_written_are_kept(self):
+        oldest = self.segment("A_1.mkv", 100, age=30)
+        middle = self.segment("A_2.mp4", 100, age=20)
+        self.segment("A_3.mkv", 100, age=10)
+        self.assertEqual(enforce_retention(self.tmp.name, 200, "A_", keep={oldest}), [middle])
+
+    def test_missing_directory(self):
+        self.assertEqual(enforce_retention(os.path.join(self.tmp.name, "no-existe"), 0), [])
+
+
+class CheckDiskTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_not_enough_free_space(self):
+        result = check_disk(self.tmp.name, min_free_bytes=1024 ** 6)
+        self.assertFalse(result["ok"])
+        self.assertIn("Espacio libre insuficiente", result["reason"])
+
+    def test_write_probe_is_measured_and_removed(self):
+        result = check_disk(os.path.join(self.tmp.name, "rec"), min_free_bytes=0, bit_rate=8,
+                            test_bytes=1024 ** 2)
+        self.assertTrue(result["ok"])
+        self.assertGreater(result["write_bytes_per_s"], 0)
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "rec")), [])
+
+
+class SegmentedRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sessions = []
+        self.segment_size = 10
+        patcher = mock.patch.object(recording, "MONITOR_INTERVAL", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def launch(self, path, replace):
+        if replace:
+            for session in self.sessions:
+                session.stop()
+        session = FakeSession(path, self.segment_size)
+        self.sessions.append(session)
+        return session
+
+    def new_recorder(self, **kwargs) -> SegmentedRecorder:
+        options = dict(segment_seconds=0, segment_max_bytes=0, min_free_bytes=0, log_callback=lambda message: None)
+        options.update(kwargs)
+        recorder = SegmentedRecorder("192.168.1.5:5555", self.tmp.name, self.launch, **options)
+        self.addCleanup(recorder.stop)
+        return recorder
+
+    def test_rotation_keeps_the_previous_segment_until_the_new_one_runs(self):
+        recorder = self.new_recorder()
+        self.assertTrue(recorder.start())
+        first = recorder.current_path
+        self.assertTrue(os.path.basename(first).startswith("192.168.1.5_5555_"))
+        self.assertTrue(recorder.rotate())
+        self.assertNotEqual(recorder.current_path, first)
+        self.assertEqual([session.is_running() for session in self.sessions], [False, True])
+        self.assertIsNotNone(recorder.segments[0]["ended_at"])
+
+    def test_size_limit_rotates_and_retention_removes_old_segments(self):
+        recorder = self.new_recorder(segment_max_bytes=5, max_total_bytes=25)
+        recorder.start()
+        self.assertTrue(wait_until(lambda: recorder.removed_segments >= 2))
+        recorder.stop()
+        on_disk = [name for name in os.listdir(self.tmp.name) if name.endswith(".mkv")]
+        self.assertLessEqual(len(on_disk), 3)
+        self.assertIn(os.path.basename(recorder.current_path), on_disk)
+
+    def test_low_disk_stops_scrcpy(self):
+        recorder = self.new_recorder(min_free_bytes=1024 ** 6)
+        recorder.start()
+        self.assertTrue(wait_until(lambda: not recorder.is_active()))
+        self.assertFalse(self.sessions[-1].is_running())
+        self.assertIsNotNone(recorder.segments[-1]["ended_at"])
+
+    def test_unexpected_exit_opens_a_new_segment(self):
+        recorder = self.new_recorder()
+        recorder.start()
+        crashed = self.sessions[0]
+        crashed.running, crashed.returncode = False, 1
+        self.assertTrue(wait_until(lambda: recorder.restarts == 1))
+        self.assertTrue(wait_until(lambda: len(self.sessions) == 2))
+
+    def test_user_exit_ends_the_recording(self):
+        recorder = self.new_recorder(stop_on_user_exit=True)
+        recorder.start()
+        self.sessions[0].stop()
+        self.assertTrue(wait_until(lambda: not recorder.is_active()))
+        self.assertEqual(recorder.restarts, 0)
+
+    def test_failed_launch(self):
+        recorder = SegmentedRecorder("x", self.tmp.name, lambda path, replace: None, log_callback=lambda m: None)
+        self.assertFalse(recorder.start())
+        self.assertFalse(recorder.is_active())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de ScrcpySession con un proceso que imita la salida de scrcpy, de su
+buffer circular de salida y del registro de sesiones por dispositivo
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrcpy_session import LineRingBuffer, ScrcpySession, SessionManager # noqa: E402
+
+
+def fake_scrcpy(*lines: str, exit_code=None, stderr: str = "") -> list:
+    """Comando que imprime `lines` y sale con `exit_code` (o se queda en marcha si es None)."""
+    script = ["import sys, time"]
+    script += [f"print({line!r}, flush=True)" for line in lines]
+    if stderr:
+        script.append(f"print({stderr!r}, file=sys.stderr, flush=True)")
+    script.append("time.sleep(30)" if exit_code is None else f"sys.exit({exit_code})")
+    return [sys.executable, "-c", "\n".join(script)]
+
+
+class LineRingBufferTest(unittest.TestCase):
+
+    def test_keeps_the_last_lines(self):
+        buffer = LineRingBuffer(max_lines=3)
+        for index in range(5):
+            buffer.append(f"línea {index}")
+        self.assertEqual(buffer.tail(), ["línea 2", "línea 3", "línea 4"])
+        self.assertEqual(buffer.tail(2), ["línea 3", "línea 4"])
+        self.assertEqual(buffer.tail(0), [])
+        self.assertEqual((len(buffer), buffer.total_lines), (3, 5))
+
+
+class ScrcpySessionTest(unittest.TestCase):
+
+    def launch(self, command, **kwargs) -> ScrcpySession:
+        kwargs.setdefault("log_callback", lambda message: None)
+        session = ScrcpySession(command, serial="emulator-5554", **kwargs)
+        session.start()
+        self.addCleanup(session.stop)
+        return session
+
+    def wait_finished(self, session: ScrcpySession):
+        for reader in session._readers:
+            reader.join(10)
+        session.process.wait(10)
+
+    def test_ready_when_the_renderer_starts(self):
+        session = self.launch(fake_scrcpy("INFO: Device: Pixel 7", "INFO: Renderer: opengl",
+                                          "INFO: Texture: 1080x2400"))
+        self.assertTrue(session.wait_ready(5))
+        self.assertIsNotNone(session.time_to_ready)
+        self.assertTrue(session.is_running())
+        deadline = time.monotonic() + 2
+        while session.time_to_first_frame is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreaterEqual(session.time_to_first_frame, session.time_to_ready)
+
+    def test_early_exit_settles_without_waiting_for_the_timeout(self):
+        session = self.launch(fake_scrcpy("INFO: scrcpy 2.4", exit_code=1,
+                                          stderr="ERROR: Could not find any ADB device"))
+        started = time.monotonic()
+        self.assertFalse(session.wait_ready(10))
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(session.returncode, 1)
+        self.assertIn("ERROR: Could not find any ADB device", session.startup_output())
+
+    def test_no_ready_line_times_out(self):
+        session = self.launch(fake_scrcpy("INFO: scrcpy 2.4"))
+        self.assertFalse(session.wait_ready(0.3))
+        self.assertTrue(session.is_running())
+        session.stop()
+        self.assertFalse(session.is_running())
+
+    def test_output_is_drained_for_the_whole_session(self):
+        # Mucho más de lo que cabe en la tubería: sin lectura continua el proceso se bloquearía
+        script = ("import sys\nprint('INFO: Renderer: opengl', flush=True)\n"
+                  "for i in range(20000): print('WARN: ' + 'x' * 60 + str(i))\n")
+        session = self.launch([sys.executable, "-c", script], buffer_lines=100)
+        self.assertTrue(session.wait_ready(5) or session.returncode == 0)
+        self.wait_finished(session)
+        self.assertEqual(session.returncode, 0)
+        self.assertEqual(session.output.total_lines, 20001)
+        self.assertEqual(session.tail(1), ["WARN: " + "x" * 60 + "19999"])
+        self.assertEqual(len(session.tail(None)), 100)
+
+    def test_forwarded_lines_are_rate_limited(self):
+        logged = []
+        session = self.launch(fake_scrcpy(*[f"INFO: línea {index}" for index in range(50)], exit_code=0),
+                              log_callback=logged.append, log_rate=5)
+        self.wait_finished(session)
+        self.assertEqual(logged[0], "[scrcpy emulator-5554] INFO: línea 0")
+        self.assertLess(len(logged), 50)
+        self.assertEqual(session.output.total_lines, 50) # El buffer las guarda todas
+        self.assertGreater(session.suppressed_lines, 0)
+
+    def test_missing_executable(self):
+        session = ScrcpySession(["scrcpy-que-no-existe"], log_callback=lambda message: None)
+        with self.assertRaises(FileNotFoundError):
+            session.start()
+
+
+class SessionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.logs = []
+        self.manager = SessionManager(log_callback=self.logs.append)
+        self.addCleanup(self.manager.stop_all)
+
+    def test_sessions_are_keyed_by_serial(self):
+        first = self.manager.launch("A", fake_scrcpy("INFO: Renderer: opengl"))
+        second = self.manager.launch("B", fake_scrcpy("INFO: Renderer: opengl"))
+        usb = self.manager.launch(None, fake_scrcpy("INFO: Renderer: opengl"))
+        self.assertIs(self.manager.get("A"), first)
+        self.assertIs(self.manager.get(None), usb)
+        self.assertEqual(len(self.manager.running()), 3)
+        self.assertEqual([row["serial"] for row in self.manager.list_sessions()], ["A", "B", None])
+        self.manager.stop_all()
+        self.assertEqual(self.manager.running(), [])
+        self.assertEqual(second.state, "stopped")
+
+    def test_relaunch_replaces_the_previous_session(self):
+        previous = self.manager.launch("A", fake_scrcpy("INFO: Renderer: opengl"))
+        current = self.manager.launch("A", fake_scrcpy("INFO: Renderer: opengl"))
+        self.assertFalse(previous.is_running()) # Ningún proceso queda huérfano
+        self.assertIs(self.manager.get("A"), current)
+        self.assertTrue(any("Reemplazando la sesión en curso de A" in line for line in self.logs))
+
+    def test_failed_start_is_not_registered(self):
+        with self.assertRaises(FileNotFoundError):
+            self.manager.launch("A", ["scrcpy-que-no-existe"])
+        self.assertIsNone(self.manager.get("A"))
+
+    def test_exit_is_reported_and_pruned(self):
+        session = self.manager.launch("A", fake_scrcpy(exit_code=3))
+        session.wait_ready(5)
+        deadline = time.monotonic() + 2
+        while not self.logs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(session.state, "failed")
+        self.assertIn("⚠️  scrcpy (A) terminó con código 3.", self.logs)
+        self.assertEqual(self.manager.prune(), 1)
+        self.assertEqual(self.manager.sessions(), [])
+
+    def test_stop_and_remove(self):
+        self.assertFalse(self.manager.stop("A"))
+        session = self.manager.launch("A", fake_scrcpy("INFO: Renderer: opengl"))
+        self.assertTrue(self.manager.stop("A"))
+        self.assertEqual(session.state, "stopped")
+        self.assertIs(self.manager.remove("A"), session)
+        self.assertIsNone(self.manager.get("A"))
+
+
+if __name__ == "__main__":
+    unittest.main()
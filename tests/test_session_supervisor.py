@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del supervisor de sesiones: backoff con jitter, detección de caídas,
+recuperación y presupuesto de reintentos
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_supervisor import ReconnectPolicy, SessionSupervisor, backoff_delay # noqa: E402
+
+
+class FakeSession:
+    def __init__(self, state="running", returncode=None):
+        self.state = state
+        self.returncode = returncode
+        self.ended_at = None if state == "running" else time.monotonic()
+
+    def is_running(self):
+        return self.state == "running"
+
+    def stop(self):
+        self.state = "stopped"
+
+
+class BackoffTest(unittest.TestCase):
+
+    def test_exponential_and_capped_without_jitter(self):
+        policy = ReconnectPolicy(initial_delay=1.0, multiplier=2.0, max_delay=10.0, jitter=0.0)
+        self.assertEqual([backoff_delay(attempt, policy) for attempt in range(1, 7)],
+                         [1.0, 2.0, 4.0, 8.0, 10.0, 10.0])
+        self.assertEqual(backoff_delay(0, policy), 1.0)
+
+    def test_jitter_only_shortens_the_delay(self):
+        policy = ReconnectPolicy(initial_delay=4.0, jitter=0.5)
+        rng = random.Random(7)
+        delays = [backoff_delay(1, policy, rng) for _ in range(200)]
+        self.assertTrue(all(2.0 < delay <= 4.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 100)
+
+    def test_jitter_is_clamped(self):
+        policy = ReconnectPolicy(initial_delay=4.0, jitter=3.0)
+        self.assertGreaterEqual(backoff_delay(1, policy, random.Random(1)), 0.0)
+
+
+class SupervisorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.device = "device"
+        self.reconnect_results = []
+        self.relaunches = 0
+        self.incidents = []
+        self.policy = ReconnectPolicy(check_interval=0.01, state_interval=0.0, initial_delay=0.001,
+                                      max_delay=0.001, jitter=0.0, max_attempts=3)
+        self.supervisor = SessionSupervisor("10.0.0.2:5555", lambda: self.session, self.reconnect,
+                                            self.relaunch, device_state=lambda: self.device,
+                                            policy=self.policy, log_callback=lambda message: None,
+                                            on_incident=self.incidents.append)
+        self.addCleanup(self.supervisor.stop)
+
+    def reconnect(self):
+        return self.reconnect_results.pop(0) if self.reconnect_results else True
+
+    def relaunch(self):
+        self.relaunches += 1
+        self.session = FakeSession()
+        return True
+
+    def test_check(self):
+        self.assertIsNone(self.supervisor.check())
+        self.session = FakeSession("failed", returncode=2)
+        self.assertEqual(self.supervisor.check(), "scrcpy terminó con código 2")
+        self.session = FakeSession("exited", returncode=0)
+        self.assertEqual(self.supervisor.check(), "") # Ventana cerrada por el usuario
+        self.device = "offline"
+        self.assertEqual(self.supervisor.check(), "scrcpy terminó y el dispositivo está offline")
+        self.session = FakeSession("stopped")
+        self.assertIsNone(self.supervisor.check())
+        self.session = FakeSession()
+        self.assertEqual(self.supervisor.check(), "dispositivo offline en ADB")
+        self.session = None
+        self.assertEqual(self.supervisor.check(), "no hay sesión scrcpy")
+
+    def test_recover_after_failed_reconnects(self):
+        self.reconnect_results = [False, True]
+        self.assertTrue(self.supervisor.recover("prueba"))
+        incident = self.incidents[0]
+        self.assertEqual((incident.attempts, incident.recovered), (2, True))
+        self.assertIsNotNone(incident.downtime)
+        self.assertEqual(self.relaunches, 1)
+        self.assertEqual(self.supervisor.state, "watching")
+
+    def test_gives_up_after_max_attempts(self):
+        self.reconnect_results = [False] * 5
+        self.assertFalse(self.supervisor.recover("prueba"))
+        incident = self.incidents[0]
+        self.assertEqual((incident.attempts, incident.last_error), (3, "no se pudo reconectar por ADB"))
+        self.assertEqual(self.supervisor.state, "gave_up")
+
+    def test_budget_limits_attempts_across_incidents(self):
+        self.policy.budget = 4
+        self.reconnect_results = [False] * 10
+        self.supervisor.recover("primera")
+        self.assertFalse(self.supervisor.recover("segunda"))
+        second = self.incidents[1]
+        self.assertEqual(second.attempts, 1)
+        self.assertIn("presupuesto de reintentos agotado", second.last_error)
+
+    def test_running_session_is_stopped_before_recovering(self):
+        running = self.session
+        self.supervisor.recover("dispositivo desaparecido")
+        self.assertEqual(running.state, "stopped")
+
+    def test_supervision_loop_recovers_and_reports(self):
+        self.supervisor.start()
+        self.session = FakeSession("failed", returncode=1)
+        deadline = time.monotonic() + 2
+        while not self.incidents and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status = self.supervisor.status()
+        self.assertEqual((status["incident_count"], status["recovered_count"]), (1, 1))
+        self.assertIsNotNone(status["mttr_seconds"])
+        self.session.state = "exited"
+        deadline = time.monotonic() + 2
+        while self.supervisor.is_active() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.supervisor.state, "finished")
+
+
+if __name__ == "__main__":
+    unittest.main()
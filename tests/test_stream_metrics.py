@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del análisis de los informes --print-fps y de las instantáneas de StreamMetrics
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_metrics import FPS_PATTERN, STALL_SECONDS, StreamMetrics, format_metrics # noqa: E402
+
+
+class FpsPatternTest(unittest.TestCase):
+
+    def test_report_lines(self):
+        self.assertEqual(FPS_PATTERN.search("INFO: 58 fps").groups(), ("58", None))
+        self.assertEqual(FPS_PATTERN.search("INFO: 44 fps (+16 frames skipped)\n").groups(), ("44", "16"))
+        self.assertEqual(FPS_PATTERN.search("INFO: 30 fps (+1 frame skipped)").groups(), ("30", "1"))
+
+    def test_other_lines_mentioning_fps_are_ignored(self):
+        for line in ("INFO: Device: [Google] Pixel 7 (Android 14), max 120 fps",
+                     "WARN: Requested 90 fps not supported, using 60 fps",
+                     "[server] INFO: Using encoder at 60 fps",
+                     "INFO: 58 fps then something else"):
+            self.assertIsNone(FPS_PATTERN.search(line), line)
+
+
+class StreamMetricsTest(unittest.TestCase):
+
+    def test_parse_line_records_reports_only(self):
+        metrics = StreamMetrics("emulator-5554")
+        self.assertTrue(metrics.parse_line("INFO: 44 fps (+16 frames skipped)"))
+        self.assertFalse(metrics.parse_line("INFO: Renderer: opengl"))
+        self.assertFalse(metrics.parse_line("INFO: Device max 60 fps"))
+        self.assertEqual((metrics.reports, metrics.total_frames, metrics.total_skipped), (1, 44, 16))
+
+    def test_snapshot_statistics(self):
+        metrics = StreamMetrics("serial")
+        now = time.monotonic()
+        for offset, (fps, skipped) in enumerate([(60, 0), (50, 10), (40, 0)]):
+            metrics.record(fps, skipped, now=now + offset)
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["fps"], snapshot["min_fps"], snapshot["avg_fps"], snapshot["max_fps"]),
+                         (40, 40, 50.0, 60))
+        self.assertEqual(snapshot["skipped_window"], 10)
+        self.assertEqual(snapshot["skip_ratio"], round(10 / 160, 3))
+        self.assertEqual((snapshot["total_frames"], snapshot["reports"]), (150, 3))
+        self.assertFalse(snapshot["stalled"])
+
+    def test_window_evicts_old_samples(self):
+        metrics = StreamMetrics(window=10)
+        now = time.monotonic()
+        metrics.record(10, now=now - 30)
+        metrics.record(60, now=now)
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["min_fps"], snapshot["max_fps"]), (60, 60))
+        self.assertEqual(snapshot["total_frames"], 70) # Los totales no caducan
+
+    def test_stall_detection(self):
+        metrics = StreamMetrics()
+        metrics.record(60, now=time.monotonic() - STALL_SECONDS - 1)
+        self.assertTrue(metrics.snapshot()["stalled"])
+
+    def test_empty_snapshot_and_format(self):
+        snapshot = StreamMetrics("abc").snapshot()
+        self.assertIsNone(snapshot["fps"])
+        self.assertEqual(snapshot["skip_ratio"], 0.0)
+        self.assertIn("esperando informes de FPS", format_metrics(snapshot))
+
+    def test_format_metrics(self):
+        metrics = StreamMetrics("abc")
+        metrics.record(59, 3)
+        line = format_metrics(metrics.snapshot())
+        self.assertTrue(line.startswith("abc: 59 fps (min 59 / media 59.0 / máx 59) · 3 descartados · 00:00:"), line)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del pool de conexiones Wi-Fi: reutilización, reconexión perezosa,
+keep-alive y caducidad por inactividad
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi_pool import MAX_KEEPALIVE_FAILURES, WifiConnectionPool # noqa: E402
+
+
+class FakeAdb:
+    """Servidor ADB simulado: registra las llamadas y responde según su estado."""
+
+    def __init__(self):
+        self.calls = []
+        self.states = {}
+        self.keepalive_ok = True
+        self.connect_ok = True
+        self.busy = set()
+
+    def connect(self, host, port):
+        self.calls.append(("connect", f"{host}:{port}"))
+        if not self.connect_ok:
+            return False, f"failed to connect to {host}:{port}"
+        self.states[f"{host}:{port}"] = "device"
+        return True, f"connected to {host}:{port}"
+
+    def disconnect(self, serial):
+        self.calls.append(("disconnect", serial))
+        self.states.pop(serial, None)
+
+    def keepalive(self, serial):
+        self.calls.append(("keepalive", serial))
+        return self.keepalive_ok
+
+    def device_state(self, serial):
+        self.calls.append(("state", serial))
+        return self.states.get(serial)
+
+    def in_use(self, serial):
+        return serial in self.busy
+
+    def count(self, kind):
+        return sum(1 for call in self.calls if call[0] == kind)
+
+
+class WifiConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.adb = FakeAdb()
+        self.pool = self.new_pool()
+
+    def new_pool(self, **kwargs) -> WifiConnectionPool:
+        options = dict(keepalive_interval=0, idle_timeout=0, log_callback=lambda message: None)
+        options.update(kwargs)
+        pool = WifiConnectionPool(self.adb.connect, self.adb.disconnect, self.adb.keepalive,
+                                  self.adb.device_state, in_use=self.adb.in_use, **options)
+        self.addCleanup(pool.stop)
+        return pool
+
+    def test_hit_does_not_touch_the_adb_server(self):
+        self.assertEqual(self.pool.acquire("10.0.0.2", 5555), (True, "connected to 10.0.0.2:5555", False))
+        self.adb.calls.clear()
+        self.assertEqual(self.pool.acquire("10.0.0.2", 5555), (True, "already connected to 10.0.0.2:5555", True))
+        self.assertEqual(self.adb.calls, [])
+        self.assertEqual((self.pool.stats["hits"], self.pool.stats["misses"]), (1, 1))
+
+    def test_unverified_entry_is_checked_once(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        entry = self.pool.get("10.0.0.2:5555")
+        entry.last_verified -= 60
+        self.adb.calls.clear()
+        self.assertTrue(self.pool.acquire("10.0.0.2", 5555)[2])
+        self.assertEqual(self.adb.calls, [("state", "10.0.0.2:5555")])
+        self.adb.calls.clear()
+        self.pool.acquire("10.0.0.2", 5555) # Ya verificada: vuelve a ser un acierto inmediato
+        self.assertEqual(self.adb.calls, [])
+
+    def test_stale_entry_is_reconnected(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        self.pool.mark_stale("10.0.0.2:5555")
+        self.adb.states["10.0.0.2:5555"] = "offline"
+        self.adb.calls.clear()
+        connected, _, reused = self.pool.acquire("10.0.0.2", 5555)
+        self.assertTrue(connected)
+        self.assertFalse(reused)
+        # Un transporte "offline" se desconecta antes de 'adb connect'
+        self.assertEqual([call[0] for call in self.adb.calls], ["state", "disconnect", "connect"])
+        self.assertEqual(self.pool.get("10.0.0.2:5555").reconnects, 1)
+
+    def test_failed_connect_is_not_pooled(self):
+        self.adb.connect_ok = False
+        self.assertEqual(self.pool.acquire("10.0.0.3", 5555)[0], False)
+        self.assertNotIn("10.0.0.3:5555", self.pool)
+        self.assertEqual(self.pool.stats["connect_failures"], 1)
+
+    def test_keepalive_failures_mark_the_connection_stale(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        self.adb.keepalive_ok = False
+        for _ in range(MAX_KEEPALIVE_FAILURES):
+            self.pool.maintain()
+        self.assertEqual(self.pool.get("10.0.0.2:5555").state, "stale")
+        self.adb.calls.clear()
+        self.pool.maintain() # Las obsoletas no reciben keep-alive
+        self.assertEqual(self.adb.count("keepalive"), 0)
+
+    def test_keepalive_success_refreshes_verification(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        entry = self.pool.get("10.0.0.2:5555")
+        entry.last_verified -= 60
+        self.pool.maintain()
+        self.assertIsNotNone(entry.last_keepalive)
+        self.assertEqual(entry.last_verified, entry.last_keepalive)
+
+    def test_idle_connections_expire_unless_in_use(self):
+        pool = self.new_pool(idle_timeout=10)
+        pool.acquire("10.0.0.2", 5555)
+        pool.acquire("10.0.0.3", 5555)
+        for serial in ("10.0.0.2:5555", "10.0.0.3:5555"):
+            pool.get(serial).last_used -= 60
+        self.adb.busy.add("10.0.0.3:5555")
+        pool.maintain()
+        self.assertEqual(pool.serials(), ["10.0.0.3:5555"])
+        self.assertIn(("disconnect", "10.0.0.2:5555"), self.adb.calls)
+        self.assertEqual(pool.stats["expirations"], 1)
+
+    def test_expiry_skips_a_connection_reused_meanwhile(self):
+        pool = self.new_pool(idle_timeout=10)
+        pool.acquire("10.0.0.2", 5555)
+        entry = pool.get("10.0.0.2:5555")
+        entry.last_used -= 60
+        # maintain() la vio inactiva, pero un acquire() concurrente la reutiliza antes de _expire()
+        self.assertTrue(pool.acquire("10.0.0.2", 5555)[2])
+        self.assertFalse(pool._expire("10.0.0.2:5555", entry))
+        self.assertIn("10.0.0.2:5555", pool)
+
+    def test_invalidate_after_a_server_restart(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        self.pool.invalidate()
+        self.adb.states.clear() # El servidor reiniciado ya no conoce el transporte
+        self.adb.calls.clear()
+        self.assertFalse(self.pool.acquire("10.0.0.2", 5555)[2])
+        self.assertEqual([call[0] for call in self.adb.calls], ["state", "connect"])
+
+    def test_evict_and_status(self):
+        self.pool.acquire("10.0.0.2", 5555)
+        row = self.pool.status()["connections"][0]
+        self.assertEqual((row["serial"], row["state"]), ("10.0.0.2:5555", "connected"))
+        self.assertNotIn("last_used", row)
+        self.assertEqual(self.pool.evict_all(), 1)
+        self.assertFalse(self.pool.evict("10.0.0.2:5555"))
+        self.assertEqual(self.pool.status()["connections"], [])
+
+    def test_background_thread_sends_keepalives(self):
+        pool = self.new_pool(keepalive_interval=0.01)
+        pool.acquire("10.0.0.2", 5555)
+        pool.start()
+        deadline = time.monotonic() + 2
+        while self.adb.count("keepalive") < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.stop()
+        self.assertGreaterEqual(self.adb.count("keepalive"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las utilidades Wi-Fi: destinos, conexión masiva, su tabla de resultados
+y la caché del barrido de subredes
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import os
+import socket
+import struct
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi_tools import (SubnetScanner, bulk_connect, format_connect_results, parse_target, # noqa: E402
+                        split_targets)
+
+
+def free_port() -> int:
+    """Puerto local libre en el que nadie escucha."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def listening_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    return sock
+
+
+class ParseTargetTest(unittest.TestCase):
+
+    def test_host_and_port(self):
+        self.assertEqual(parse_target("192.168.1.5"), ("192.168.1.5", 5555))
+        self.assertEqual(parse_target(" 192.168.1.5:40123 "), ("192.168.1.5", 40123))
+        self.assertEqual(parse_target("tablet.local:", default_port=5037), ("tablet.local", 5037))
+
+    def test_ipv6(self):
+        self.assertEqual(parse_target("[fe80::1]:5556"), ("fe80::1", 5556))
+        self.assertEqual(parse_target("[fe80::1]"), ("fe80::1", 5555))
+        self.assertEqual(parse_target("fe80::1"), ("fe80::1", 5555))
+
+    def test_invalid_targets(self):
+        for target in ("", "   ", "host:abc", "host:0", "host:70000"):
+            with self.assertRaises(ValueError, msg=target):
+                parse_target(target)
+
+    def test_split_targets(self):
+        self.assertEqual(split_targets("10.0.0.1, 10.0.0.2;10.0.0.3\n 10.0.0.4:5556  "),
+                         ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4:5556"])
+        self.assertEqual(split_targets(" ,\n "), [])
+
+
+class BulkConnectTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = listening_socket()
+        self.addCleanup(self.server.close)
+        self.open_port = self.server.getsockname()[1]
+        self.calls = []
+
+    def connect(self, host, port):
+        self.calls.append((host, port))
+        return True, f"connected to {host}:{port}"
+
+    def test_rows_keep_order_and_skip_unreachable(self):
+        closed_port = free_port()
+        targets = [f"127.0.0.1:{self.open_port}", "host:abc", f"127.0.0.1:{closed_port}"]
+        results = bulk_connect(targets, self.connect, probe_timeout=0.5)
+        self.assertEqual([row["target"] for row in results], targets)
+
+        live, invalid, closed = results
+        self.assertTrue(live["reachable"] and live["connected"])
+        self.assertIsNotNone(live["probe_ms"])
+        self.assertGreaterEqual(live["total_ms"], live["connect_ms"])
+        self.assertIn("Destino inválido", invalid["message"])
+        self.assertFalse(closed["reachable"] or closed["connected"])
+        self.assertIsNone(closed["connect_ms"])
+        self.assertEqual(self.calls, [("127.0.0.1", self.open_port)]) # Sólo se conecta al que responde
+
+    def test_skip_probe_and_connect_errors(self):
+        def failing(host, port):
+            raise RuntimeError("adb se cerró")
+
+        results = bulk_connect(["10.255.255.1"], failing, skip_probe=True)
+        self.assertTrue(results[0]["reachable"])
+        self.assertIsNone(results[0]["probe_ms"])
+        self.assertEqual(results[0]["message"], "Error inesperado: adb se cerró")
+
+    def test_result_table(self):
+        closed_port = free_port()
+        results = bulk_connect([f"127.0.0.1:{self.open_port}", f"127.0.0.1:{closed_port}", "host:abc"],
+                               self.connect, probe_timeout=0.5)
+        table = format_connect_results(results).splitlines()
+        self.assertTrue(table[0].startswith("Destino"))
+        self.assertIn("✅ conectado", table[2])
+        self.assertIn("⏭️  omitido", table[3])
+        self.assertIn("❌ fallo", table[4])
+        self.assertEqual(table[-1], "1/3 dispositivos conectados.")
+
+
+class SubnetScannerTest(unittest.TestCase):
+
+    def test_hits_are_cached(self):
+        server = listening_socket()
+        port = server.getsockname()[1]
+        scanner = SubnetScanner(timeout=0.5)
+        hits = scanner.scan("127.0.0.1/32", port)
+        self.assertEqual([(hit["host"], hit["port"]) for hit in hits], [("127.0.0.1", port)])
+        server.close()
+        self.assertEqual(scanner.scan("127.0.0.1/32", port), hits) # Desde la caché
+        scanner.clear_cache()
+        self.assertEqual(scanner.scan("127.0.0.1/32", port), [])
+
+    def test_misses_expire_quickly(self):
+        port = free_port()
+        scanner = SubnetScanner(timeout=0.5, miss_ttl=60.0)
+        self.assertEqual(scanner.scan("127.0.0.1/32", port), [])
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(("127.0.0.1", port))
+        server.listen(4)
+        self.assertEqual(scanner.scan("127.0.0.1/32", port), []) # Fallo aún vigente en caché
+        scanner.miss_ttl = 0.0 # El dispositivo acaba de activar la depuración inalámbrica
+        self.assertEqual(len(scanner.scan("127.0.0.1/32", port)), 1)
+
+    def test_verify_banner(self):
+        server = listening_socket()
+        self.addCleanup(server.close)
+        port = server.getsockname()[1]
+
+        def answer_cnxn():
+            conn, _ = server.accept()
+            with conn:
+                conn.recv(64)
+                conn.sendall(b"CNXN" + struct.pack("<5I", 0, 0, 0, 0, 0))
+
+        threading.Thread(target=answer_cnxn, daemon=True).start()
+        hits = SubnetScanner(timeout=0.5).scan("127.0.0.1/32", port, verify_banner=True)
+        self.assertEqual(hits[0]["banner"], "CNXN")
+
+    def test_network_too_large(self):
+        with self.assertRaises(ValueError):
+            SubnetScanner().scan("10.0.0.0/8")
+
+
+if __name__ == "__main__":
+    unittest.main()
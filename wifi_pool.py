@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de conexiones ADB sobre TCP que sobreviven entre sesiones
+
+Desconectar el dispositivo Wi-Fi al terminar cada sesión obliga a pagar un
+'adb connect' completo en la siguiente, y un transporte TCP inactivo muere en
+silencio cuando el NAT o el punto de acceso olvidan la conexión. El pool
+mantiene conectados los dispositivos Wi-Fi entre sesiones:
+
+    * acquire() devuelve de inmediato, sin consultar al servidor ADB, si el
+      dispositivo está en el pool y su último keep-alive (o su conexión) es
+      reciente; si no, comprueba o conecta (reconexión perezosa). Un
+      lanzamiento fallido o el supervisor marcan la conexión con mark_stale()
+      para que el siguiente acquire() la reconecte.
+    * Un hilo envía periódicamente una orden mínima por cada transporte
+      (keep-alive) para que el NAT no lo olvide y para detectar los caídos,
+      que se marcan como obsoletos y se reconectan en el siguiente acquire().
+    * Solo se desconecta con evict() o cuando una conexión lleva más de
+      idle_timeout segundos sin usarse.
+
+Las conexiones viven en el servidor ADB, no en este proceso: siguen
+disponibles para la próxima ejecución aunque el programa termine. La
+caducidad por inactividad solo corre mientras hay un proceso vivo, así que
+las que deja una ejecución de la CLI no caducan; para cerrarlas al salir
+está --disconnect-wifi (cleanup(disconnect_wifi=True)).
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+, ADB
+"""
+
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict
+
+
+DEFAULT_KEEPALIVE_INTERVAL = 30.0 # Muy por debajo de los timeouts de NAT habituales (60-300 s)
+DEFAULT_IDLE_TIMEOUT = 30 * 60.0
+DEFAULT_FRESH_SECONDS = 5.0 # Sin hilo de keep-alive, confianza en una conexión comprobada hace menos de esto
+MAX_KEEPALIVE_FAILURES = 2 # Fallos seguidos para dar la conexión por perdida
+
+
+@dataclass
+class PooledConnection:
+    """Transporte ADB-TCP gestionado por el pool."""
+    serial: str
+    host: str
+    port: int
+    state: str = "connected" # connected | stale
+    connected_at: float = 0.0 # time.time()
+    last_used: float = 0.0 # time.monotonic()
+    last_keepalive: Optional[float] = None # time.monotonic() del último keep-alive correcto
+    last_verified: float = 0.0 # time.monotonic() de la última conexión o keep-alive correctos
+    keepalive_failures: int = 0
+    reconnects: int = 0
+
+
+class WifiConnectionPool:
+    """
+    Conexiones ADB sobre TCP mantenidas entre sesiones.
+
+    Args:
+        connect: connect(host, port) -> (bool, mensaje) que ejecuta 'adb connect'.
+        disconnect: disconnect(serial) que ejecuta 'adb disconnect'.
+        keepalive: keepalive(serial) -> bool; orden ligera sobre el transporte.
+        device_state: device_state(serial) -> estado ADB ("device", "offline"...) o None.
+        in_use: in_use(serial) -> bool; una conexión en uso (sesión activa) nunca caduca.
+        keepalive_interval: Segundos entre keep-alives (0 = sin hilo de mantenimiento).
+        idle_timeout: Segundos sin uso tras los que se desconecta (0 = nunca).
+    """
+
+    def __init__(self, connect, disconnect, keepalive, device_state, in_use=None,
+                 keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, log_callback=None):
+        self.connect = connect
+        self.disconnect = disconnect
+        self.keepalive = keepalive
+        self.device_state = device_state
+        self.in_use = in_use or (lambda serial: False)
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.log_callback = log_callback if log_callback else print
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "connects": 0, "connect_failures": 0,
+                                      "keepalives": 0, "keepalive_failures": 0, "evictions": 0, "expirations": 0}
+        self._connections: Dict[str, PooledConnection] = {}
+        self._lock = threading.Lock()
+        self._serial_locks: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _serial_lock(self, serial: str) -> threading.Lock:
+        with self._lock:
+            return self._serial_locks.setdefault(serial, threading.Lock())
+
+    def get(self, serial: str) -> Optional[PooledConnection]:
+        with self._lock:
+            return self._connections.get(serial)
+
+    def __contains__(self, serial: str) -> bool:
+        return self.get(serial) is not None
+
+    def serials(self) -> List[str]:
+        with self._lock:
+            return list(self._connections)
+
+    def _fresh_seconds(self) -> float:
+        # MAX_KEEPALIVE_FAILURES intervalos: mientras no se pierdan keep-alives seguidos la conexión vale
+        return self.keepalive_interval * MAX_KEEPALIVE_FAILURES if self.keepalive_interval else DEFAULT_FRESH_SECONDS
+
+    def acquire(self, host: str, port: int) -> tuple[bool, str, bool]:
+        """
+        Devuelve una conexión lista para host:port, conectando solo si hace falta.
+
+        Un acierto con keep-alive reciente no toca el servidor ADB; solo una
+        entrada sin verificar desde hace más de _fresh_seconds() se comprueba.
+
+        Returns:
+            (conectado, mensaje, reutilizada): reutilizada es True si no hubo que
+            ejecutar 'adb connect'.
+        """
+        serial = f"{host}:{port}"
+        with self._serial_lock(serial): # Dos sesiones del mismo dispositivo no conectan dos veces
+            entry = self.get(serial)
+            now = time.monotonic()
+            if entry is not None and entry.state == "connected":
+                fresh = now - entry.last_verified < self._fresh_seconds()
+                if fresh or self.device_state(serial) == "device":
+                    entry.last_used = now
+                    if not fresh:
+                        entry.last_verified = now
+                    self._count("hits")
+                    return True, f"already connected to {serial}", True
+            # Sin entrada (p. ej. conectado en una ejecución anterior) basta 'adb connect': si el
+            # servidor ya tiene el transporte responde "already connected" sin tocar la red
+            self._count("misses")
+            if entry is not None and self.device_state(serial) is not None:
+                self.disconnect(serial) # Un transporte "offline" haría que 'adb connect' no reconectase
+            connected, message = self.connect(host, port)
+            self._count("connects")
+            if not connected:
+                self._count("connect_failures")
+                return False, message, False
+            reconnect = entry is not None
+            entry = self._add(serial, host, port)
+            entry.connected_at = time.time()
+            if reconnect:
+                entry.reconnects += 1
+            return True, message, False
+
+    def _add(self, serial: str, host: str, port: int) -> PooledConnection:
+        with self._lock:
+            entry = self._connections.get(serial)
+            if entry is None:
+                entry = self._connections[serial] = PooledConnection(serial, host, port, connected_at=time.time())
+            entry.state = "connected"
+            entry.last_used = entry.last_verified = time.monotonic()
+            entry.keepalive_failures = 0
+            return entry
+
+    def touch(self, serial: str):
+        """Marca la conexión como usada (retrasa su caducidad)."""
+        entry = self.get(serial)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+
+    def mark_stale(self, serial: str):
+        """Marca una conexión como caída (lanzamiento fallido, sesión perdida): se reconecta en el próximo acquire()."""
+        entry = self.get(serial)
+        if entry is not None:
+            entry.state = "stale"
+
+    def evict(self, serial: str, disconnect: bool = True) -> bool:
+        """Saca la conexión del pool y, por defecto, la desconecta del servidor ADB."""
+        with self._lock:
+            entry = self._connections.pop(serial, None)
+        if entry is None:
+            return False
+        self._count("evictions")
+        if disconnect:
+            self.disconnect(serial)
+        return True
+
+    def evict_all(self, disconnect: bool = True) -> int:
+        return sum(1 for serial in self.serials() if self.evict(serial, disconnect))
+
+    def invalidate(self):
+        """Marca todas las conexiones como obsoletas (p. ej. el servidor ADB se reinició y las perdió)."""
+        with self._lock:
+            for entry in self._connections.values():
+                entry.state = "stale"
+
+    # --- Mantenimiento ---
+
+    def maintain(self):
+        """Una ronda de mantenimiento: caducidad por inactividad y keep-alive de las conexiones vivas."""
+        now = time.monotonic()
+        for serial in self.serials():
+            entry = self.get(serial)
+            if entry is None:
+                continue
+            if self.in_use(serial):
+                entry.last_used = now
+            elif self.idle_timeout and now - entry.last_used >= self.idle_timeout:
+                if self._expire(serial, entry):
+                    continue
+            if entry.state != "connected":
+                continue # Se reconectará en el próximo acquire()
+            self._count("keepalives")
+            if self.keepalive(serial):
+                entry.last_keepalive = entry.last_verified = time.monotonic()
+                entry.keepalive_failures = 0
+                continue
+            self._count("keepalive_failures")
+            entry.keepalive_failures += 1
+            if entry.keepalive_failures >= MAX_KEEPALIVE_FAILURES:
+                entry.state = "stale"
+                self.log_callback(f"⚠️  Conexión Wi-Fi {serial} perdida (keep-alive sin respuesta); "
+                                  f"se reconectará en el próximo uso.")
+
+    def _expire(self, serial: str, entry: PooledConnection) -> bool:
+        """Desconecta una conexión inactiva, salvo que un acquire() concurrente acabe de reutilizarla."""
+        with self._serial_lock(serial):
+            idle = time.monotonic() - entry.last_used
+            if self.get(serial) is not entry or idle < self.idle_timeout or self.in_use(serial):
+                return False
+            self.log_callback(f"⌛ Conexión Wi-Fi {serial} sin uso durante "
+                              f"{f'{idle / 60:.0f} min' if idle >= 120 else f'{idle:.0f}s'}; se desconecta.")
+            self._count("expirations")
+            self.evict(serial)
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.keepalive_interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                self.log_callback(f"⚠️  Error en el mantenimiento del pool Wi-Fi: {e}")
+
+    def start(self):
+        if not self.keepalive_interval or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wifi-pool-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el mantenimiento sin desconectar nada."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def status(self) -> dict:
+        """Conexiones del pool (estado, antigüedad, inactividad) y contadores."""
+        now = time.monotonic()
+        with self._lock:
+            connections = list(self._connections.values())
+            stats = dict(self.stats)
+        rows = []
+        for entry in connections:
+            row = asdict(entry)
+            row["idle_seconds"] = round(now - entry.last_used, 1)
+            row["last_keepalive_seconds_ago"] = (round(now - entry.last_keepalive, 1)
+                                                 if entry.last_keepalive is not None else None)
+            del row["last_used"], row["last_keepalive"], row["last_verified"]
+            rows.append(row)
+        return {"connections": rows, "stats": stats, "keepalive_interval": self.keepalive_interval,
+                "idle_timeout": self.idle_timeout}
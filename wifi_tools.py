@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades de red para dispositivos ADB sobre Wi-Fi
+
+Incluye la interpretación de destinos "host[:puerto]", sondeos TCP rápidos
+para descartar equipos apagados antes de lanzar 'adb connect', la
+conexión masiva con concurrencia limitada y un escáner asíncrono de subredes
+que localiza puertos ADB abiertos.
+
+Autor: Script generado automáticamente
+Versión: 1.0
+Requisitos: Python 3.9+
+"""
+
+import asyncio
+import ipaddress
+import re
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Iterable, Dict
+
+try:
+    import resource # Sólo POSIX: límite de descriptores abiertos
+except ImportError:
+    resource = None
+
+
+DEFAULT_ADB_TCP_PORT = 5555
+DEFAULT_PROBE_TIMEOUT = 0.5
+DEFAULT_CONNECT_WORKERS = 16
+_MAX_PROBE_WORKERS = 128
+
+DEFAULT_SCAN_TIMEOUT = 0.3
+DEFAULT_SCAN_CONCURRENCY = 2048
+DEFAULT_SCAN_CACHE_TTL = 60.0
+DEFAULT_SCAN_MISS_TTL = 5.0 # Un dispositivo recién activado debe aparecer enseguida
+MAX_SCAN_HOSTS = 65536 # Una /16 como máximo por barrido
+
+# Mensaje CNXN del protocolo ADB (el que envía 'adb connect' al abrir el transporte)
+_A_CNXN = 0x4E584E43
+_A_VERSION = 0x01000000
+_A_MAXDATA = 256 * 1024
+_ADB_BANNER_COMMANDS = (b"CNXN", b"AUTH", b"STLS")
+
+
+def parse_target(target: str, default_port: int = DEFAULT_ADB_TCP_PORT) -> tuple[str, int]:
+    """
+    Separa "host[:puerto]" en (host, puerto).
+
+    Raises:
+        ValueError: Si el destino está vacío o el puerto no es válido.
+    """
+    target = target.strip()
+    if not target:
+        raise ValueError("Destino vacío.")
+    match = re.match(r"^\[(.+)\](?::(\d+))?$", target) # IPv6 entre corchetes
+    if match:
+        host, port = match.group(1), match.group(2)
+    elif target.count(":") == 1:
+        host, port = target.split(":")
+    else:
+        host, port = target, None
+    if port is None or port == "":
+        return host, default_port
+    if not port.isdigit():
+        raise ValueError(f"Puerto inválido: {port}")
+    port_number = int(port)
+    if not 0 < port_number < 65536:
+        raise ValueError(f"Puerto fuera de rango: {port}")
+    return host, port_number
+
+
+def split_targets(text: str) -> List[str]:
+    """Divide una lista de destinos separados por comas, espacios o saltos de línea."""
+    return [item for item in re.split(r"[\s,;]+", text) if item]
+
+
+def tcp_probe(host: str, port: int, timeout: float = DEFAULT_PROBE_TIMEOUT) -> tuple[bool, float]:
+    """
+    Comprueba si el puerto TCP acepta conexiones.
+
+    Returns:
+        tuple[bool, float]: (abierto, milisegundos empleados)
+    """
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True, (time.perf_counter() - start) * 1000
+    except OSError:
+        return False, (time.perf_counter() - start) * 1000
+
+
+def bulk_connect(targets: Iterable[str], connect_func, probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 max_workers: int = DEFAULT_CONNECT_WORKERS, skip_probe: bool = False) -> List[dict]:
+    """
+    Conecta muchos dispositivos: sondeo TCP en paralelo y 'adb connect' sólo a los que responden.
+
+    Args:
+        targets: Destinos "host[:puerto]".
+        connect_func: Función (host, puerto) -> (éxito, mensaje) que realiza la conexión ADB.
+        probe_timeout: Segundos máximos del sondeo TCP por destino.
+        max_workers: Conexiones ADB simultáneas como máximo.
+        skip_probe: Conectar directamente sin sondeo previo.
+
+    Returns:
+        List[dict]: Una fila por destino (en el orden recibido) con las claves
+        target, host, port, reachable, connected, message, probe_ms, connect_ms, total_ms.
+    """
+    results = []
+    for target in targets:
+        row = {"target": target, "host": None, "port": None, "reachable": False, "connected": False,
+               "message": "", "probe_ms": None, "connect_ms": None, "total_ms": 0.0}
+        try:
+            row["host"], row["port"] = parse_target(target)
+        except ValueError as e:
+            row["message"] = f"Destino inválido: {e}"
+        results.append(row)
+    valid = [row for row in results if row["host"]]
+    if not valid:
+        return results
+
+    if skip_probe:
+        for row in valid:
+            row["reachable"] = True
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(valid), _MAX_PROBE_WORKERS)) as pool:
+            probes = pool.map(lambda row: tcp_probe(row["host"], row["port"], probe_timeout), valid)
+            for row, (is_open, elapsed_ms) in zip(valid, probes):
+                row["reachable"], row["probe_ms"] = is_open, round(elapsed_ms, 1)
+                row["total_ms"] = row["probe_ms"]
+                if not is_open:
+                    row["message"] = "Puerto cerrado o equipo inaccesible (omitido)"
+
+    def connect(row):
+        start = time.perf_counter()
+        try:
+            row["connected"], row["message"] = connect_func(row["host"], row["port"])
+        except Exception as e:
+            row["connected"], row["message"] = False, f"Error inesperado: {e}"
+        row["connect_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        row["total_ms"] = round((row["probe_ms"] or 0) + row["connect_ms"], 1)
+
+    live = [row for row in valid if row["reachable"]]
+    if live:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(live), max_workers))) as pool:
+            list(pool.map(connect, live))
+    return results
+
+
+def format_connect_results(results: List[dict]) -> str:
+    """Tabla de texto con el resultado de bulk_connect."""
+    header = f"{'Destino':<24} {'Estado':<12} {'Sondeo':>9} {'Conexión':>10}  Mensaje"
+    lines = [header, "-" * len(header)]
+    for row in results:
+        if row["connected"]:
+            status = "✅ conectado"
+        elif row["host"] and not row["reachable"]:
+            status = "⏭️  omitido"
+        else:
+            status = "❌ fallo"
+        probe = f"{row['probe_ms']:.0f} ms" if row["probe_ms"] is not None else "-"
+        connect = f"{row['connect_ms']:.0f} ms" if row["connect_ms"] is not None else "-"
+        message = " ".join(str(row["message"]).split())
+        lines.append(f"{row['target']:<24} {status:<12} {probe:>9} {connect:>10}  {message}")
+    connected = sum(1 for row in results if row["connected"])
+    lines.append(f"\n{connected}/{len(results)} dispositivos conectados.")
+    return "\n".join(lines)
+
+
+def _adb_connect_packet() -> bytes:
+    payload = b"host::\x00"
+    header = struct.pack("<6I", _A_CNXN, _A_VERSION, _A_MAXDATA, len(payload),
+                         sum(payload) & 0xFFFFFFFF, _A_CNXN ^ 0xFFFFFFFF)
+    return header + payload
+
+
+def _scan_concurrency_limit(requested: int) -> int:
+    """Ajusta la concurrencia al límite de descriptores del proceso."""
+    if resource is None:
+        return requested
+    try:
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (OSError, ValueError):
+        return requested
+    if soft == resource.RLIM_INFINITY:
+        return requested
+    return max(16, min(requested, soft - 64))
+
+
+def guess_local_network(prefix: int = 24) -> Optional[str]:
+    """Red local por defecto (p. ej. "192.168.1.0/24") deducida de la interfaz de salida."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("192.0.2.1", 9)) # No envía nada: sólo elige la interfaz
+            local_ip = sock.getsockname()[0]
+    except OSError:
+        return None
+    return str(ipaddress.ip_network(f"{local_ip}/{prefix}", strict=False))
+
+
+class SubnetScanner:
+    """
+    Barrido asíncrono de subredes en busca de puertos ADB sobre TCP abiertos.
+
+    Lanza miles de sondeos concurrentes con asyncio y, opcionalmente, verifica
+    que quien responde sea realmente adbd enviando un mensaje CNXN y esperando
+    CNXN/AUTH/STLS. Los equipos encontrados se guardan en caché durante
+    `cache_ttl` segundos, de modo que repetir un barrido es casi inmediato; los
+    hosts sin respuesta sólo durante `miss_ttl` segundos, para que un dispositivo
+    que active la depuración inalámbrica aparezca en el siguiente barrido.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_SCAN_TIMEOUT,
+                 concurrency: int = DEFAULT_SCAN_CONCURRENCY, cache_ttl: float = DEFAULT_SCAN_CACHE_TTL,
+                 miss_ttl: float = DEFAULT_SCAN_MISS_TTL):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.cache_ttl = cache_ttl
+        self.miss_ttl = miss_ttl
+        self._cache: Dict[tuple, tuple[float, Optional[dict]]] = {}
+        self._cache_lock = threading.Lock()
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cached(self, key: tuple) -> tuple[bool, Optional[dict]]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        if entry:
+            ttl = self.cache_ttl if entry[1] else self.miss_ttl
+            if time.monotonic() - entry[0] < ttl:
+                return True, entry[1]
+        return False, None
+
+    def _store(self, key: tuple, hit: Optional[dict]):
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), hit)
+
+    async def _probe(self, host: str, port: int, verify_banner: bool,
+                     semaphore: asyncio.Semaphore) -> Optional[dict]:
+        key = (host, port, verify_banner)
+        found, hit = self._cached(key)
+        if found:
+            return hit
+        async with semaphore:
+            start = time.perf_counter()
+            writer = None
+            hit = None
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+                latency_ms = round((time.perf_counter() - start) * 1000, 1)
+                banner = None
+                if verify_banner:
+                    writer.write(_adb_connect_packet())
+                    await writer.drain()
+                    header = await asyncio.wait_for(reader.readexactly(24), self.timeout * 3)
+                    banner = header[:4].decode("ascii", errors="replace")
+                    if header[:4] not in _ADB_BANNER_COMMANDS:
+                        banner = None
+                        raise ConnectionError("No es un servicio ADB")
+                hit = {"host": host, "port": port, "latency_ms": latency_ms, "banner": banner}
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                hit = None
+            finally:
+                if writer is not None:
+                    writer.close()
+        self._store(key, hit)
+        return hit
+
+    async def scan_async(self, network: str, port: int = DEFAULT_ADB_TCP_PORT,
+                         verify_banner: bool = False) -> List[dict]:
+        """Versión asíncrona de scan()."""
+        net = ipaddress.ip_network(network, strict=False)
+        if net.num_addresses > MAX_SCAN_HOSTS + 2:
+            raise ValueError(f"Red demasiado grande ({net.num_addresses} direcciones, máximo {MAX_SCAN_HOSTS}).")
+        hosts = [str(ip) for ip in net.hosts()] or [str(net.network_address)]
+        semaphore = asyncio.Semaphore(_scan_concurrency_limit(self.concurrency))
+        results = await asyncio.gather(*(self._probe(host, port, verify_banner, semaphore) for host in hosts))
+        return [hit for hit in results if hit]
+
+    def scan(self, network: str, port: int = DEFAULT_ADB_TCP_PORT, verify_banner: bool = False) -> List[dict]:
+        """
+        Barre una red CIDR (p. ej. "192.168.1.0/24") buscando el puerto ADB abierto.
+
+        Args:
+            network: Red en notación CIDR.
+            port: Puerto ADB sobre TCP a sondear.
+            verify_banner: Confirmar con el saludo CNXN de ADB (descarta otros servicios).
+
+        Returns:
+            List[dict]: Equipos encontrados con las claves host, port, latency_ms y banner.
+
+        Raises:
+            ValueError: Si la red no es válida o supera MAX_SCAN_HOSTS.
+        """
+        return asyncio.run(self.scan_async(network, port, verify_banner))